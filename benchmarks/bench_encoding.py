@@ -0,0 +1,81 @@
+"""
+Throughput de la codificación de embeddings (docs/s).
+
+Compara, sobre los mismos textos:
+    - la ruta anterior: SentenceTransformer.encode(textos) con sus lotes por defecto
+    - EmbeddingEncoder con lotes por presupuesto de tokens, en 1 proceso
+    - EmbeddingEncoder con N procesos de CPU (hilos de torch repartidos entre ellos;
+      el tiempo incluye cargar el modelo en cada proceso)
+
+y comprueba que los embeddings coincidan con la ruta anterior (similitud coseno).
+
+Uso (desde la raíz del proyecto):
+    python benchmarks/bench_encoding.py -f data_input/test.csv -c Review -n 2000 -w 2 4
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import pandas as pd
+
+from processing.encoding import EmbeddingEncoder
+from processing.normalizer import TextNormalizer
+
+MODEL = "sentence-transformers/all-mpnet-base-v2"
+
+
+def _report(name, n_docs, elapsed, embeddings, reference):
+    a = embeddings / np.linalg.norm(embeddings, axis=1, keepdims=True)
+    b = reference / np.linalg.norm(reference, axis=1, keepdims=True)
+    min_cos = float((a * b).sum(axis=1).min())
+    print(f"{name:28s} {elapsed:8.2f} s  {n_docs / elapsed:8.1f} docs/s  (coseno mínimo {min_cos:.5f})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de codificación de embeddings")
+    parser.add_argument("-f", "--File", default="data_input/test.csv")
+    parser.add_argument("-c", "--Column_name", default="Review")
+    parser.add_argument("-l", "--Language", default="spanish")
+    parser.add_argument("-n", "--n-docs", type=int, default=2000, help="Documentos a codificar")
+    parser.add_argument("-w", "--workers", type=int, nargs="+", default=[2, 4])
+    parser.add_argument("--token-budget", type=int, default=16384)
+    parser.add_argument("--model", default=MODEL)
+    args = parser.parse_args()
+
+    import torch
+    from sentence_transformers import SentenceTransformer
+
+    texts = pd.read_csv(args.File, usecols=[args.Column_name])[args.Column_name].astype(str).tolist()
+    texts = TextNormalizer(args.Language).transform(texts[:args.n_docs])
+    n_docs = len(texts)
+    n_threads = torch.get_num_threads()
+    print(f"Corpus: {n_docs} documentos, {os.cpu_count()} núcleos, {n_threads} hilos de torch")
+
+    model = SentenceTransformer(args.model, device="cpu")
+
+    start = time.perf_counter()
+    reference = model.encode(texts, convert_to_numpy=True, show_progress_bar=False)
+    t_ref = time.perf_counter() - start
+    _report("ruta anterior (batch 32)", n_docs, t_ref, reference, reference)
+
+    encoder = EmbeddingEncoder(args.model, language=args.Language, token_budget=args.token_budget)
+    start = time.perf_counter()
+    embeddings = encoder.encode(texts, model=model)
+    _report("presupuesto de tokens, 1 p.", n_docs, time.perf_counter() - start, embeddings, reference)
+
+    for n_workers in args.workers:
+        threads = max(n_threads // n_workers, 1)
+        encoder = EmbeddingEncoder(args.model, language=args.Language, token_budget=args.token_budget,
+                                   n_workers=n_workers, threads_per_worker=threads)
+        start = time.perf_counter()
+        embeddings = encoder.encode(texts)
+        _report(f"{n_workers} procesos x {threads} hilos", n_docs, time.perf_counter() - start,
+                embeddings, reference)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+"""
+Presupuesto de tiempo de arranque.
+
+Mide, cada uno en un proceso limpio:
+    - python nlp_analyzer.py --help
+    - import de cada módulo processing.*
+
+y falla (exit code 1) si alguno supera su presupuesto o si al importarlo
+se cargan dependencias pesadas (torch, bertopic, umap, ...), que solo deben
+importarse dentro de la etapa que las usa.
+
+Uso (desde la raíz del proyecto):
+    python benchmarks/bench_imports.py [--repeat 3] [--scale 1.0]
+"""
+import argparse
+import os
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Módulos que nunca deben cargarse al importar processing.* ni con --help
+HEAVY_MODULES = [
+    "torch", "sentence_transformers", "bertopic", "umap", "numba",
+    "sklearn", "plotly", "matplotlib", "wordcloud", "spacy", "nltk",
+]
+
+# Presupuestos en segundos (tiempo de pared, incluye arrancar el intérprete)
+HELP_BUDGET = 0.5
+MODULE_BUDGETS = {
+    "processing.ablation": 0.3,
+    "processing.cache": 0.5,
+    "processing.dedup": 1.0,
+    "processing.embedding_store": 0.5,
+    "processing.encoding": 0.5,
+    "processing.ingest": 1.0,
+    "processing.landmarks": 0.5,
+    "processing.models": 0.3,
+    "processing.neighbors": 0.3,
+    "processing.ngram_engine": 0.3,
+    "processing.ngrams": 0.3,
+    "processing.normalizer": 1.0,
+    "processing.outliers": 1.0,
+    "processing.preprocess": 1.0,
+    "processing.quantization": 0.3,
+    "processing.rendering": 0.3,
+    "processing.scheduler": 0.3,
+    "processing.sketch": 0.3,
+    "processing.tokenstore": 0.3,
+    "processing.topic_index": 1.0,
+    "processing.topics": 1.0,
+    "processing.visualization": 1.0,
+    "processing.wordcloud": 0.3,
+    "service.server": 0.3,
+}
+
+_PROBE = """
+import sys, time
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+heavy = sorted(m for m in {heavy!r} if m in sys.modules)
+print(elapsed, ",".join(heavy))
+"""
+
+
+def _best_of(repeat, fn):
+    return min(fn() for _ in range(repeat))
+
+
+def time_help():
+    start = time.perf_counter()
+    subprocess.run([sys.executable, "nlp_analyzer.py", "--help"], cwd=ROOT,
+                   check=True, stdout=subprocess.DEVNULL)
+    return time.perf_counter() - start
+
+
+def probe_module(module):
+    code = _PROBE.format(module=module, heavy=HEAVY_MODULES)
+    out = subprocess.run([sys.executable, "-c", code], cwd=ROOT, check=True,
+                         capture_output=True, text=True).stdout.split()
+    elapsed = float(out[0])
+    heavy = out[1].split(",") if len(out) > 1 else []
+    return elapsed, heavy
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Presupuesto de tiempo de import")
+    parser.add_argument("--repeat", type=int, default=3, help="Se toma el mejor de N intentos")
+    parser.add_argument("--scale", type=float, default=1.0, help="Multiplica todos los presupuestos")
+    args = parser.parse_args()
+
+    failures = []
+
+    t_help = _best_of(args.repeat, time_help)
+    budget = HELP_BUDGET * args.scale
+    print(f"{'nlp_analyzer.py --help':28s} {t_help:6.3f} s  (presupuesto {budget:.2f} s)")
+    if t_help > budget:
+        failures.append(f"--help tardó {t_help:.3f} s")
+
+    for module, budget in sorted(MODULE_BUDGETS.items()):
+        results = [probe_module(module) for _ in range(args.repeat)]
+        elapsed = min(r[0] for r in results)
+        heavy = results[0][1]
+        budget *= args.scale
+        flag = f"  carga: {', '.join(heavy)}" if heavy else ""
+        print(f"{module:28s} {elapsed:6.3f} s  (presupuesto {budget:.2f} s){flag}")
+
+        if elapsed > budget:
+            failures.append(f"{module} tardó {elapsed:.3f} s")
+        if heavy:
+            failures.append(f"{module} importa {', '.join(heavy)} al cargarse")
+
+    if failures:
+        print("\nFALLÓ:\n  " + "\n  ".join(failures))
+        sys.exit(1)
+    print("\nOK")
+
+
+if __name__ == "__main__":
+    main()
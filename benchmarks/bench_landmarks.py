@@ -0,0 +1,74 @@
+"""
+Visualización 3D ajustando sobre todos los puntos vs sobre landmarks.
+
+Con embeddings sintéticos agrupados en K tópicos (más un tópico -1 y
+algunos tópicos pequeños) mide UMAP 3D y t-SNE 3D de Visualization sin
+landmarks y con una muestra de L landmarks estratificada por tópico
+(ubicación del resto incluida). Para cada modo reporta también qué
+fracción de puntos queda más cerca del centro de su propio tópico que de
+cualquier otro en el espacio 3D, como control de calidad de la ubicación.
+
+Uso (desde la raíz del proyecto):
+    python benchmarks/bench_landmarks.py -n 20000 100000 -l 5000
+    python benchmarks/bench_landmarks.py -n 1000000 -l 20000 --skip-full
+"""
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import pandas as pd
+
+from processing.visualization import Visualization
+
+
+def _synthetic(n: int, dim: int, n_topics: int, rng):
+    """Embeddings normalizados; 5% de outliers (-1) y tres tópicos de 10 puntos."""
+    topics = rng.integers(0, n_topics, n)
+    topics[rng.random(n) < 0.05] = -1
+    topics[:30] = n_topics + np.arange(30) // 10
+    centers = rng.normal(size=(n_topics + 3, dim)).astype(np.float32)
+    embeddings = rng.normal(size=(n, dim)).astype(np.float32)
+    clustered = topics >= 0
+    embeddings[clustered] = centers[topics[clustered]] + 0.3 * embeddings[clustered]
+    return embeddings / np.linalg.norm(embeddings, axis=1, keepdims=True), topics
+
+
+def _separation(coords: np.ndarray, topics: np.ndarray) -> float:
+    mask = topics >= 0
+    coords, topics = coords[mask], topics[mask]
+    ids = np.unique(topics)
+    centers = np.stack([coords[topics == t].mean(axis=0) for t in ids])
+    nearest = ids[np.argmin(((coords[:, None, :] - centers[None]) ** 2).sum(axis=-1), axis=1)]
+    return float((nearest == topics).mean())
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de visualización con landmarks")
+    parser.add_argument("-n", "--n-docs", type=int, nargs="+", default=[20000])
+    parser.add_argument("-l", "--landmarks", type=int, default=5000)
+    parser.add_argument("-k", "--topics", type=int, default=30)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--skip-full", action="store_true", help="No ajustar sobre todos los puntos")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    print(f"{'N':>9s} {'modo':>10s} {'UMAP 3D':>9s} {'t-SNE 3D':>9s} {'sep. UMAP':>10s} {'sep. t-SNE':>11s}")
+    for n in args.n_docs:
+        embeddings, topics = _synthetic(n, args.dim, args.topics, rng)
+        modes = ([] if args.skip_full else [("todos", None)]) + [("landmarks", args.landmarks)]
+        for mode, landmarks in modes:
+            viz = Visualization(embeddings, pd.DataFrame({"topic": topics}), palette="viridis",
+                                landmarks=landmarks)
+            viz.reduce_umap_3d()
+            viz.reduce_tsne_3d()
+            sep_umap = _separation(viz.df[["umap_x", "umap_y", "umap_z"]].to_numpy(), topics)
+            sep_tsne = _separation(viz.df[["tsne_x", "tsne_y", "tsne_z"]].to_numpy(), topics)
+            print(f"{n:9d} {mode:>10s} {viz.timings['umap_3d']:8.1f}s {viz.timings['tsne_3d']:8.1f}s "
+                  f"{sep_umap:10.3f} {sep_tsne:11.3f}")
+
+
+if __name__ == "__main__":
+    main()
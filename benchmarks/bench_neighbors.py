@@ -0,0 +1,90 @@
+"""
+Reducción de dimensionalidad con y sin grafo kNN compartido.
+
+Ejecuta las tres reducciones del pipeline sobre los mismos embeddings:
+    - UMAP de BERTopic (15 vecinos, 5 componentes, coseno)
+    - UMAP 3D de la visualización
+    - t-SNE 3D de la visualización
+una vez buscando vecinos en cada reductor (ruta anterior) y otra con un
+NeighborGraph construido una vez (tiempo de construcción incluido).
+
+Los embeddings son sintéticos (grupos normalizados, como los de
+SentenceTransformer) o se leen de un .npy.
+
+Uso (desde la raíz del proyecto):
+    python benchmarks/bench_neighbors.py -n 20000 50000
+    python benchmarks/bench_neighbors.py --embeddings embeddings.npy
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import pandas as pd
+
+from processing.neighbors import BERTOPIC_UMAP_NEIGHBORS, NeighborGraph, required_neighbors
+from processing.visualization import Visualization
+
+
+def _synthetic_embeddings(n: int, dim: int, n_clusters: int, rng) -> np.ndarray:
+    """Embeddings agrupados y normalizados a norma 1."""
+    centers = rng.normal(size=(n_clusters, dim)).astype(np.float32)
+    embeddings = centers[rng.integers(0, n_clusters, n)] + 0.3 * rng.normal(size=(n, dim)).astype(np.float32)
+    return embeddings / np.linalg.norm(embeddings, axis=1, keepdims=True)
+
+
+def _run(embeddings: np.ndarray, shared: bool) -> dict:
+    from umap import UMAP
+
+    timings = {"grafo": 0.0}
+    graph = None
+    if shared:
+        graph = NeighborGraph.build(embeddings, required_neighbors(len(embeddings)))
+        timings["grafo"] = graph.build_seconds
+
+    start = time.perf_counter()
+    UMAP(n_neighbors=BERTOPIC_UMAP_NEIGHBORS, n_components=5, min_dist=0.0, metric="cosine", low_memory=False,
+         precomputed_knn=(None, None, None) if graph is None
+         else graph.umap_knn(BERTOPIC_UMAP_NEIGHBORS)).fit_transform(embeddings)
+    timings["umap_5d"] = time.perf_counter() - start
+
+    df_docs = pd.DataFrame({"topic": np.zeros(len(embeddings), dtype=int)})
+    viz = Visualization(embeddings, df_docs, palette="viridis", neighbor_graph=graph)
+    viz.reduce_umap_3d()
+    viz.reduce_tsne_3d()
+    timings.update(viz.timings)
+    timings["total"] = sum(timings.values())
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark del grafo kNN compartido")
+    parser.add_argument("-n", "--n-docs", type=int, nargs="+", default=[20000])
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--clusters", type=int, default=50)
+    parser.add_argument("--embeddings", help="Archivo .npy con embeddings (ignora -n)")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    if args.embeddings:
+        datasets = [np.load(args.embeddings).astype(np.float32)]
+    else:
+        datasets = [_synthetic_embeddings(n, args.dim, args.clusters, rng) for n in args.n_docs]
+
+    columns = ["grafo", "umap_5d", "umap_3d", "tsne_3d", "total"]
+    print(f"{'N':>8s} {'modo':>12s} " + " ".join(f"{c:>9s}" for c in columns))
+    for embeddings in datasets:
+        results = {}
+        for shared in (False, True):
+            mode = "compartido" if shared else "por reductor"
+            results[mode] = _run(embeddings, shared)
+            print(f"{len(embeddings):8d} {mode:>12s} " + " ".join(f"{results[mode][c]:8.1f}s" for c in columns))
+        speedup = results["por reductor"]["total"] / results["compartido"]["total"]
+        print(f"{'':8s} {'aceleración':>12s} {speedup:8.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""
+Escalamiento del conteo de n-gramas con varios procesos.
+
+Construye un TokenStore a partir de la columna de texto (replicada `scale`
+veces), cuenta unigramas, bigramas y trigramas con 1, 2, 4 y 8 procesos y
+comprueba que todas las tablas sean idénticas a las del conteo serial.
+
+Uso (desde la raíz del proyecto):
+    python benchmarks/bench_ngrams.py -f data_input/test.csv -c Review -x 50
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import pandas as pd
+
+from processing.ngrams import NgramCreator
+from processing.normalizer import TextNormalizer
+from processing.tokenstore import TokenStore
+
+ORDERS = (1, 2, 3)
+
+
+def _time_count(store, n_jobs, repeat):
+    best, tables = float("inf"), None
+    for _ in range(repeat):
+        ng = NgramCreator(store, n_jobs=n_jobs)
+        start = time.perf_counter()
+        ng.compute_many(ORDERS)
+        best = min(best, time.perf_counter() - start)
+        tables = ng.tables
+    return best, tables
+
+
+def _same_tables(a, b):
+    return all(
+        np.array_equal(a[n].keys, b[n].keys)
+        and np.array_equal(a[n].counts, b[n].counts)
+        and np.array_equal(a[n].first, b[n].first)
+        for n in ORDERS
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de n-gramas en paralelo")
+    parser.add_argument("-f", "--File", default="data_input/test.csv")
+    parser.add_argument("-c", "--Column_name", default="Review")
+    parser.add_argument("-l", "--Language", default="spanish")
+    parser.add_argument("-x", "--scale", type=int, default=50, help="Veces que se replica el corpus")
+    parser.add_argument("-j", "--jobs", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--repeat", type=int, default=3, help="Se toma el mejor de N intentos")
+    args = parser.parse_args()
+
+    texts = pd.read_csv(args.File, usecols=[args.Column_name])[args.Column_name].astype(str).tolist()
+    cleaned = TextNormalizer(args.Language).transform(texts * args.scale)
+    store = TokenStore.from_documents(cleaned)
+    print(f"Corpus: {store.n_docs} documentos, {len(store)} tokens, {len(store.vocab)} palabras "
+          f"({os.cpu_count()} núcleos)")
+
+    t_serial, reference = _time_count(store, 1, args.repeat)
+    for n_jobs in args.jobs:
+        elapsed, tables = (t_serial, reference) if n_jobs == 1 else _time_count(store, n_jobs, args.repeat)
+        assert _same_tables(tables, reference), f"n_jobs={n_jobs} no coincide con el conteo serial"
+        print(f"{n_jobs:3d} procesos: {elapsed:7.2f} s  {len(store) / elapsed / 1e6:7.2f} M tokens/s"
+              f"  (x{t_serial / elapsed:.2f})")
+
+
+if __name__ == "__main__":
+    main()
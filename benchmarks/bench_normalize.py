@@ -0,0 +1,77 @@
+"""
+Benchmark de throughput de la limpieza de texto:
+    - loop por documento (clean() + remove_stopwords() originales)
+    - TextNormalizer sobre la columna completa (object y string[pyarrow])
+    - TextNormalizer con el backend de Python puro (sin pyarrow)
+
+Comprueba además que las tres salidas sean idénticas.
+
+Uso (desde la raíz del proyecto):
+    python benchmarks/bench_normalize.py -f data_input/test.csv -c Review -x 100
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pandas as pd
+
+from processing.preprocess import TextPreprocessor
+
+
+def _time_preprocessor(texts, language, vectorized):
+    pre = TextPreprocessor(texts, language=language, lemma=False, vectorized=vectorized)
+    start = time.perf_counter()
+    pre.clean().remove_stopwords()
+    return time.perf_counter() - start, pre.cleaned
+
+
+def _time_normalizer(texts, language, use_arrow=None):
+    from nltk.corpus import stopwords
+    from processing.normalizer import TextNormalizer
+
+    column = pd.Series(texts, dtype="string[pyarrow]") if use_arrow else texts
+    normalizer = TextNormalizer(language, stopwords=set(stopwords.words(language)), use_arrow=use_arrow)
+    start = time.perf_counter()
+    result = normalizer.transform(column)
+    return time.perf_counter() - start, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de TextNormalizer")
+    parser.add_argument("-f", "--File", default="data_input/test.csv")
+    parser.add_argument("-c", "--Column_name", default="Review")
+    parser.add_argument("-l", "--Language", default="spanish")
+    parser.add_argument("-x", "--scale", type=int, default=100, help="Veces que se replica el corpus")
+    args = parser.parse_args()
+
+    texts = pd.read_csv(args.File, usecols=[args.Column_name])[args.Column_name].astype(str).tolist()
+    texts = texts * args.scale
+    n_docs = len(texts)
+    n_mb = sum(len(t) for t in texts) / 1e6
+    print(f"Corpus: {n_docs} documentos, {n_mb:.1f} M caracteres")
+
+    t_loop, ref = _time_preprocessor(texts, args.Language, vectorized=False)
+    print(f"loop por documento : {t_loop:7.2f} s  {n_docs / t_loop:10.0f} docs/s")
+
+    t_vec, out = _time_preprocessor(texts, args.Language, vectorized=True)
+    assert out == ref, "TextNormalizer (object) no coincide con el loop original"
+    print(f"TextNormalizer     : {t_vec:7.2f} s  {n_docs / t_vec:10.0f} docs/s  (x{t_loop / t_vec:.1f})")
+
+    t_py, out = _time_normalizer(texts, args.Language, use_arrow=False)
+    assert out == ref, "TextNormalizer (Python) no coincide con el loop original"
+    print(f"TextNormalizer/py  : {t_py:7.2f} s  {n_docs / t_py:10.0f} docs/s  (x{t_loop / t_py:.1f})")
+
+    try:
+        t_arrow, out = _time_normalizer(texts, args.Language, use_arrow=True)
+    except ImportError:
+        print("pyarrow no disponible, se omite string[pyarrow]")
+        return
+    assert out == ref, "TextNormalizer (pyarrow) no coincide con el loop original"
+    print(f"TextNormalizer/pa  : {t_arrow:7.2f} s  {n_docs / t_arrow:10.0f} docs/s  (x{t_loop / t_arrow:.1f})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""
+Memoria y concordancia de tópicos con embeddings en menor precisión.
+
+Sobre un corpus de referencia:
+    1. Obtiene los embeddings float32 (reutiliza el EmbeddingStore de la caché).
+    2. Para float16 e int8 mide la memoria de la matriz y la similitud
+       coseno mínima contra float32.
+    3. Ajusta BERTopic con cada precisión (UMAP con semilla fija) y compara
+       la asignación de tópicos contra float32 con Adjusted Rand Index.
+       Como referencia del ruido propio del modelo, también se reporta el
+       ARI de float32 con otra semilla de UMAP.
+
+Uso (desde la raíz del proyecto):
+    python benchmarks/bench_precision.py -f data_input/test.csv -c Review -n 5000
+"""
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import pandas as pd
+
+from processing.embedding_store import EmbeddingStore
+from processing.encoding import EmbeddingEncoder
+from processing.models import resolve_revision
+from processing.normalizer import TextNormalizer
+from processing.quantization import as_float32, quantize
+
+MODEL = "sentence-transformers/all-mpnet-base-v2"
+
+
+def _fit_topics(docs, embeddings, language, seed):
+    from bertopic import BERTopic
+    from umap import UMAP
+
+    umap_model = UMAP(n_neighbors=15, n_components=5, min_dist=0.0, metric="cosine", random_state=seed)
+    model = BERTopic(language=language, umap_model=umap_model, verbose=False)
+    topics, _ = model.fit_transform(docs, embeddings)
+    return np.asarray(topics)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de precisión de embeddings")
+    parser.add_argument("-f", "--File", default="data_input/test.csv")
+    parser.add_argument("-c", "--Column_name", default="Review")
+    parser.add_argument("-l", "--Language", default="spanish")
+    parser.add_argument("-n", "--n-docs", type=int, default=5000)
+    parser.add_argument("--cache-dir", default=".nlp_cache")
+    args = parser.parse_args()
+
+    from sklearn.metrics import adjusted_rand_score
+
+    texts = pd.read_csv(args.File, usecols=[args.Column_name])[args.Column_name].astype(str).tolist()
+    docs = TextNormalizer(args.Language).transform(texts[:args.n_docs])
+
+    revision = resolve_revision(MODEL)
+    store = EmbeddingStore(os.path.join(args.cache_dir, "embeddings"), MODEL, revision)
+    reference = store.get(docs, EmbeddingEncoder(MODEL, revision=revision, language=args.Language).encode)
+    print(f"Corpus: {len(docs)} documentos, embeddings {reference.shape[1]}d")
+
+    topics_ref = _fit_topics(docs, np.asarray(reference), args.Language, seed=42)
+    topics_seed = _fit_topics(docs, np.asarray(reference), args.Language, seed=7)
+    print(f"{'precisión':10s} {'MB':>8s} {'ahorro':>7s} {'coseno mín':>11s} {'ARI vs float32':>15s}")
+    print(f"{'float32':10s} {reference.nbytes / 1e6:8.1f} {'-':>7s} {1.0:11.5f} "
+          f"{adjusted_rand_score(topics_ref, topics_seed):15.4f}  (otra semilla de UMAP)")
+
+    ref = np.asarray(reference, dtype=np.float32)
+    ref_unit = ref / np.maximum(np.linalg.norm(ref, axis=1, keepdims=True), 1e-12)
+    for precision in ("float16", "int8"):
+        quantized = quantize(reference, precision)
+        restored = as_float32(quantized)
+        unit = restored / np.maximum(np.linalg.norm(restored, axis=1, keepdims=True), 1e-12)
+        min_cos = float((unit * ref_unit).sum(axis=1).min())
+
+        topics = _fit_topics(docs, restored, args.Language, seed=42)
+        ari = adjusted_rand_score(topics_ref, topics)
+        print(f"{precision:10s} {quantized.nbytes / 1e6:8.1f} {reference.nbytes / quantized.nbytes:6.1f}x "
+              f"{min_cos:11.5f} {ari:15.4f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+"""
+Tiempo de ajuste y RSS pico de TopicModeler con y sin la matriz de
+probabilidades de tópicos.
+
+Cada modo corre en su propio proceso (el RSS pico de un proceso no baja):
+    - eager: calculate_probabilities=True, matriz documentos x tópicos
+      completa durante el ajuste (comportamiento anterior)
+    - lazy:  calculate_probabilities=False (por defecto) y, después,
+      get_probabilities() para una muestra de documentos
+
+Las dos rutas no dan los mismos valores (all_points_membership_vectors en el
+ajuste, membership_vector fuera de muestra en lazy): el modo eager calcula
+también la muestra por la ruta lazy y reporta la diferencia absoluta máxima
+y la fracción de filas cuyo tópico más probable cambia.
+
+Los embeddings salen del EmbeddingStore de la caché (se codifican una sola
+vez antes de medir), así que ambos modos miden lo mismo salvo las
+probabilidades.
+
+Uso (desde la raíz del proyecto):
+    python benchmarks/bench_probabilities.py -f data_input/test.csv -c Review -n 20000
+"""
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import pandas as pd
+
+from processing.normalizer import TextNormalizer
+
+
+def _load_docs(args):
+    texts = pd.read_csv(args.File, usecols=[args.Column_name])[args.Column_name].astype(str).tolist()
+    return TextNormalizer(args.Language).transform(texts[:args.n_docs])
+
+
+def _peak_rss_mb() -> float:
+    # ru_maxrss está en KB en Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def _run_mode(args):
+    from processing.topics import TopicModeler
+
+    tm = TopicModeler(_load_docs(args), language=args.Language,
+                      embedding_cache_dir=os.path.join(args.cache_dir, "embeddings"),
+                      calculate_probabilities=args.mode == "eager")
+    tm._deduplicate()
+    tm._compute_embeddings()
+    rss_before = _peak_rss_mb()
+
+    start = time.perf_counter()
+    tm._fit_bertopic()
+    fit_seconds = time.perf_counter() - start
+
+    sample = np.random.default_rng(0).choice(len(tm.docs), size=min(args.sample, len(tm.docs)), replace=False)
+    start = time.perf_counter()
+    probs = tm.get_probabilities(sample)
+    probs_seconds = time.perf_counter() - start
+
+    result = {
+        "fit_seconds": fit_seconds,
+        "probs_seconds": probs_seconds,
+        "rss_before": rss_before,
+        "rss_peak": _peak_rss_mb(),
+        "probs_shape": list(probs.shape),
+        "n_topics": len(set(tm.topics)),
+    }
+    if args.mode == "eager":
+        # Las mismas filas por la ruta lazy (membership_vector), después de medir el RSS
+        full, tm.probs = tm.probs, None
+        lazy = tm.get_probabilities(sample)
+        tm.probs = full
+        result["max_abs_diff"] = float(np.abs(probs - lazy).max())
+        result["argmax_changed"] = float(np.mean(probs.argmax(axis=1) != lazy.argmax(axis=1)))
+    print(json.dumps(result))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de probabilidades de tópicos")
+    parser.add_argument("-f", "--File", default="data_input/test.csv")
+    parser.add_argument("-c", "--Column_name", default="Review")
+    parser.add_argument("-l", "--Language", default="spanish")
+    parser.add_argument("-n", "--n-docs", type=int, default=20000)
+    parser.add_argument("--sample", type=int, default=1000, help="Documentos para get_probabilities()")
+    parser.add_argument("--cache-dir", default=".nlp_cache")
+    parser.add_argument("--mode", choices=["eager", "lazy"], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.mode:
+        _run_mode(args)
+        return
+
+    # Codificar una vez para que ambos modos lean los embeddings de la caché
+    from processing.embedding_store import EmbeddingStore
+    from processing.encoding import EmbeddingEncoder
+    from processing.models import resolve_revision
+    from processing.topics import TopicModeler
+
+    docs = _load_docs(args)
+    model = TopicModeler.DEFAULT_EMBEDDING_MODEL
+    revision = resolve_revision(model)
+    EmbeddingStore(os.path.join(args.cache_dir, "embeddings"), model, revision).get(
+        docs, EmbeddingEncoder(model, revision=revision, language=args.Language).encode)
+    print(f"Corpus: {len(docs)} documentos")
+
+    print(f"{'modo':6s} {'ajuste':>9s} {'probs':>9s} {'RSS antes':>10s} {'RSS pico':>10s} {'aumento':>9s}  tópicos")
+    for mode in ("eager", "lazy"):
+        out = subprocess.run([sys.executable, os.path.abspath(__file__), *sys.argv[1:], "--mode", mode],
+                             capture_output=True, text=True, check=True)
+        r = json.loads(out.stdout.strip().splitlines()[-1])
+        print(f"{mode:6s} {r['fit_seconds']:8.1f}s {r['probs_seconds']:8.2f}s {r['rss_before']:8.0f}MB "
+              f"{r['rss_peak']:8.0f}MB {r['rss_peak'] - r['rss_before']:7.0f}MB  {r['n_topics']}"
+              f"  (probs {'x'.join(map(str, r['probs_shape']))})")
+        if "max_abs_diff" in r:
+            print(f"       eager vs lazy en la muestra: diferencia máx. {r['max_abs_diff']:.4f}, "
+                  f"tópico más probable distinto en {r['argmax_changed']:.1%} de las filas")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""
+Consultas por tópico: BERTopic directo vs TopicIndex.
+
+Con un modelo BERTopic de K tópicos (corpus sintético, PCA + KMeans para
+tener exactamente K tópicos sin depender de HDBSCAN) mide el patrón de
+consultas del pipeline:
+    - ablación: tabla de tópicos + keywords de cada tópico
+    - reporte: documento representativo de cada tópico
+    - outliers: keywords y documentos representativos del tópico -1,
+      miembros del tópico -1
+pidiéndoselas a BERTopic en cada consulta (ruta anterior) y con un
+TopicIndex construido una vez (tiempo de construcción incluido).
+
+Uso (desde la raíz del proyecto):
+    python benchmarks/bench_topic_index.py -k 100 300 500 -n 50000
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from processing.topic_index import TopicIndex
+
+
+def _synthetic_corpus(n_docs: int, n_topics: int, dim: int, rng):
+    """Documentos con vocabulario propio por tópico y embeddings agrupados."""
+    labels = rng.integers(0, n_topics, n_docs)
+    vocab = [[f"t{t}w{j}" for j in range(30)] for t in range(n_topics)]
+    shared = [f"comun{j}" for j in range(200)]
+    docs = [" ".join(rng.choice(vocab[t], 8).tolist() + rng.choice(shared, 4).tolist()) for t in labels]
+    centers = rng.normal(size=(n_topics, dim)).astype(np.float32)
+    embeddings = centers[labels] + 0.1 * rng.normal(size=(n_docs, dim)).astype(np.float32)
+    return docs, embeddings
+
+
+def _old_path(model, df_docs):
+    info = model.get_topic_info()
+    topic_ids = info["Topic"].tolist()
+    words = {t: model.get_topic(t) for t in topic_ids if t != -1}
+    rep_docs = {t: model.get_representative_docs().get(t, [])[:1] for t in topic_ids if t != -1}
+    outliers = df_docs[df_docs["topic"] == -1]
+    return words, rep_docs, model.get_topic(-1), model.get_representative_docs().get(-1, []), outliers
+
+
+def _index_path(index: TopicIndex, df_docs):
+    words = {t: index.get_keywords(t) for t in index.topic_ids if t != -1}
+    rep_docs = {t: index.get_representative_docs(t, 1) for t in index.topic_ids if t != -1}
+    outliers = df_docs.iloc[index.members(-1)]
+    return words, rep_docs, index.get_keywords(-1), index.get_representative_docs(-1), outliers
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de TopicIndex")
+    parser.add_argument("-k", "--topics", type=int, nargs="+", default=[100, 300, 500])
+    parser.add_argument("-n", "--n-docs", type=int, default=50000)
+    parser.add_argument("--dim", type=int, default=64)
+    args = parser.parse_args()
+
+    import pandas as pd
+    from bertopic import BERTopic
+    from sklearn.cluster import KMeans
+    from sklearn.decomposition import PCA
+
+    rng = np.random.default_rng(0)
+    print(f"{'tópicos':>8s} {'BERTopic':>10s} {'índice':>10s} {'(construir)':>12s} {'aceleración':>12s}")
+    for n_topics in args.topics:
+        docs, embeddings = _synthetic_corpus(args.n_docs, n_topics, args.dim, rng)
+        model = BERTopic(umap_model=PCA(n_components=10),
+                         hdbscan_model=KMeans(n_clusters=n_topics, n_init=1, random_state=0))
+        topics, _ = model.fit_transform(docs, embeddings)
+        df_docs = pd.DataFrame({"doc_id": range(len(docs)), "text": docs, "topic": topics})
+
+        start = time.perf_counter()
+        _old_path(model, df_docs)
+        t_old = time.perf_counter() - start
+
+        start = time.perf_counter()
+        index = TopicIndex(model.get_topic_info(), model.get_topics(), model.get_representative_docs(),
+                           topics, embeddings)
+        t_build = time.perf_counter() - start
+        _index_path(index, df_docs)
+        t_index = time.perf_counter() - start
+
+        print(f"{n_topics:8d} {t_old:9.3f}s {t_index:9.3f}s {t_build:11.3f}s {t_old / t_index:11.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,11 +2,12 @@ from utils.color_palettes import COLOR_SCHEMES
 class Config:
     ALLOWED_PALETTES = set(COLOR_SCHEMES.keys())
 
-    def __init__(self, file_path, column, title, palette):
+    def __init__(self, file_path, column, title, palette, metadata_columns=None):
         self.file_path = file_path
         self.column = column
         self.title = title
         self.palette = palette
+        self.metadata_columns = list(metadata_columns or [])
         self._validate()
 
     def _validate(self):
@@ -20,14 +21,18 @@ class Config:
 
     def _validate_file(self):
         import os
+        from processing.ingest import SUPPORTED_FORMATS
         assert isinstance(self.file_path, str) and self.file_path.strip(), "La ruta del archivo debe de ser un string"
         assert os.path.isfile(self.file_path), f"Archivo no encontrado: {self.file_path}"
-        assert self.file_path.lower().endswith((".csv",)), "Error. Formato soportado: .csv"
+        assert self.file_path.lower().endswith(tuple(SUPPORTED_FORMATS)), f"Error. Formatos soportados: {sorted(SUPPORTED_FORMATS)}"
 
     def _validate_column(self):
-        import pandas as pd
-        df = pd.read_csv(self.file_path)
-        assert self.column in df.columns, f'No se encontró la columna. Columnas disponibles: {list(df.columns)}'
+        # Solo se lee el encabezado / esquema, no el archivo completo
+        from processing.ingest import read_columns
+        columns = read_columns(self.file_path)
+        assert self.column in columns, f'No se encontró la columna. Columnas disponibles: {columns}'
+        missing = [c for c in self.metadata_columns if c not in columns]
+        assert not missing, f'No se encontraron las columnas de metadatos {missing}. Columnas disponibles: {columns}'
 
     def _validate_palette(self):
         assert self.palette in self.ALLOWED_PALETTES, f"Paleta inválida. Opciones: {self.ALLOWED_PALETTES}"
\ No newline at end of file
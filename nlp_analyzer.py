@@ -1,36 +1,97 @@
 import argparse
-import pandas as pd
-import base64
 import logging
-import io
+import os
+import time
 
-from processing.preprocess import TextPreprocessor
-from processing.ngrams import NgramCreator
-from processing.wordcloud import WordCloudWrapper
-from processing.topics import TopicModeler
-from processing.outliers import OutlierAnalyzer
-from processing.visualization import Visualization
-from processing.ablation import TopicAblation
-from web_report.generator import WebReport
-import matplotlib
+# Los módulos pesados (pandas, spaCy, torch, BERTopic, UMAP, sklearn, plotly,
+# matplotlib) se importan dentro de run_pipeline, así --help y los errores
+# de argumentos responden sin cargarlos.
 
-matplotlib.use("Agg")
+# Reparto de --cache-max-mb entre las cachés de cache_dir (la suma es 1):
+# los embeddings ocupan más por texto que los tokens preprocesados y las
+# frecuencias de la WordCloud
+CACHE_SHARES = {"embeddings": 0.6, "preprocess": 0.3, "wordcloud": 0.1}
 
-def fig_to_base64(fig):
-    """Convierte figura matplotlib a base64 para insertarla al HTML."""
-    buf = io.BytesIO()
-    fig.savefig(buf, format="png", bbox_inches="tight")
-    buf.seek(0)
-    return base64.b64encode(buf.getvalue()).decode("utf-8")
+
+def cache_budget(cache_max_mb: int, namespace: str) -> int:
+    """Bytes de cache_max_mb que le tocan a la caché namespace."""
+    return int(cache_max_mb * 1024 ** 2 * CACHE_SHARES[namespace])
+
+
+def log_dedup(log, stage, deduplicator, seconds):
+    """Reporta el ratio de duplicados de una etapa y el tiempo ahorrado (estimado)."""
+    if deduplicator is None:
+        return
+    n_docs, n_unique = deduplicator.n_docs, deduplicator.n_unique
+    # Tiempo por texto único * documentos que no se procesaron
+    saved = seconds / n_unique * (n_docs - n_unique)
+    log.info("Dedup (%s): %d documentos -> %d únicos (%.1f%% duplicados), ~%.1f s ahorrados",
+             stage, n_docs, n_unique, deduplicator.ratio * 100, saved)
 
 
 def run_pipeline(dataset_path: str,
                  text_column: str,
                  language: str,
                  palette: str,
-                 title: str):
+                 title: str,
+                 batch_size: int = 256,
+                 n_process: int = 1,
+                 chunksize: int | None = None,
+                 dedup: bool = False,
+                 cache_dir: str | None = ".nlp_cache",
+                 cache_max_mb: int = 2048,
+                 metadata_columns: list[str] | None = None,
+                 approx_ngrams: bool = False,
+                 sketch_capacity: int = 100_000,
+                 ngram_jobs: int = 1,
+                 render_jobs: int = 1,
+                 stage_workers: int = 4,
+                 token_budget: int = 16384,
+                 encode_workers: int = 1,
+                 encode_threads: int | None = None,
+                 embedding_precision: str = "float32",
+                 online_topics: bool = False,
+                 model_dir: str | None = None,
+                 ablation_max_topics: int = 1,
+                 ablation_min_share: float | None = None,
+                 shared_knn: bool = True,
+                 viz_landmarks: int | None = 20000,
+                 output_path: str = "reporte_nlp.html"):
     """
     Ejecuta TODO el pipeline de NLP y genera un reporte HTML interactivo.
+
+    batch_size y n_process controlan la lematización en lotes de spaCy.
+    Con chunksize se lee el archivo por bloques (streaming): n-gramas y
+    wordcloud se calculan de forma incremental sin guardar la lista de tokens.
+    Con dedup los textos idénticos se lematizan, embeben y reducen una sola vez.
+    El preprocesamiento, el layout de la wordcloud y los embeddings se guardan
+    en cache_dir (None desactiva la caché).
+    El archivo puede ser CSV, Parquet, Feather o JSONL; solo se cargan la
+    columna de texto y metadata_columns (que se muestran en las gráficas 3D).
+    Con approx_ngrams los n-gramas se cuentan con un sketch de memoria fija
+    (sketch_capacity claves por orden) y las gráficas muestran la cota de error.
+    ngram_jobs reparte el conteo de n-gramas en varios procesos.
+    Las gráficas de n-gramas y la wordcloud se dibujan en render_jobs
+    procesos mientras se entrena BERTopic (0 = en un hilo del proceso principal).
+    Las etapas corren como un grafo de dependencias (processing/scheduler.py):
+    las independientes se ejecutan a la vez en stage_workers hilos, y al final
+    se registra el tiempo de cada etapa y la ruta crítica.
+    Los embeddings se codifican en lotes de hasta token_budget tokens, con
+    encode_workers procesos de CPU y encode_threads hilos de torch cada uno.
+    embedding_precision (float32, float16, int8) es la precisión con la que se
+    guarda la matriz de embeddings entre etapas.
+    Con online_topics BERTopic se ajusta por lotes con componentes
+    incrementales (IncrementalPCA, MiniBatchKMeans, OnlineCountVectorizer).
+    Con model_dir el modelo de tópicos ajustado se guarda ahí (ver run_transform).
+    La ablación conserva en cada tópico las keywords presentes en a lo más
+    ablation_max_topics tópicos o con al menos ablation_min_share de su peso
+    c-TF-IDF total.
+    Con shared_knn el grafo de vecinos se calcula una vez y lo usan el UMAP de
+    BERTopic, UMAP 3D y t-SNE 3D.
+    Con más de viz_landmarks textos únicos, UMAP 3D y t-SNE 3D se ajustan sobre
+    una muestra de ese tamaño estratificada por tópico y el resto de los puntos
+    se ubica a partir de ella (None = ajustar sobre todos).
+    Devuelve la ruta del reporte (output_path).
     """
     logging.basicConfig(
     level=logging.INFO,
@@ -38,120 +99,341 @@ def run_pipeline(dataset_path: str,
 
     log = logging.getLogger("NLP-Pipeline")
 
-    # --- Cargar dataset ---
-    log.info("Cargando dataset desde %s", dataset_path)
-    df = pd.read_csv(dataset_path)
-    texts = df[text_column].astype(str).tolist()
-
-    # --- PREPROCESAMIENTO ---
-    log.info("Preprocesando texto...")
-    pre = TextPreprocessor(texts, language=language, lemma=True)
-    cleaned_texts, tokens = pre.process_all()
-
+    import matplotlib
+    matplotlib.use("Agg")
+    import pandas as pd
+
+    from processing.preprocess import TextPreprocessor
+    from processing.dedup import DocumentDeduplicator
+    from processing.ngrams import NgramCreator
+    from processing.wordcloud import WordCloudWrapper
+    from processing.topics import TopicModeler
+    from processing.outliers import OutlierAnalyzer
+    from processing.visualization import Visualization
+    from processing.ablation import TopicAblation
+    from processing.ingest import read_table, read_text_chunks
+    from processing.cache import DiskCache
+    from processing.rendering import render_chart
+    from processing.scheduler import StageScheduler
+    from web_report.generator import WebReport
+
+    cache = wc_cache = None
+    if cache_dir:
+        cache = DiskCache(cache_dir, namespace="preprocess", max_bytes=cache_budget(cache_max_mb, "preprocess"))
+        wc_cache = DiskCache(cache_dir, namespace="wordcloud", max_bytes=cache_budget(cache_max_mb, "wordcloud"))
+
+    metadata_columns = [c for c in (metadata_columns or []) if c != text_column]
+
+    # Cada etapa declara los valores que usa y los que produce; StageScheduler
+    # corre a la vez las que no dependen entre sí (n-gramas y wordcloud junto
+    # con BERTopic; ablación, outliers, UMAP y t-SNE entre sí). Las gráficas
+    # de matplotlib se dibujan en render_jobs procesos.
+    scheduler = StageScheduler(max_workers=stage_workers, process_workers=render_jobs)
+
+    if chunksize:
+        # --- STREAMING: cargar + preprocesar + contar por bloques ---
+        def preprocess_stream():
+            log.info("Leyendo %s en bloques de %d filas (streaming)", dataset_path, chunksize)
+            chunks = read_text_chunks(dataset_path, text_column, chunksize)
+            ng = NgramCreator(palette=palette, top_k=10,
+                              approx=approx_ngrams, sketch_capacity=sketch_capacity, n_jobs=ngram_jobs)
+            cleaned_texts = []
+            # Acumula los textos de todos los bloques: cada texto único se lematiza una vez
+            deduplicator = DocumentDeduplicator() if dedup else None
+            stream = TextPreprocessor.stream(chunks, deduplicator=deduplicator, language=language, lemma=True,
+                                             batch_size=batch_size, n_process=n_process, dedup=dedup, cache=cache)
+
+            seconds = 0.0
+            start = time.perf_counter()
+            for i, (cleaned, tokens) in enumerate(stream):
+                seconds += time.perf_counter() - start
+                log.info("Bloque %d: %d documentos", i + 1, len(cleaned))
+                cleaned_texts.extend(cleaned)
+                ng.update(tokens, orders=(1, 2, 3))
+                start = time.perf_counter()
+            if deduplicator is not None and deduplicator.n_docs:
+                log_dedup(log, "lematización", deduplicator, seconds)
+            return cleaned_texts, ng
+
+        def load_metadata():
+            return read_table(dataset_path, metadata_columns) if metadata_columns else None
+
+        def wordcloud_spec(ng):
+            wcw = WordCloudWrapper(title="WordCloud", palette=palette,
+                                   frequencies=ng.word_frequencies(), cache=wc_cache)
+            return wcw.chart_spec()
+
+        scheduler.add("preprocess", preprocess_stream, outputs=("cleaned_texts", "ngram_creator"))
+        scheduler.add("metadata", load_metadata, outputs=("df_meta",))
+        scheduler.add("wordcloud", wordcloud_spec, inputs=("ngram_creator",), outputs=("wordcloud_spec",))
+    else:
+        # --- Cargar dataset (solo las columnas necesarias) ---
+        def load():
+            log.info("Cargando dataset desde %s", dataset_path)
+            df = read_table(dataset_path, [text_column] + metadata_columns)
+            texts = df[text_column].astype(str).tolist()
+            return texts, (df[metadata_columns] if metadata_columns else None)
+
+        # --- PREPROCESAMIENTO ---
+        def preprocess(texts):
+            log.info("Preprocesando texto...")
+            pre = TextPreprocessor(texts, language=language, lemma=True,
+                                   batch_size=batch_size, n_process=n_process, dedup=dedup,
+                                   cache=cache)
+            start = time.perf_counter()
+            cleaned_texts, tokens = pre.process_all()
+            log_dedup(log, "lematización", pre.deduplicator, time.perf_counter() - start)
+            log.info("TokenStore: %d tokens, %d palabras distintas, %.1f MB (como lista de str: ~%.1f MB)",
+                     len(tokens), len(tokens.vocab), tokens.nbytes / 1e6, tokens.list_nbytes() / 1e6)
+            return cleaned_texts, tokens
+
+        def ngram_creator(tokens):
+            return NgramCreator(tokens=tokens, palette=palette, top_k=10,
+                                approx=approx_ngrams, sketch_capacity=sketch_capacity, n_jobs=ngram_jobs)
+
+        def wordcloud_spec(tokens):
+            return WordCloudWrapper(title="WordCloud", tokens=tokens, palette=palette, cache=wc_cache).chart_spec()
+
+        scheduler.add("load", load, outputs=("texts", "df_meta"))
+        scheduler.add("preprocess", preprocess, inputs=("texts",), outputs=("cleaned_texts", "tokens"))
+        scheduler.add("ngram_setup", ngram_creator, inputs=("tokens",), outputs=("ngram_creator",))
+        scheduler.add("wordcloud", wordcloud_spec, inputs=("tokens",), outputs=("wordcloud_spec",))
 
     # --- NGRAMS ---
-    log.info("Generando N-grams...")
-    ng = NgramCreator(tokens=tokens, palette=palette, top_k=10)
-    bigrams = ng.compute(2)
-    trigrams = ng.compute(3)
-
-    bigram_b64 = ng.plot_to_base64(2)
-    trigram_b64 = ng.plot_to_base64(3)
-
-    # --- WORDCLOUD ---
-    log.info("Creando WordCloud...")
-    wcw = WordCloudWrapper(title="WordCloud", tokens=tokens, palette=palette)
-    wc = wcw.create_cloud()
-    fig_wc = wcw.plot(wc) 
-    wc_b64 = fig_to_base64(fig_wc)
+    def ngrams(ng):
+        log.info("Generando N-grams...")
+        ng.compute_many((2, 3))
+        if approx_ngrams:
+            for n in (2, 3):
+                floor, total = ng.error_bound(n)
+                log.info("%d-gramas aproximados: %d apariciones, error máximo por conteo %d (capacidad %d)",
+                         n, total, floor, sketch_capacity)
+        return ng.chart_spec(2), ng.chart_spec(3)
+
+    scheduler.add("ngrams", ngrams, inputs=("ngram_creator",), outputs=("bigrams_spec", "trigrams_spec"))
+
+    # --- GRÁFICAS (n-gramas + WordCloud), en paralelo con el modelado de tópicos ---
+    for chart in ("bigrams", "trigrams", "wordcloud"):
+        scheduler.add(f"{chart}_chart", render_chart, inputs=(f"{chart}_spec",), outputs=(f"{chart}_png",),
+                      process=render_jobs > 0)
 
     # --- TOPIC MODELING ---
-    log.info("Entrenando modelo BERTopic...")
-    tm = TopicModeler(cleaned_texts, language=language)
-    tm.fit()
-    df_topics = tm.get_topic_info()
-    df_docs = tm.get_documents_dataframe()
-    embeddings = tm.get_embeddings()
+    def fit_topics(cleaned_texts, df_meta):
+        log.info("Entrenando modelo BERTopic...")
+        tm = TopicModeler(cleaned_texts, language=language, dedup=dedup,
+                          embedding_cache_dir=os.path.join(cache_dir, "embeddings") if cache_dir else None,
+                          embedding_cache_max_bytes=cache_budget(cache_max_mb, "embeddings"),
+                          token_budget=token_budget, encode_workers=encode_workers,
+                          encode_threads=encode_threads, embedding_precision=embedding_precision,
+                          online=online_topics, shared_knn=shared_knn,
+                          visualization_landmarks=viz_landmarks)
+        start = time.perf_counter()
+        tm.fit()
+        log_dedup(log, "embeddings + BERTopic", tm.deduplicator, time.perf_counter() - start)
+        if model_dir:
+            log.info("Guardando modelo de tópicos en %s", model_dir)
+            tm.save(model_dir)
+        # Keywords, documentos representativos y miembros por tópico, una sola vez
+        index = tm.get_index()
+        df_docs = tm.get_documents_dataframe()
+        if df_meta is not None:
+            for col in metadata_columns:
+                df_docs[col] = df_meta[col].to_numpy()
+        return tm, index, tm.get_topic_info(), df_docs
+
+    scheduler.add("topics", fit_topics, inputs=("cleaned_texts", "df_meta"),
+                  outputs=("topic_modeler", "topic_index", "df_topics", "df_docs"))
 
     # --- ABLACIÓN DE TÓPICOS ---
-    log.info("Haciendo ablación de tópicos...")
-    ab = TopicAblation(tm)
-    ablation_result = ab.run_all(top_n=None)
-    ablated_keywords = ablation_result["ablated_keywords"]
-
-    # Crear tabla de ablación con columnas completas
-    df_topics_ablated = df_topics.copy()
-    rep_docs = {
-    topic_id: tm.get_representative_docs(topic_id, top_n=1)[0]
-    for topic_id in df_topics["Topic"].tolist()
-    if topic_id != -1}
-
-    # Agregar las palabras exclusivas como nueva columna Representation
-    df_topics_ablated["Representation"] = df_topics_ablated["Topic"].apply(
-        lambda topic_id: ", ".join(ablated_keywords.get(topic_id, []))
-                        if topic_id != -1 else "(outlier)")
-
-    # Agregar el documento más representativo (ya calculado en rep_docs)
-    df_topics_ablated["Representative_Docs"] = df_topics_ablated["Topic"].apply(
-        lambda topic_id: rep_docs.get(topic_id, ""))
-    
-    # --- OUTLIERS ---
-    log.info("Analizando el Tópico -1 (Outliers)...")
-    outlier_analyzer = OutlierAnalyzer(df_docs, tm.topic_model)
-    outlier_report = outlier_analyzer.run_outlier_analysis(top_n_keywords=15, top_n_docs=3)
-    
-    # Prepara un DataFrame para mostrar el resumen del outlier en el reporte
-    outlier_summary_data = {
-        "Métrica": [
-            "Total de Outliers (Tópico -1)", 
-            "Proporción (%)", 
-            "Longitud Promedio (Outliers)", 
-            "Longitud Promedio (Temáticos)",
-            "Palabras Clave (Top 3)",
-            "Documento Representativo (Ejemplo)"
-        ],
-        "Valor": [
-            outlier_report["total_outliers"],
-            f'{outlier_report["proportion"]:.2f}%',
-            f'{outlier_report["length_analysis"]["avg_outlier_length_words"]} palabras',
-            f'{outlier_report["length_analysis"]["avg_thematic_length_words"]} palabras',
-            ", ".join([k[0] for k in outlier_report["keyword_summary"][:3]]),
-            outlier_report["doc_examples"][0] if outlier_report["doc_examples"] else "N/A"
-        ]
-    }
-    df_outlier_summary = pd.DataFrame(outlier_summary_data)
+    def ablation(tm, index, df_topics):
+        log.info("Haciendo ablación de tópicos...")
+        ab = TopicAblation(tm)
+        ablation_result = ab.run_all(top_n=None, max_topics=ablation_max_topics, min_share=ablation_min_share)
+        ablated_keywords = ablation_result["ablated_keywords"]
+
+        # Crear tabla de ablación con columnas completas
+        df_topics_ablated = df_topics.copy()
+        rep_docs = {
+        topic_id: index.get_representative_docs(topic_id, top_n=1)[0]
+        for topic_id in index.topic_ids
+        if topic_id != -1}
+
+        # Agregar las palabras exclusivas como nueva columna Representation
+        df_topics_ablated["Representation"] = df_topics_ablated["Topic"].apply(
+            lambda topic_id: ", ".join(ablated_keywords.get(topic_id, []))
+                            if topic_id != -1 else "(outlier)")
+
+        # Agregar el documento más representativo (ya calculado en rep_docs)
+        df_topics_ablated["Representative_Docs"] = df_topics_ablated["Topic"].apply(
+            lambda topic_id: rep_docs.get(topic_id, ""))
+        return df_topics_ablated
+
+    scheduler.add("ablation", ablation, inputs=("topic_modeler", "topic_index", "df_topics"),
+                  outputs=("df_topics_ablated",))
 
+    # --- OUTLIERS ---
+    def outliers(df_docs, index):
+        log.info("Analizando el Tópico -1 (Outliers)...")
+        outlier_analyzer = OutlierAnalyzer(df_docs, index)
+        outlier_report = outlier_analyzer.run_outlier_analysis(top_n_keywords=15, top_n_docs=3)
+
+        # Prepara un DataFrame para mostrar el resumen del outlier en el reporte
+        outlier_summary_data = {
+            "Métrica": [
+                "Total de Outliers (Tópico -1)",
+                "Proporción (%)",
+                "Longitud Promedio (Outliers)",
+                "Longitud Promedio (Temáticos)",
+                "Palabras Clave (Top 3)",
+                "Documento Representativo (Ejemplo)"
+            ],
+            "Valor": [
+                outlier_report["total_outliers"],
+                f'{outlier_report["proportion"]:.2f}%',
+                f'{outlier_report["length_analysis"]["avg_outlier_length_words"]} palabras',
+                f'{outlier_report["length_analysis"]["avg_thematic_length_words"]} palabras',
+                ", ".join([k[0] for k in outlier_report["keyword_summary"][:3]]),
+                outlier_report["doc_examples"][0] if outlier_report["doc_examples"] else "N/A"
+            ]
+        }
+        return pd.DataFrame(outlier_summary_data)
+
+    scheduler.add("outliers", outliers, inputs=("df_docs", "topic_index"), outputs=("df_outlier_summary",))
 
     # --- VISUALIZACIÓN (UMAP + TSNE 3D) ---
-    log.info("Reduciendo dimensiones con UMAP y TSNE...")
-    viz = Visualization(embeddings, df_docs, palette=palette)
-    fig_umap, fig_tsne = viz.generate_both()
+    def visualization(tm, df_docs):
+        log.info("Reduciendo dimensiones con UMAP y TSNE...")
+        embeddings = tm.get_embeddings()
+        viz = Visualization(embeddings, df_docs, palette=palette, inverse=tm.get_inverse_index(),
+                            hover_columns=metadata_columns, neighbor_graph=tm.neighbor_graph,
+                            landmarks=viz_landmarks)
+        if viz.landmark_rows is not None:
+            log.info("UMAP y t-SNE se ajustan sobre %d landmarks (muestra por tópico) de %d textos",
+                     len(viz.landmark_rows), len(embeddings))
+        return viz
+
+    def plots_3d(tm, viz, umap_coords, tsne_coords):
+        viz.set_coordinates("umap", umap_coords)
+        viz.set_coordinates("tsne", tsne_coords)
+        log_dedup(log, "UMAP + t-SNE", tm.deduplicator, viz.timings["umap_3d"] + viz.timings["tsne_3d"])
+        knn_seconds = tm.neighbor_graph.build_seconds if tm.neighbor_graph is not None else 0.0
+        log.info("Reducción de dimensionalidad: grafo kNN %.1f s (%s), UMAP 3D %.1f s, t-SNE 3D %.1f s",
+                 knn_seconds, "compartido" if tm.neighbor_graph is not None else "no compartido",
+                 viz.timings["umap_3d"], viz.timings["tsne_3d"])
+        return viz.plot_umap_3d(), viz.plot_tsne_3d()
+
+    scheduler.add("visualization", visualization, inputs=("topic_modeler", "df_docs"), outputs=("viz",))
+    scheduler.add("umap_3d", lambda viz: viz.compute_umap_3d(), inputs=("viz",), outputs=("umap_coords",))
+    scheduler.add("tsne_3d", lambda viz: viz.compute_tsne_3d(), inputs=("viz",), outputs=("tsne_coords",))
+    scheduler.add("plots_3d", plots_3d, inputs=("topic_modeler", "viz", "umap_coords", "tsne_coords"),
+                  outputs=("fig_umap", "fig_tsne"))
 
     # --- REPORTE ---
-    log.info("Generando reporte HTML final...")
-    report = WebReport(title=title, palette=palette)
-
-    report.add_image("WordCloud general", wc_b64)
-
-    report.add_image("Top 10 bigramas", bigram_b64)
-    report.add_image("Top 10 trigramas", trigram_b64)
+    def build_report(wordcloud_png, bigrams_png, trigrams_png, df_topics, df_topics_ablated,
+                     fig_umap, fig_tsne, df_outlier_summary):
+        log.info("Generando reporte HTML final...")
+        report = WebReport(title=title, palette=palette)
+
+        report.add_image("WordCloud general", wordcloud_png)
+
+        report.add_image("Top 10 bigramas", bigrams_png)
+        report.add_image("Top 10 trigramas", trigrams_png)
+
+        # Agregar tabla de tópicos
+        report.add_table("Resumen de tópicos", df_topics)
+        report.add_table("Tópicos después de Ablación", df_topics_ablated)
+
+
+        # Agregar visualizaciones Plotly
+        report.add_plotly("UMAP 3D de Tópicos", fig_umap)
+        report.add_plotly("t-SNE 3D de Tópicos", fig_tsne)
+
+        report.add_table("Análisis Outliers", df_outlier_summary)
+
+        # Guardar reporte
+        output_dir = os.path.dirname(output_path)
+        if output_dir:
+            os.makedirs(output_dir, exist_ok=True)
+        return report.generate(output_path)
+
+    scheduler.add("report", build_report,
+                  inputs=("wordcloud_png", "bigrams_png", "trigrams_png", "df_topics", "df_topics_ablated",
+                          "fig_umap", "fig_tsne", "df_outlier_summary"),
+                  outputs=("report_path",))
+
+    log.info("Ejecutando %d etapas con %d hilos y %d procesos de gráficas",
+             len(scheduler.stages), stage_workers, render_jobs)
+    report_path = scheduler.run()["report_path"]
+    for line in scheduler.summary():
+        log.info("Etapas: %s", line)
+    print(f"Reporte generado en: {report_path}")
+    return report_path
+
+def run_transform(model_dir: str,
+                  dataset_path: str,
+                  text_column: str,
+                  output_path: str | None = None,
+                  batch_size: int = 256,
+                  n_process: int = 1,
+                  cache_dir: str | None = ".nlp_cache",
+                  cache_max_mb: int = 2048,
+                  token_budget: int = 16384,
+                  encode_workers: int = 1,
+                  encode_threads: int | None = None):
+    """
+    Asigna los tópicos de un modelo guardado (run_pipeline con model_dir) a
+    los textos de un archivo nuevo, sin reajustar el modelo: los textos se
+    limpian igual que en el ajuste y solo se codifican sus embeddings.
+    Escribe un CSV con el texto, el tópico y su nombre (por defecto
+    <archivo>_topicos.csv) y devuelve su ruta.
+    """
+    logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(levelname)s - %(message)s")
 
-    # Agregar tabla de tópicos
-    report.add_table("Resumen de tópicos", df_topics)
-    report.add_table("Tópicos después de Ablación", df_topics_ablated)
+    log = logging.getLogger("NLP-Pipeline")
 
+    from processing.cache import DiskCache
+    from processing.ingest import read_table
+    from processing.preprocess import TextPreprocessor
+    from processing.topics import TopicModeler
 
-    # Agregar visualizaciones Plotly
-    report.add_plotly("UMAP 3D de Tópicos", fig_umap)
-    report.add_plotly("t-SNE 3D de Tópicos", fig_tsne)
+    log.info("Cargando modelo de tópicos desde %s", model_dir)
+    tm = TopicModeler.load(model_dir,
+                           embedding_cache_dir=os.path.join(cache_dir, "embeddings") if cache_dir else None,
+                           embedding_cache_max_bytes=cache_budget(cache_max_mb, "embeddings"),
+                           token_budget=token_budget, encode_workers=encode_workers,
+                           encode_threads=encode_threads)
 
-    report.add_table("Análisis Outliers", df_outlier_summary)
+    log.info("Cargando dataset desde %s", dataset_path)
+    df = read_table(dataset_path, [text_column])
+    texts = df[text_column].astype(str).tolist()
 
-    # Guardar reporte
-    output_path = report.generate("reporte_nlp.html")
-    print(f"Reporte generado en: {output_path}")
+    log.info("Preprocesando texto...")
+    cache = DiskCache(cache_dir, namespace="preprocess",
+                      max_bytes=cache_budget(cache_max_mb, "preprocess")) if cache_dir else None
+    pre = TextPreprocessor(texts, language=tm.language, lemma=True,
+                           batch_size=batch_size, n_process=n_process, dedup=tm.dedup, cache=cache)
+    cleaned_texts, _ = pre.process_all()
+
+    log.info("Asignando tópicos a %d documentos...", len(cleaned_texts))
+    start = time.perf_counter()
+    topics = tm.transform(cleaned_texts)
+    log.info("Tópicos asignados en %.1f s", time.perf_counter() - start)
+
+    names = tm.get_topic_info().set_index("Topic")["Name"]
+    df["topic"] = topics
+    df["topic_name"] = df["topic"].map(names)
+
+    output_path = output_path or os.path.splitext(dataset_path)[0] + "_topicos.csv"
+    output_dir = os.path.dirname(output_path)
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
+    df.to_csv(output_path, index=False)
+    print(f"Tópicos guardados en: {output_path}")
     return output_path
 
+
 def crear_parser():
     parser = argparse.ArgumentParser(
         description='Script de análisis de lenguaje natural (NLP) completamente automatizado, diseñado para ejecutarse desde consola y generar un reporte HTML',
@@ -161,7 +443,7 @@ def crear_parser():
     # Argumentos posicionales
     parser.add_argument(
         '-f','--File',
-        help='Ruta al archivo de entrada'
+        help='Ruta al archivo de entrada (.csv, .parquet, .feather, .jsonl)'
     )
 
     parser.add_argument(
@@ -186,18 +468,340 @@ def crear_parser():
         help='Título del reporte'
     )
 
+    parser.add_argument(
+        '-o', '--output',
+        default='reporte_nlp.html',
+        help='Ruta del reporte HTML generado'
+    )
+
+    parser.add_argument(
+        '-m', '--metadata',
+        nargs='+',
+        default=[],
+        help='Columnas adicionales a cargar (se muestran al pasar el cursor en las gráficas 3D)'
+    )
+
+    parser.add_argument(
+        '--batch-size',
+        type=int,
+        default=256,
+        help='Documentos por lote en la lematización con spaCy'
+    )
+
+    parser.add_argument(
+        '--n-process',
+        type=int,
+        default=1,
+        help='Procesos de spaCy para lematizar (-1 = todos los núcleos)'
+    )
+
+    parser.add_argument(
+        '--chunksize',
+        type=int,
+        default=None,
+        help='Leer y preprocesar el archivo en bloques de N filas (streaming)'
+    )
+
+    parser.add_argument(
+        '--dedup',
+        action='store_true',
+        help='Procesar una sola vez los textos idénticos (lematización, embeddings, UMAP/t-SNE)'
+    )
+
+    parser.add_argument(
+        '--cache-dir',
+        default='.nlp_cache',
+        help='Directorio de la caché (preprocesamiento, wordcloud y embeddings)'
+    )
+
+    parser.add_argument(
+        '--cache-max-mb',
+        type=int,
+        default=2048,
+        help='Tamaño máximo de toda la caché en MB, repartido entre embeddings, preprocesamiento y wordcloud '
+             '(se expulsan las entradas menos usadas)'
+    )
+
+    parser.add_argument(
+        '--no-cache',
+        action='store_true',
+        help='No leer ni escribir la caché (preprocesamiento, wordcloud y embeddings)'
+    )
+
+    parser.add_argument(
+        '--approx-ngrams',
+        action='store_true',
+        help='Contar n-gramas con un sketch de memoria fija (conteos aproximados con cota de error)'
+    )
+
+    parser.add_argument(
+        '--sketch-capacity',
+        type=int,
+        default=100_000,
+        help='N-gramas distintos que guarda el sketch por orden (con --approx-ngrams)'
+    )
+
+    parser.add_argument(
+        '--ngram-jobs',
+        type=int,
+        default=1,
+        help='Procesos para contar n-gramas (-1 = todos los núcleos)'
+    )
+
+    parser.add_argument(
+        '--render-jobs',
+        type=int,
+        default=1,
+        help='Procesos que dibujan las gráficas mientras se entrena BERTopic (0 = en un hilo del proceso principal)'
+    )
+
+    parser.add_argument(
+        '--stage-workers',
+        type=int,
+        default=4,
+        help='Hilos para ejecutar a la vez las etapas independientes del pipeline (1 = una etapa a la vez)'
+    )
+
+    parser.add_argument(
+        '--token-budget',
+        type=int,
+        default=16384,
+        help='Tokens (con padding) por lote al codificar embeddings'
+    )
+
+    parser.add_argument(
+        '--encode-workers',
+        type=int,
+        default=1,
+        help='Procesos de CPU para codificar embeddings'
+    )
+
+    parser.add_argument(
+        '--encode-threads',
+        type=int,
+        default=None,
+        help='Hilos de torch por proceso de codificación'
+    )
+
+    parser.add_argument(
+        '--embedding-precision',
+        choices=['float32', 'float16', 'int8'],
+        default='float32',
+        help='Precisión de la matriz de embeddings entre etapas (int8 usa una escala por fila)'
+    )
+
+    parser.add_argument(
+        '--online-topics',
+        action='store_true',
+        help='Ajusta BERTopic por lotes con componentes incrementales (IncrementalPCA + MiniBatchKMeans)'
+    )
+
+    parser.add_argument(
+        '--ablation-max-topics',
+        type=int,
+        default=1,
+        help='Ablación: conserva las keywords presentes en a lo más N tópicos (1 = solo exclusivas)'
+    )
+
+    parser.add_argument(
+        '--ablation-min-share',
+        type=float,
+        default=None,
+        help='Ablación: conserva también las keywords con al menos esta fracción de su peso c-TF-IDF en el tópico'
+    )
+
+    parser.add_argument(
+        '--no-shared-knn',
+        action='store_true',
+        help='Cada reductor (UMAP de BERTopic, UMAP 3D, t-SNE 3D) busca sus propios vecinos'
+    )
+
+    parser.add_argument(
+        '--viz-landmarks',
+        type=int,
+        default=20000,
+        help='Textos sobre los que se ajustan UMAP 3D y t-SNE 3D (muestra estratificada por tópico; '
+             '0 = todos). Por defecto 20000'
+    )
+
+    parser.add_argument(
+        '--save-model',
+        default=None,
+        help='Directorio donde guardar el modelo de tópicos ajustado (para el subcomando transform)'
+    )
+
     return parser
 
-def main(args):
-    run_pipeline(
+def validate_args(args, parser=None):
+    """Valida la entrada antes de cargar modelos (solo lee el encabezado del archivo)."""
+    from config.settings import Config
+
+    try:
+        Config(args.File, args.Column_name, args.Title, args.palette, metadata_columns=args.metadata)
+        assert args.ablation_max_topics >= 1, "--ablation-max-topics debe ser >= 1"
+        assert args.ablation_min_share is None or 0 < args.ablation_min_share <= 1, \
+            "--ablation-min-share debe estar en (0, 1]"
+        assert args.viz_landmarks == 0 or args.viz_landmarks >= 3, "--viz-landmarks debe ser 0 o >= 3"
+        assert args.stage_workers >= 1, "--stage-workers debe ser >= 1"
+    except AssertionError as e:
+        if parser is None:
+            raise
+        parser.error(str(e))
+
+
+def pipeline_kwargs(args) -> dict:
+    """Argumentos de run_pipeline a partir de los argumentos de consola."""
+    return dict(
         dataset_path=args.File,
         text_column=args.Column_name,
         language=args.Language,
         palette=args.palette,
-        title=args.Title
+        title=args.Title,
+        batch_size=args.batch_size,
+        n_process=args.n_process,
+        chunksize=args.chunksize,
+        dedup=args.dedup,
+        cache_dir=None if args.no_cache else args.cache_dir,
+        cache_max_mb=args.cache_max_mb,
+        metadata_columns=args.metadata,
+        approx_ngrams=args.approx_ngrams,
+        sketch_capacity=args.sketch_capacity,
+        ngram_jobs=args.ngram_jobs,
+        render_jobs=args.render_jobs,
+        stage_workers=args.stage_workers,
+        token_budget=args.token_budget,
+        encode_workers=args.encode_workers,
+        encode_threads=args.encode_threads,
+        embedding_precision=args.embedding_precision,
+        online_topics=args.online_topics,
+        model_dir=args.save_model,
+        ablation_max_topics=args.ablation_max_topics,
+        ablation_min_share=args.ablation_min_share,
+        shared_knn=not args.no_shared_knn,
+        viz_landmarks=args.viz_landmarks or None,
+        output_path=args.output
     )
 
-if __name__ == "__main__":
+
+def main(args, parser=None):
+    validate_args(args, parser)
+    return run_pipeline(**pipeline_kwargs(args))
+
+
+def serve_main(argv):
+    """`nlp_analyzer.py serve`: proceso residente que mantiene los modelos cargados."""
+    from service.server import DEFAULT_PORT, serve
+
+    parser = argparse.ArgumentParser(
+        prog='nlp_analyzer.py serve',
+        description='Servidor local que ejecuta el pipeline con los modelos ya cargados en memoria',
+        epilog='python nlp_analyzer.py serve --preload spanish english'
+    )
+    parser.add_argument('--host', default='127.0.0.1', help='Dirección donde escuchar (default: 127.0.0.1)')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT, help=f'Puerto (default: {DEFAULT_PORT})')
+    parser.add_argument(
+        '--preload',
+        nargs='*',
+        choices=['spanish', 'english'],
+        default=[],
+        help='Idiomas cuyos modelos (spaCy, stopwords y embeddings) se cargan al iniciar'
+    )
+    parser.add_argument(
+        '--output-dir',
+        default='reports',
+        help='Carpeta de los reportes de trabajos que no indican -o (default: reports)'
+    )
+    args = parser.parse_args(argv)
+    serve(args.host, args.port, preload=args.preload, output_dir=args.output_dir)
+
+
+def submit_main(argv):
+    """`nlp_analyzer.py submit`: envía una corrida al servidor y espera el reporte."""
+    from service.server import DEFAULT_PORT, submit_job
+
     parser = crear_parser()
-    args = parser.parse_args()
-    main(args)
\ No newline at end of file
+    parser.prog = 'nlp_analyzer.py submit'
+    parser.add_argument('--host', default='127.0.0.1', help='Dirección del servidor (default: 127.0.0.1)')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT, help=f'Puerto del servidor (default: {DEFAULT_PORT})')
+    parser.add_argument('--no-wait', action='store_true', help='No esperar a que termine el trabajo')
+    args = parser.parse_args(argv)
+    validate_args(args, parser)
+
+    kwargs = pipeline_kwargs(args)
+    # El servidor puede correr en otra carpeta: rutas absolutas
+    kwargs['dataset_path'] = os.path.abspath(kwargs['dataset_path'])
+    for key in ('cache_dir', 'model_dir'):
+        if kwargs[key] is not None:
+            kwargs[key] = os.path.abspath(kwargs[key])
+    if args.output == parser.get_default('output'):
+        # Sin -o el servidor asigna un reporte por trabajo
+        del kwargs['output_path']
+    else:
+        kwargs['output_path'] = os.path.abspath(kwargs['output_path'])
+
+    try:
+        job = submit_job(args.host, args.port, kwargs, wait=not args.no_wait)
+    except (RuntimeError, OSError) as e:
+        raise SystemExit(f"Error al enviar el trabajo a {args.host}:{args.port}: {e}")
+    if job['status'] == 'failed':
+        raise SystemExit(f"El trabajo {job['id']} falló: {job['error']}")
+    print(job['output_path'] if job['status'] == 'done' else f"Trabajo {job['id']} en cola")
+
+
+def transform_main(argv):
+    """`nlp_analyzer.py transform`: asigna tópicos de un modelo guardado a un archivo nuevo."""
+    from processing.ingest import read_columns
+
+    parser = argparse.ArgumentParser(
+        prog='nlp_analyzer.py transform',
+        description='Asigna los tópicos de un modelo guardado con --save-model a los textos de un archivo nuevo, sin reajustar el modelo',
+        epilog='python nlp_analyzer.py transform --model modelos/resenas -f nuevas.csv -c comentario -o nuevas_topicos.csv'
+    )
+    parser.add_argument('--model', required=True, help='Directorio del modelo guardado con --save-model')
+    parser.add_argument('-f', '--File', required=True, help='Ruta al archivo de entrada (.csv, .parquet, .feather, .jsonl)')
+    parser.add_argument('-c', '--Column_name', required=True, help='Nombre de la columna con los textos')
+    parser.add_argument('-o', '--output', default=None, help='CSV de salida (default: <archivo>_topicos.csv)')
+    parser.add_argument('--batch-size', type=int, default=256, help='Documentos por lote en la lematización con spaCy')
+    parser.add_argument('--n-process', type=int, default=1, help='Procesos de spaCy para lematizar (-1 = todos los núcleos)')
+    parser.add_argument('--cache-dir', default='.nlp_cache', help='Directorio de la caché (preprocesamiento y embeddings)')
+    parser.add_argument('--cache-max-mb', type=int, default=2048, help='Tamaño máximo de toda la caché en MB')
+    parser.add_argument('--no-cache', action='store_true', help='No leer ni escribir la caché')
+    parser.add_argument('--token-budget', type=int, default=16384, help='Tokens (con padding) por lote al codificar embeddings')
+    parser.add_argument('--encode-workers', type=int, default=1, help='Procesos de CPU para codificar embeddings')
+    parser.add_argument('--encode-threads', type=int, default=None, help='Hilos de torch por proceso de codificación')
+    args = parser.parse_args(argv)
+
+    if not os.path.isfile(os.path.join(args.model, 'manifest.json')):
+        parser.error(f'{args.model} no es un modelo guardado con --save-model')
+    try:
+        assert os.path.isfile(args.File), f'No existe el archivo {args.File}'
+        assert args.Column_name in read_columns(args.File), f'La columna {args.Column_name} no existe en {args.File}'
+    except AssertionError as e:
+        parser.error(str(e))
+
+    run_transform(
+        model_dir=args.model,
+        dataset_path=args.File,
+        text_column=args.Column_name,
+        output_path=args.output,
+        batch_size=args.batch_size,
+        n_process=args.n_process,
+        cache_dir=None if args.no_cache else args.cache_dir,
+        cache_max_mb=args.cache_max_mb,
+        token_budget=args.token_budget,
+        encode_workers=args.encode_workers,
+        encode_threads=args.encode_threads
+    )
+
+
+COMMANDS = {"serve": serve_main, "submit": submit_main, "transform": transform_main}
+
+if __name__ == "__main__":
+    import sys
+
+    if len(sys.argv) > 1 and sys.argv[1] in COMMANDS:
+        COMMANDS[sys.argv[1]](sys.argv[2:])
+    else:
+        parser = crear_parser()
+        args = parser.parse_args()
+        main(args, parser)
\ No newline at end of file
@@ -1,71 +1,121 @@
 from typing import Dict, List, Tuple
 
-class TopicAblation:
-    def __init__(self, topic_modeler):
-        self.tm = topic_modeler  
-
-    def get_topic_words(self, top_n: int | None = None) -> Dict[int, List[str]]:
-        """
-        Obtiene todas las palabras por tópico, o las top_n si se indica.
-        """
-        topic_words = {}
-        topic_info = self.tm.get_topic_info()
+import numpy as np
 
-        for topic_id in topic_info["Topic"]:
-            if topic_id == -1:
-                continue
 
-            # obtener todas las palabras del tópico
-            words = self.tm.get_topic_keywords(topic_id, top_n if top_n else 9999)
+class TopicAblation:
+    """
+    Ablación de keywords por tópico sobre una matriz de incidencia
+    tópicos x vocabulario (scipy.sparse), construida una vez por top_n:
 
-            # quitar pesos
-            only_words = [w for w, _ in words]
+        weights[i, j] = peso c-TF-IDF de la palabra j en el tópico i
+                        (0 si no está entre sus keywords)
 
-            topic_words[topic_id] = only_words
+    En cuántos tópicos aparece cada palabra es la suma por columnas de la
+    incidencia (1 si la palabra está entre las keywords del tópico): no se
+    recorren las listas de palabras de todos los tópicos por cada palabra.
 
-        return topic_words
+    Reglas de ablación (una palabra se conserva en un tópico si cumple alguna):
+        max_topics=k:  aparece en a lo más k tópicos (k=1: solo palabras
+                       exclusivas, la regla por defecto)
+        min_share=s:   su peso en el tópico es al menos la fracción s de la
+                       suma de sus pesos en todos los tópicos
+    """
 
+    def __init__(self, topic_modeler):
+        self.tm = topic_modeler
+        # top_n -> matriz de incidencia y sus entradas (ver _incidence),
+        # válidas mientras el TopicIndex del modelo sea el mismo
+        self._matrices: Dict[int | None, dict] = {}
+        self._index = None
 
-    def ablate(self, top_n: int = 10) -> Dict[int, List[str]]:
-        """Elimina palabras compartidas entre tópicos."""
-        topic_words = self.get_topic_words(top_n)
+    def get_topic_words(self, top_n: int | None = None) -> Dict[int, List[str]]:
+        """
+        Obtiene todas las palabras por tópico, o las top_n si se indica.
+        """
+        inc = self._incidence(top_n)
+        vocab, offsets, columns = inc["vocab"], inc["offsets"], inc["columns"]
+        return {
+            topic_id: vocab[columns[offsets[i]:offsets[i + 1]]].tolist()
+            for i, topic_id in enumerate(inc["topic_ids"])
+        }
 
-        # Conjunto de palabras repetidas entre temas
-        all_words = [word for words in topic_words.values() for word in words]
-        duplicates = {w for w in all_words if all_words.count(w) > 1}
+    def _incidence(self, top_n: int | None) -> dict:
+        """
+        Matriz tópicos x vocabulario de las keywords de cada tópico (sin el -1).
+        Las entradas (tópico, palabra) se guardan en el orden de las keywords:
+        las del tópico i son offsets[i]:offsets[i + 1], con su palabra en
+        columns y su peso en weights.
+        """
+        index = self.tm.get_index()
+        if index is not self._index:
+            self._matrices, self._index = {}, index
+        if top_n in self._matrices:
+            return self._matrices[top_n]
+
+        import pandas as pd
+        from scipy import sparse
+
+        topic_ids = [t for t in index.topic_ids if t != -1]
+        keywords = [index.get_keywords(t, top_n or None) for t in topic_ids]
+
+        lengths = np.fromiter((len(words) for words in keywords), dtype=np.int64, count=len(keywords))
+        offsets = np.concatenate([[0], np.cumsum(lengths)])
+        words = [w for topic_words in keywords for w, _ in topic_words]
+        weights = np.fromiter((score for topic_words in keywords for _, score in topic_words),
+                              dtype=np.float64, count=len(words))
+
+        # Vocabulario en orden de primera aparición; columns[e] = palabra de la entrada e
+        columns, vocab = pd.factorize(pd.Series(words, dtype=object), sort=False)
+        rows = np.repeat(np.arange(len(topic_ids)), lengths)
+        matrix = sparse.csr_matrix((weights, (rows, columns)), shape=(len(topic_ids), len(vocab)))
+
+        # Incidencia 0/1 (una palabra repetida en un tópico cuenta una vez)
+        incidence = sparse.csr_matrix((np.ones(len(words), dtype=np.int64), (rows, columns)), shape=matrix.shape)
+        incidence.data[:] = 1
+        self._matrices[top_n] = {
+            "topic_ids": topic_ids,
+            "vocab": np.asarray(vocab, dtype=object),
+            "matrix": matrix,
+            "offsets": offsets,
+            "columns": columns,
+            "weights": weights,
+            # En cuántos tópicos aparece cada palabra / suma de sus pesos
+            "topic_counts": np.asarray(incidence.sum(axis=0)).ravel(),
+            "weight_totals": np.asarray(matrix.sum(axis=0)).ravel(),
+        }
+        return self._matrices[top_n]
+
+    def ablate(self, top_n: int = 10, max_topics: int = 1, min_share: float | None = None) -> Dict[int, List[str]]:
+        """Elimina palabras compartidas entre tópicos (ver reglas en la clase)."""
+        assert max_topics >= 1, "max_topics debe ser >= 1"
+        assert min_share is None or 0 < min_share <= 1, "min_share debe estar en (0, 1]"
+        inc = self._incidence(top_n)
+        vocab, offsets, columns = inc["vocab"], inc["offsets"], inc["columns"]
+
+        # Regla por entrada (tópico, palabra), vectorizada sobre todas las entradas
+        keep = inc["topic_counts"][columns] <= max_topics
+        if min_share is not None:
+            totals = inc["weight_totals"][columns]
+            share = np.divide(inc["weights"], totals, out=np.zeros_like(inc["weights"]), where=totals > 0)
+            keep |= share >= min_share
 
-        # Crear diccionario con palabras exclusivas por tema
-        exclusive = {
-            topic_id: [w for w in words if w not in duplicates]
-            for topic_id, words in topic_words.items()
+        return {
+            topic_id: vocab[columns[offsets[i]:offsets[i + 1]][keep[offsets[i]:offsets[i + 1]]]].tolist()
+            for i, topic_id in enumerate(inc["topic_ids"])
         }
 
-        return exclusive
-    
-    def run_all(self, top_n: int | None = None) -> Dict[str, Dict]:
+    def run_all(self, top_n: int | None = None, max_topics: int = 1, min_share: float | None = None) -> Dict[str, Dict]:
         """
         Ejecuta todo el proceso de ablación:
         - keywords por tópico (sin límite si top_n=None)
         - palabras duplicadas globales
-        - palabras exclusivas por tópico
+        - palabras exclusivas por tópico (o según max_topics / min_share)
         """
-
-        # obtener palabras
-        words_per_topic = self.get_topic_words(top_n)
-
-        # duplicados globales
-        all_words = [w for words in words_per_topic.values() for w in words]
-        duplicates = {w for w in all_words if all_words.count(w) > 1}
-
-        # ablación
-        exclusive = {
-            topic_id: [w for w in words if w not in duplicates]
-            for topic_id, words in words_per_topic.items()
-        }
+        inc = self._incidence(top_n)
 
         return {
-            "keywords_per_topic": words_per_topic,
-            "duplicate_words": list(duplicates),
-            "ablated_keywords": exclusive
+            "keywords_per_topic": self.get_topic_words(top_n),
+            "duplicate_words": inc["vocab"][inc["topic_counts"] > 1].tolist(),
+            "ablated_keywords": self.ablate(top_n, max_topics, min_share)
         }
-
@@ -0,0 +1,95 @@
+import os
+import zipfile
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+
+class DiskCache:
+    """
+    Caché persistente en disco, direccionada por contenido.
+
+    Cada entrada es un .npz comprimido identificado por una llave (hash)
+    dentro de <cache_dir>/<namespace>. Al leer una entrada se actualiza su
+    mtime, y al escribir se expulsan las entradas menos usadas (LRU) hasta
+    que el tamaño total del namespace quede por debajo de max_bytes.
+    """
+
+    def __init__(self, cache_dir: str = ".nlp_cache", namespace: str = "preprocess",
+                 max_bytes: int = 2 * 1024 ** 3):
+        assert isinstance(cache_dir, str) and cache_dir.strip(), "cache_dir debe ser un string"
+        assert max_bytes > 0, "max_bytes debe ser > 0"
+
+        self.cache_dir = cache_dir
+        self.namespace = namespace
+        self.root = os.path.join(cache_dir, namespace)
+        self.max_bytes = max_bytes
+        os.makedirs(self.root, exist_ok=True)
+
+    def config(self) -> Dict[str, object]:
+        """Argumentos para recrear esta caché (p. ej. en otro proceso): DiskCache(**config)."""
+        return {"cache_dir": self.cache_dir, "namespace": self.namespace, "max_bytes": self.max_bytes}
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.root, f"{key}.npz")
+
+    def load(self, key: str) -> Dict[str, np.ndarray] | None:
+        """Devuelve los arrays guardados bajo `key` o None si no hay entrada."""
+        path = self._path(key)
+        if not os.path.isfile(path):
+            return None
+
+        try:
+            with np.load(path, allow_pickle=False) as data:
+                arrays = {name: data[name] for name in data.files}
+        except (OSError, ValueError, zipfile.BadZipFile):
+            # Entrada corrupta (p. ej. escritura interrumpida): se descarta
+            os.remove(path)
+            return None
+
+        os.utime(path)  # marcar como usada recientemente
+        return arrays
+
+    def save(self, key: str, **arrays: np.ndarray):
+        """Guarda los arrays bajo `key` de forma atómica y aplica la expulsión LRU."""
+        path = self._path(key)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            np.savez_compressed(f, **arrays)
+        os.replace(tmp_path, path)
+
+        self._evict(keep=path)
+
+    def _evict(self, keep: str):
+        entries = []
+        for name in os.listdir(self.root):
+            if not name.endswith(".npz"):
+                continue
+            path = os.path.join(self.root, name)
+            st = os.stat(path)
+            entries.append((st.st_mtime, st.st_size, path))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            if path == keep:
+                continue
+            os.remove(path)
+            total -= size
+
+
+def pack_strings(strings: List[str]) -> Tuple[np.ndarray, np.ndarray]:
+    """Lista de strings -> (bytes UTF-8 concatenados, longitud en bytes de cada uno)."""
+    encoded = [s.encode("utf-8") for s in strings]
+    lengths = np.fromiter((len(b) for b in encoded), dtype=np.int64, count=len(encoded))
+    data = np.frombuffer(b"".join(encoded), dtype=np.uint8)
+    return data, lengths
+
+
+def unpack_strings(data: np.ndarray, lengths: np.ndarray) -> List[str]:
+    """Inverso de pack_strings()."""
+    raw = data.tobytes()
+    ends = np.cumsum(lengths)
+    starts = ends - lengths
+    return [raw[s:e].decode("utf-8") for s, e in zip(starts.tolist(), ends.tolist())]
@@ -0,0 +1,81 @@
+from typing import List, Sequence
+
+import numpy as np
+import pandas as pd
+
+
+class DocumentDeduplicator:
+    """
+    Colapsa documentos idénticos (ya normalizados) para procesar cada texto
+    único una sola vez.
+
+    Después de fit():
+        unique_docs: textos únicos, en orden de primera aparición
+        counts:      multiplicidad de cada texto único
+        inverse:     para cada documento original, el índice de su texto único
+                     (unique_docs[inverse[i]] == docs[i])
+    """
+
+    def __init__(self):
+        self.unique_docs: List[str] = []
+        self.counts: np.ndarray | None = None
+        self.inverse: np.ndarray | None = None
+        # texto único -> índice, solo para update()
+        self._positions: dict | None = None
+
+    def fit(self, docs: Sequence[str]):
+        assert len(docs) > 0, "La lista de documentos no puede estar vacía"
+
+        # factorize usa la tabla hash de pandas (en C) y respeta el orden de aparición
+        codes, uniques = pd.factorize(pd.Series(docs, dtype=object), sort=False)
+
+        self.inverse = codes.astype(np.int64)
+        self.unique_docs = list(uniques)
+        self.counts = np.bincount(self.inverse, minlength=len(self.unique_docs))
+        self._positions = None
+        return self
+
+    def update(self, docs: Sequence[str]) -> np.ndarray:
+        """
+        fit() acumulativo (p. ej. por bloques): agrega docs a los documentos
+        ya vistos y devuelve el índice del texto único de cada uno. Un texto
+        visto en una llamada anterior conserva su índice.
+        """
+        if self._positions is None:
+            self._positions = {doc: j for j, doc in enumerate(self.unique_docs)}
+
+        codes = np.empty(len(docs), dtype=np.int64)
+        for i, doc in enumerate(docs):
+            j = self._positions.get(doc)
+            if j is None:
+                j = self._positions[doc] = len(self.unique_docs)
+                self.unique_docs.append(doc)
+            codes[i] = j
+
+        self.inverse = codes if self.inverse is None else np.concatenate([self.inverse, codes])
+        self.counts = np.bincount(self.inverse, minlength=len(self.unique_docs))
+        return codes
+
+    @property
+    def n_docs(self) -> int:
+        return 0 if self.inverse is None else len(self.inverse)
+
+    @property
+    def n_unique(self) -> int:
+        return len(self.unique_docs)
+
+    @property
+    def ratio(self) -> float:
+        """Fracción de documentos eliminados por ser duplicados (0 = sin duplicados)."""
+        if self.n_docs == 0:
+            return 0.0
+        return 1 - self.n_unique / self.n_docs
+
+    def expand(self, values):
+        """Reparte un resultado por texto único a todos los documentos originales."""
+        assert self.inverse is not None, "Llama a fit() primero"
+        assert len(values) == self.n_unique, "values debe tener un elemento por texto único"
+
+        if isinstance(values, np.ndarray):
+            return values[self.inverse]
+        return [values[j] for j in self.inverse]
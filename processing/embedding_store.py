@@ -0,0 +1,317 @@
+import hashlib
+import io
+import json
+import os
+import time
+import unicodedata
+from typing import Callable, List
+
+import numpy as np
+
+
+class EmbeddingStore:
+    """
+    Almacén persistente de embeddings, direccionado por
+    (modelo, revisión, hash del texto normalizado). revision es el hash del
+    commit del modelo (processing.models.resolve_revision), no una rama:
+    si la rama avanza, los embeddings viejos no se mezclan con los nuevos.
+    Un modelo en un directorio local se identifica por sus archivos.
+
+    Estructura en disco (<root>/<id del modelo>/):
+        meta.json                 modelo y revisión (informativo)
+        shards/<nombre>.npy       embeddings float32 de un lote de textos nuevos
+        shards/<nombre>.keys.npy  hash (16 bytes) de cada fila del shard
+        corpus/<hash>-<filas>.npy matriz alineada con un corpus concreto
+
+    get() solo codifica los textos que no están en ningún shard y devuelve
+    la matriz del corpus abierta con memory map (np.load(mmap_mode="r")):
+    BERTopic, UMAP y t-SNE la leen sin cargar una copia completa en el heap.
+
+    Shards y matrices de corpus de todos los modelos bajo root comparten
+    max_bytes: al pasarse se borran primero las matrices de corpus y luego
+    los shards, los menos usados recientemente (LRU), nunca los del corpus
+    de la llamada actual.
+    """
+
+    # Matrices de corpus que se conservan por modelo (las más recientes)
+    MAX_CORPUS_FILES = 8
+
+    def __init__(self, root: str, model_name: str, revision: str | None = None, max_bytes: int = 2 * 1024 ** 3):
+        assert isinstance(root, str) and root.strip(), "root debe ser un string"
+        assert max_bytes > 0, "max_bytes debe ser > 0"
+        if revision is None:
+            assert os.path.isdir(model_name), \
+                f"revision debe ser el hash del commit de {model_name} (ver processing.models.resolve_revision)"
+            revision = self._local_fingerprint(model_name)
+        self.model_name = model_name
+        self.revision = revision
+        self.max_bytes = max_bytes
+
+        model_id = hashlib.sha256(f"{model_name}\x1f{self.revision}".encode("utf-8")).hexdigest()[:16]
+        self.cache_root = root
+        self.root = os.path.join(root, model_id)
+        self.shards_dir = os.path.join(self.root, "shards")
+        self.corpus_dir = os.path.join(self.root, "corpus")
+        os.makedirs(self.shards_dir, exist_ok=True)
+        os.makedirs(self.corpus_dir, exist_ok=True)
+
+        meta_path = os.path.join(self.root, "meta.json")
+        if not os.path.isfile(meta_path):
+            with open(meta_path, "w", encoding="utf-8") as f:
+                json.dump({"model_name": model_name, "revision": self.revision}, f, indent=2)
+
+        # Estadísticas de la última llamada a get()
+        self.hits = 0
+        self.misses = 0
+
+        self._load_index()
+
+    @staticmethod
+    def _local_fingerprint(model_dir: str) -> str:
+        """Revisión de un modelo local: hash de la ruta, tamaño y mtime de sus archivos."""
+        h = hashlib.sha256()
+        for dirpath, dirnames, filenames in os.walk(model_dir):
+            dirnames.sort()
+            for name in sorted(filenames):
+                path = os.path.join(dirpath, name)
+                st = os.stat(path)
+                h.update(f"{os.path.relpath(path, model_dir)}\x1f{st.st_size}\x1f{st.st_mtime_ns}\n".encode("utf-8"))
+        return f"local-{h.hexdigest()[:16]}"
+
+    # ------ LLAVES ------
+    @staticmethod
+    def normalize(text: str) -> str:
+        """Normalización previa al hash: NFC y espacios colapsados."""
+        return " ".join(unicodedata.normalize("NFC", text).split())
+
+    @classmethod
+    def text_keys(cls, texts: List[str]) -> np.ndarray:
+        """Hash de 16 bytes (blake2b) de cada texto normalizado, como array S16."""
+        digests = [hashlib.blake2b(cls.normalize(t).encode("utf-8"), digest_size=16).digest() for t in texts]
+        return np.frombuffer(b"".join(digests), dtype="S16")
+
+    # ------ ÍNDICE ------
+    def _load_index(self):
+        """Lee las llaves de todos los shards completos y las ordena para buscarlas con searchsorted."""
+        self._shards: List[str] = []
+        keys, locations = [], []
+        for name in sorted(os.listdir(self.shards_dir)):
+            if not name.endswith(".keys.npy"):
+                continue
+            data_path = os.path.join(self.shards_dir, name[:-len(".keys.npy")] + ".npy")
+            if not os.path.isfile(data_path):
+                continue
+            shard_keys = np.load(os.path.join(self.shards_dir, name))
+            keys.append(shard_keys)
+            # Ubicación de cada fila: (número de shard << 32) | fila
+            locations.append((len(self._shards) << 32) | np.arange(len(shard_keys), dtype=np.int64))
+            self._shards.append(data_path)
+
+        if keys:
+            keys = np.concatenate(keys)
+            locations = np.concatenate(locations)
+            order = np.argsort(keys, kind="stable")
+            self._keys, self._locations = keys[order], locations[order]
+        else:
+            self._keys = np.zeros(0, dtype="S16")
+            self._locations = np.zeros(0, dtype=np.int64)
+
+    def _lookup(self, keys: np.ndarray) -> np.ndarray:
+        """Ubicación de cada llave o -1 si no está en el almacén."""
+        if len(self._keys) == 0:
+            return np.full(len(keys), -1, dtype=np.int64)
+        pos = np.minimum(np.searchsorted(self._keys, keys), len(self._keys) - 1)
+        return np.where(self._keys[pos] == keys, self._locations[pos], -1)
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    # ------ API ------
+    def get(self, texts: List[str], encode: Callable[[List[str]], np.ndarray]) -> np.ndarray:
+        """
+        Matriz (len(texts), dim) float32 alineada con texts, en memory map.
+        encode(textos) solo se llama con los textos que no estaban guardados.
+        """
+        assert len(texts) > 0, "La lista de textos no puede estar vacía"
+        keys = self.text_keys(texts)
+        locations = self._lookup(keys)
+
+        missing = np.flatnonzero(locations < 0)
+        self.misses = len(np.unique(keys[missing]))
+        self.hits = len(texts) - len(missing)
+        if len(missing):
+            _, first = np.unique(keys[missing], return_index=True)
+            new_rows = missing[np.sort(first)]
+            vectors = np.asarray(encode([texts[i] for i in new_rows.tolist()]), dtype=np.float32)
+            self._append(keys[new_rows], vectors)
+            locations = self._lookup(keys)
+
+        # Marcar como usados los shards leídos (LRU por mtime); el corpus actual los necesita
+        used_shards = [self._shards[shard_id] for shard_id in np.unique(locations >> 32).tolist()]
+        for shard_path in used_shards:
+            os.utime(shard_path)
+
+        path = self._corpus_matrix(keys, locations)
+        self._evict(keep={path, *used_shards})
+        return np.load(path, mmap_mode="r")
+
+    def _append(self, keys: np.ndarray, vectors: np.ndarray):
+        """Escribe un shard nuevo (datos primero, llaves al final: un shard sin llaves se ignora)."""
+        assert len(keys) == len(vectors), "keys y vectors deben tener el mismo largo"
+        name = f"shard-{time.time_ns()}-{os.getpid()}"
+        data_path = os.path.join(self.shards_dir, f"{name}.npy")
+        self._atomic_save(data_path, vectors)
+        self._atomic_save(os.path.join(self.shards_dir, f"{name}.keys.npy"), keys)
+        self._load_index()
+
+    # ------ MATRIZ DEL CORPUS ------
+    def _corpus_matrix(self, keys: np.ndarray, locations: np.ndarray) -> str:
+        """
+        Ruta del .npy con las filas del corpus (corpus/<hash de las llaves>-<filas>.npy).
+        Si existe la matriz de un corpus que es prefijo de este (el mismo
+        dataset con documentos agregados al final), se le agregan solo las
+        filas nuevas; si no, se junta completa desde los shards.
+        """
+        path = os.path.join(self.corpus_dir, f"{hashlib.sha256(keys.tobytes()).hexdigest()}-{len(keys)}.npy")
+        if os.path.isfile(path):
+            os.utime(path)
+            return path
+
+        for base_path, n_base in self._corpus_prefixes(keys):
+            if self._extend_corpus(base_path, n_base, path, locations):
+                return path
+
+        shard_ids, rows = locations >> 32, locations & 0xFFFFFFFF
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        out = np.lib.format.open_memmap(tmp_path, mode="w+", dtype=np.float32,
+                                        shape=(len(keys), self._dim(locations)))
+        for shard_id in np.unique(shard_ids).tolist():
+            idx = np.flatnonzero(shard_ids == shard_id)
+            shard = np.load(self._shards[shard_id], mmap_mode="r")
+            out[idx] = shard[rows[idx]]
+        out.flush()
+        del out
+        os.replace(tmp_path, path)
+        self._evict_corpus(keep=path)
+        return path
+
+    def _corpus_prefixes(self, keys: np.ndarray) -> List[tuple]:
+        """(ruta, filas) de las matrices guardadas cuyo corpus es prefijo de keys, de la más larga a la más corta."""
+        found = []
+        for name in os.listdir(self.corpus_dir):
+            corpus_key, _, n = name[:-len(".npy")].rpartition("-")
+            if not name.endswith(".npy") or not n.isdigit() or not 0 < int(n) < len(keys):
+                continue
+            if hashlib.sha256(keys[:int(n)].tobytes()).hexdigest() == corpus_key:
+                found.append((os.path.join(self.corpus_dir, name), int(n)))
+        return sorted(found, key=lambda item: -item[1])
+
+    def _extend_corpus(self, base_path: str, n_base: int, path: str, locations: np.ndarray) -> bool:
+        """
+        Agrega al final de base_path las filas locations[n_base:], reescribe
+        el encabezado con el nuevo shape y lo renombra a path. False (sin
+        cambios) si otro proceso lo tomó o el encabezado no cabe en su lugar.
+        """
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        try:
+            # Renombrar primero: otro proceso ya no lo encuentra ni lo extiende a la vez
+            os.replace(base_path, tmp_path)
+        except FileNotFoundError:
+            return False
+
+        dim = self._dim(locations)
+        with open(tmp_path, "r+b") as f:
+            version = np.lib.format.read_magic(f)
+            read_header, write_header = {
+                (1, 0): (np.lib.format.read_array_header_1_0, np.lib.format.write_array_header_1_0),
+                (2, 0): (np.lib.format.read_array_header_2_0, np.lib.format.write_array_header_2_0),
+            }.get(version, (None, None))
+            header = io.BytesIO()
+            if read_header is not None:
+                shape, fortran_order, dtype = read_header(f)
+                offset = f.tell()
+                write_header(header, {"descr": np.lib.format.dtype_to_descr(dtype), "fortran_order": False,
+                                      "shape": (len(locations), dim)})
+            if (read_header is None or fortran_order or dtype != np.float32 or shape != (n_base, dim)
+                    or len(header.getvalue()) != offset or os.fstat(f.fileno()).st_size != offset + n_base * dim * 4):
+                os.replace(tmp_path, base_path)
+                return False
+
+            f.seek(0, os.SEEK_END)
+            f.write(self._gather(locations[n_base:], dim).tobytes())
+            f.seek(0)
+            f.write(header.getvalue())
+        os.replace(tmp_path, path)
+        return True
+
+    def _gather(self, locations: np.ndarray, dim: int) -> np.ndarray:
+        """Filas de los shards en el orden de locations (en memoria: solo para pocas filas)."""
+        shard_ids, rows = locations >> 32, locations & 0xFFFFFFFF
+        out = np.empty((len(locations), dim), dtype=np.float32)
+        for shard_id in np.unique(shard_ids).tolist():
+            idx = np.flatnonzero(shard_ids == shard_id)
+            out[idx] = np.load(self._shards[shard_id], mmap_mode="r")[rows[idx]]
+        return out
+
+    def _dim(self, locations: np.ndarray) -> int:
+        return np.load(self._shards[int(locations[0] >> 32)], mmap_mode="r").shape[1]
+
+    def _evict_corpus(self, keep: str):
+        paths = [os.path.join(self.corpus_dir, n) for n in os.listdir(self.corpus_dir) if n.endswith(".npy")]
+        paths.sort(key=os.path.getmtime, reverse=True)
+        for path in paths[self.MAX_CORPUS_FILES:]:
+            if path != keep:
+                os.remove(path)
+
+    def _evict(self, keep: set):
+        """
+        Borra entradas de todos los modelos bajo root hasta quedar en
+        max_bytes: primero las matrices de corpus (se reconstruyen desde los
+        shards sin codificar) y después los shards, cada grupo del menos
+        usado al más reciente. keep (la matriz y los shards del corpus
+        actual) nunca se borra, aunque por sí solo pase de max_bytes. Un
+        shard se borra con sus llaves (las llaves primero).
+        """
+        entries = []
+        for model_id in os.listdir(self.cache_root):
+            shards_dir = os.path.join(self.cache_root, model_id, "shards")
+            corpus_dir = os.path.join(self.cache_root, model_id, "corpus")
+            if os.path.isdir(shards_dir):
+                for name in os.listdir(shards_dir):
+                    if not name.endswith(".keys.npy"):
+                        continue
+                    keys_path = os.path.join(shards_dir, name)
+                    data_path = os.path.join(shards_dir, name[:-len(".keys.npy")] + ".npy")
+                    if not os.path.isfile(data_path):
+                        continue
+                    st = os.stat(data_path)
+                    entries.append((1, st.st_mtime, st.st_size + os.path.getsize(keys_path), (keys_path, data_path)))
+            if os.path.isdir(corpus_dir):
+                for name in os.listdir(corpus_dir):
+                    if not name.endswith(".npy"):
+                        continue
+                    path = os.path.join(corpus_dir, name)
+                    st = os.stat(path)
+                    entries.append((0, st.st_mtime, st.st_size, (path,)))
+
+        total = sum(size for _, _, size, _ in entries)
+        removed_shards = False
+        for _, _, size, paths in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            if keep.intersection(paths):
+                continue
+            for path in paths:
+                os.remove(path)
+            removed_shards |= len(paths) == 2 and os.path.dirname(paths[0]) == self.shards_dir
+            total -= size
+
+        if removed_shards:
+            self._load_index()
+
+    @staticmethod
+    def _atomic_save(path: str, array: np.ndarray):
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            np.save(f, array)
+        os.replace(tmp_path, path)
@@ -0,0 +1,152 @@
+from typing import TYPE_CHECKING, List, Optional
+
+import numpy as np
+
+if TYPE_CHECKING:
+    from sentence_transformers import SentenceTransformer
+
+# Modelo cargado una sola vez en cada proceso del pool (ver _init_worker)
+_WORKER_MODEL = None
+
+
+def _init_worker(model_name: str, revision: Optional[str], threads: Optional[int]):
+    import torch
+    from sentence_transformers import SentenceTransformer
+
+    global _WORKER_MODEL
+    if threads:
+        torch.set_num_threads(threads)
+    _WORKER_MODEL = SentenceTransformer(model_name, device="cpu", revision=revision)
+
+
+def _encode_batches(batches: List[List[str]]) -> List[np.ndarray]:
+    return [_encode_batch(_WORKER_MODEL, batch) for batch in batches]
+
+
+def _encode_batch(model, texts: List[str]) -> np.ndarray:
+    # Un lote ya armado = una sola llamada al modelo (batch_size = tamaño del lote)
+    return model.encode(texts, batch_size=len(texts), convert_to_numpy=True, show_progress_bar=False)
+
+
+class EmbeddingEncoder:
+    """
+    Codificación de textos con SentenceTransformer, con lotes por
+    presupuesto de tokens.
+
+    - Los textos se ordenan por longitud en tokens (de mayor a menor), así
+      cada lote junta textos de largo parecido y casi no hay padding. Con
+      el modelo en este proceso (n_workers == 1) se mide con su tokenizer;
+      si no, se estima por palabras con la proporción del idioma.
+    - Cada lote toma tantos textos como quepan en token_budget tokens
+      con padding (tamaño del lote x texto más largo), en lugar de un
+      número fijo de textos.
+    - Con n_workers > 1 los lotes se reparten entre procesos de CPU, cada
+      uno con su copia del modelo y threads_per_worker hilos de torch.
+    - El resultado vuelve al orden original de los textos.
+    """
+
+    # Tokens (subpalabras) por palabra, para estimar la longitud sin tokenizar;
+    # los vocabularios de los modelos por defecto parten más las palabras en español
+    TOKENS_PER_WORD = {"english": 1.3, "spanish": 1.6}
+
+    # Lotes que se envían juntos a un proceso (menos overhead de IPC)
+    BATCHES_PER_TASK = 4
+
+    def __init__(
+        self,
+        model_name: str,
+        revision: Optional[str] = None,
+        language: str = "spanish",
+        device: str = "cpu",
+        token_budget: int = 16384,
+        max_batch_size: int = 256,
+        n_workers: int = 1,
+        threads_per_worker: Optional[int] = None
+    ):
+        assert token_budget >= 1, "token_budget debe ser >= 1"
+        assert max_batch_size >= 1, "max_batch_size debe ser >= 1"
+        assert n_workers >= 1, "n_workers debe ser >= 1"
+        assert language in self.TOKENS_PER_WORD, f"Idioma no soportado: {language}"
+
+        self.model_name = model_name
+        self.revision = revision
+        self.language = language
+        self.device = device
+        self.token_budget = token_budget
+        self.max_batch_size = max_batch_size
+        # En GPU un solo proceso: los workers son solo para CPU
+        self.n_workers = n_workers if device == "cpu" else 1
+        self.threads_per_worker = threads_per_worker
+
+    # ------ LOTES ------
+    def estimate_lengths(self, texts: List[str], max_seq_length: int = 512, tokenizer=None) -> np.ndarray:
+        """
+        Longitud en tokens de cada texto (truncada como en el modelo). Con
+        tokenizer es la longitud real; sin él, una estimación por palabras.
+        """
+        if tokenizer is not None:
+            input_ids = tokenizer(texts, truncation=True, max_length=max_seq_length)["input_ids"]
+            return np.fromiter((len(ids) for ids in input_ids), dtype=np.int64, count=len(texts))
+
+        words = np.fromiter((len(t.split()) for t in texts), dtype=np.float64, count=len(texts))
+        tokens = np.ceil(words * self.TOKENS_PER_WORD[self.language]).astype(np.int64) + 2  # [CLS] y [SEP]
+        return np.minimum(tokens, max_seq_length)
+
+    def plan_batches(self, lengths: np.ndarray) -> List[np.ndarray]:
+        """
+        Índices de los textos de cada lote. Con los textos ordenados de
+        mayor a menor, el primero de cada lote fija el padding del lote.
+        """
+        order = np.argsort(-lengths, kind="stable")
+        batches = []
+        start = 0
+        while start < len(order):
+            longest = max(int(lengths[order[start]]), 1)
+            size = min(max(self.token_budget // longest, 1), self.max_batch_size)
+            batches.append(order[start:start + size])
+            start += size
+        return batches
+
+    # ------ CODIFICACIÓN ------
+    def encode(self, texts: List[str], model: "SentenceTransformer | None" = None) -> np.ndarray:
+        """Embeddings float32 de texts, en el mismo orden."""
+        assert len(texts) > 0, "La lista de textos no puede estar vacía"
+
+        if self.n_workers == 1 and model is None:
+            from processing.models import load_sentence_transformer
+            model = load_sentence_transformer(self.model_name, self.device, self.revision)
+
+        max_seq_length = getattr(model, "max_seq_length", None) or 512
+        # Con varios procesos el modelo (y su tokenizer) no está en este proceso
+        lengths = self.estimate_lengths(texts, max_seq_length, getattr(model, "tokenizer", None))
+        batches = self.plan_batches(lengths)
+        batch_texts = [[texts[i] for i in batch.tolist()] for batch in batches]
+
+        if self.n_workers == 1:
+            if self.threads_per_worker:
+                import torch
+                torch.set_num_threads(self.threads_per_worker)
+            results = [_encode_batch(model, batch) for batch in batch_texts]
+        else:
+            results = self._encode_parallel(batch_texts)
+
+        dim = results[0].shape[1]
+        embeddings = np.empty((len(texts), dim), dtype=np.float32)
+        for batch, vectors in zip(batches, results):
+            embeddings[batch] = vectors
+        return embeddings
+
+    def _encode_parallel(self, batch_texts: List[List[str]]) -> List[np.ndarray]:
+        import multiprocessing
+        from concurrent.futures import ProcessPoolExecutor
+
+        # spawn: torch no es seguro tras un fork con hilos ya creados
+        tasks = [batch_texts[i:i + self.BATCHES_PER_TASK]
+                 for i in range(0, len(batch_texts), self.BATCHES_PER_TASK)]
+        with ProcessPoolExecutor(
+            max_workers=self.n_workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(self.model_name, self.revision, self.threads_per_worker)
+        ) as pool:
+            return [vectors for part in pool.map(_encode_batches, tasks) for vectors in part]
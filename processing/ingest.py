@@ -0,0 +1,114 @@
+import json
+import os
+from typing import Iterator, List, Sequence
+
+# pandas/pyarrow se importan dentro de cada función: validar la ruta o el
+# encabezado (Config) no debe pagar su tiempo de import.
+
+# Extensión -> formato. Parquet y Feather se leen con memory map (pyarrow).
+SUPPORTED_FORMATS = {
+    ".csv": "csv",
+    ".parquet": "parquet",
+    ".pq": "parquet",
+    ".feather": "feather",
+    ".arrow": "feather",
+    ".jsonl": "jsonl",
+    ".ndjson": "jsonl",
+}
+
+
+def detect_format(path: str) -> str:
+    """Devuelve el formato del archivo según su extensión."""
+    ext = os.path.splitext(path)[1].lower()
+    assert ext in SUPPORTED_FORMATS, f"Formato no soportado: {ext}. Opciones: {sorted(SUPPORTED_FORMATS)}"
+    return SUPPORTED_FORMATS[ext]
+
+
+def read_columns(path: str) -> List[str]:
+    """
+    Nombres de columnas leyendo solo el encabezado / esquema, sin parsear los datos.
+    JSONL no tiene esquema: se juntan las llaves de todos los registros (en
+    orden de aparición), igual que las columnas que arma read_table.
+    """
+    fmt = detect_format(path)
+
+    if fmt == "csv":
+        import csv
+        with open(path, encoding="utf-8-sig", newline="") as f:
+            return next(csv.reader(f), [])
+
+    if fmt == "parquet":
+        import pyarrow.parquet as pq
+        return pq.read_schema(path).names
+
+    if fmt == "feather":
+        import pyarrow as pa
+        import pyarrow.feather as feather
+        try:
+            with pa.memory_map(path, "r") as source:
+                return pa.ipc.open_file(source).schema.names
+        except pa.ArrowInvalid:
+            # Feather v1 no es un archivo IPC; con memory map la tabla no se copia
+            return feather.read_table(path, memory_map=True).schema.names
+
+    names = {}
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                names.update(dict.fromkeys(json.loads(line)))
+    return list(names)
+
+
+def read_table(path: str, columns: Sequence[str], chunksize: int = 100_000) -> "pd.DataFrame":
+    """
+    Carga solo las columnas pedidas (proyección).
+    Parquet/Feather se abren con memory map, así no se parsea el archivo completo.
+    """
+    import pandas as pd
+    fmt = detect_format(path)
+    columns = list(dict.fromkeys(columns))
+
+    if fmt == "csv":
+        return pd.read_csv(path, usecols=columns)[columns]
+
+    if fmt == "parquet":
+        import pyarrow.parquet as pq
+        return pq.read_table(path, columns=columns, memory_map=True).to_pandas()
+
+    if fmt == "feather":
+        import pyarrow.feather as feather
+        return feather.read_table(path, columns=columns, memory_map=True).to_pandas()
+
+    # JSONL no tiene proyección nativa: se lee por bloques y se descarta el resto
+    parts = [chunk[columns] for chunk in pd.read_json(path, lines=True, chunksize=chunksize)]
+    return pd.concat(parts, ignore_index=True)
+
+
+def read_text_chunks(path: str, column: str, chunksize: int) -> Iterator[List[str]]:
+    """
+    Lee la columna de texto en bloques de `chunksize` filas.
+    Solo se parsea la columna pedida y nunca se tiene el archivo completo en memoria.
+    """
+    import pandas as pd
+    assert chunksize >= 1, "chunksize debe ser >= 1"
+    fmt = detect_format(path)
+
+    if fmt == "csv":
+        for chunk in pd.read_csv(path, usecols=[column], chunksize=chunksize):
+            yield chunk[column].astype(str).tolist()
+
+    elif fmt == "parquet":
+        import pyarrow.parquet as pq
+        pf = pq.ParquetFile(path, memory_map=True)
+        for batch in pf.iter_batches(batch_size=chunksize, columns=[column]):
+            yield batch.column(0).to_pandas().astype(str).tolist()
+
+    elif fmt == "feather":
+        import pyarrow.feather as feather
+        table = feather.read_table(path, columns=[column], memory_map=True)
+        for batch in table.to_batches(max_chunksize=chunksize):
+            yield batch.column(0).to_pandas().astype(str).tolist()
+
+    else:
+        for chunk in pd.read_json(path, lines=True, chunksize=chunksize):
+            yield chunk[column].astype(str).tolist()
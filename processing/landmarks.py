@@ -0,0 +1,81 @@
+import numpy as np
+
+from processing.quantization import QuantizedEmbeddings
+
+# Puntos mínimos por tópico en la muestra (o todos si el tópico es más chico),
+# para que el tópico -1 y los tópicos pequeños aparezcan en la gráfica
+MIN_PER_TOPIC = 20
+
+# Landmarks más cercanos con los que se interpola cada punto
+INTERPOLATION_NEIGHBORS = 10
+
+# Filas por bloque al comparar con los landmarks
+CHUNK_ROWS = 8192
+
+
+def stratified_sample(labels: np.ndarray, size: int, min_per_label: int = MIN_PER_TOPIC,
+                      random_state: int = 42) -> np.ndarray:
+    """
+    Índices (ordenados) de una muestra de ~size filas estratificada por
+    etiqueta: cada etiqueta recibe min(tamaño, min_per_label) filas y el
+    resto de la muestra se reparte en proporción a su tamaño.
+
+    Si hay tantas etiquetas que el mínimo no cabe, cada una recibe
+    size // etiquetas filas (al menos 1, aunque la muestra supere size).
+    """
+    labels = np.asarray(labels)
+    n = len(labels)
+    assert size >= 1, "size debe ser >= 1"
+    if size >= n:
+        return np.arange(n)
+
+    _, inverse, counts = np.unique(labels, return_inverse=True, return_counts=True)
+    floor = np.minimum(counts, min_per_label)
+    if floor.sum() > size:
+        floor = np.minimum(counts, max(1, size // len(counts)))
+
+    # Reparto proporcional del resto (restos mayores para cerrar la cuenta)
+    remaining = max(0, size - int(floor.sum()))
+    capacity = counts - floor
+    share = remaining * capacity / max(1, capacity.sum())
+    extra = np.floor(share).astype(np.int64)
+    leftover = remaining - int(extra.sum())
+    if leftover > 0:
+        extra[np.argsort(extra - share, kind="stable")[:leftover]] += 1
+    quota = floor + np.minimum(extra, capacity)
+
+    # Orden aleatorio dentro de cada etiqueta; se toman las primeras quota[e]
+    rng = np.random.default_rng(random_state)
+    order = np.lexsort((rng.random(n), inverse))
+    starts = np.concatenate([[0], np.cumsum(counts)[:-1]])
+    rank = np.arange(n) - starts[inverse[order]]
+    return np.sort(order[rank < quota[inverse[order]]])
+
+
+def _normalized(block: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(block, axis=1, keepdims=True)
+    return block / np.maximum(norms, 1e-12)
+
+
+def interpolate(embeddings: np.ndarray | QuantizedEmbeddings, landmarks: np.ndarray, coords: np.ndarray,
+                rows: np.ndarray, n_neighbors: int = INTERPOLATION_NEIGHBORS) -> np.ndarray:
+    """
+    Coordenadas de las filas rows como promedio de las coordenadas de sus
+    n_neighbors landmarks más cercanos (similitud coseno), ponderado por
+    el inverso de la distancia. coords[i] son las coordenadas de
+    embeddings[landmarks[i]].
+    """
+    assert len(landmarks) == len(coords), "landmarks y coords deben tener el mismo largo"
+    k = min(n_neighbors, len(landmarks))
+    reference = _normalized(np.asarray(embeddings[landmarks], dtype=np.float32))
+
+    out = np.empty((len(rows), coords.shape[1]), dtype=np.float32)
+    for start in range(0, len(rows), CHUNK_ROWS):
+        block = _normalized(np.asarray(embeddings[rows[start:start + CHUNK_ROWS]], dtype=np.float32))
+        similarity = block @ reference.T
+        nearest = np.argpartition(-similarity, k - 1, axis=1)[:, :k]
+        distances = 1.0 - np.take_along_axis(similarity, nearest, axis=1)
+        weights = 1.0 / (np.maximum(distances, 0) + 1e-6)
+        weights /= weights.sum(axis=1, keepdims=True)
+        out[start:start + len(block)] = np.einsum("ij,ijk->ik", weights, coords[nearest])
+    return out
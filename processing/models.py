@@ -0,0 +1,104 @@
+import os
+import re
+from functools import lru_cache
+from typing import TYPE_CHECKING, Dict, FrozenSet, Iterable, Optional, Tuple
+
+if TYPE_CHECKING:
+    from sentence_transformers import SentenceTransformer
+    from spacy.language import Language
+
+# Cargadores de modelos memoizados por proceso.
+#
+# En una corrida normal cada modelo se carga una vez, igual que antes. En el
+# modo servidor (service/server.py) el proceso vive entre trabajos, así que
+# spaCy, SentenceTransformer y las stopwords de NLTK se cargan solo con el
+# primer trabajo (o con --preload) y los siguientes los reutilizan.
+
+
+@lru_cache(maxsize=None)
+def load_spacy(model_name: str, enable: Tuple[str, ...]) -> "Language":
+    """Modelo de spaCy con solo los componentes de `enable` activos."""
+    import spacy
+    nlp = spacy.load(model_name)
+    keep = [name for name in nlp.pipe_names if name in enable]
+    nlp.select_pipes(enable=keep)
+    return nlp
+
+
+@lru_cache(maxsize=None)
+def load_stopwords(language: str) -> FrozenSet[str]:
+    from nltk.corpus import stopwords
+    return frozenset(stopwords.words(language))
+
+
+def load_sentence_transformer(model_name: str, device: str, revision: Optional[str] = None) -> "SentenceTransformer":
+    # lru_cache distingue (a, b) de (a, b, None): se llama siempre con los tres
+    # argumentos para que preload() y los trabajos compartan la misma entrada
+    return _load_sentence_transformer(model_name, device, revision)
+
+
+@lru_cache(maxsize=4)
+def _load_sentence_transformer(model_name: str, device: str, revision: Optional[str]) -> "SentenceTransformer":
+    from sentence_transformers import SentenceTransformer
+    return SentenceTransformer(model_name, device=device, revision=revision)
+
+
+@lru_cache(maxsize=None)
+def resolve_revision(model_name: str, revision: Optional[str] = None) -> Optional[str]:
+    """
+    Hash del commit de un modelo del Hub para revision (rama o tag; None =
+    "main"). Las llaves de la caché de embeddings y el modelo que se carga
+    quedan fijos a ese commit, no a una rama que puede moverse. Un hash de
+    40 caracteres se devuelve tal cual y un modelo en un directorio local
+    devuelve None.
+
+    Se consulta el Hub; sin red se usa la referencia que dejó la última
+    descarga en la caché local de huggingface_hub.
+    """
+    if os.path.isdir(model_name):
+        return None
+    if revision and re.fullmatch(r"[0-9a-f]{40}", revision):
+        return revision
+
+    # Como SentenceTransformer: un nombre sin organización es de sentence-transformers/
+    repo_id = model_name if "/" in model_name else f"sentence-transformers/{model_name}"
+    branch = revision or "main"
+    try:
+        from huggingface_hub import HfApi
+        return HfApi().model_info(repo_id, revision=branch).sha
+    except OSError:
+        # Errores de red y de modo offline de huggingface_hub heredan de OSError
+        from huggingface_hub.constants import HF_HUB_CACHE
+        ref_path = os.path.join(HF_HUB_CACHE, f"models--{repo_id.replace('/', '--')}", "refs", branch)
+        if os.path.isfile(ref_path):
+            with open(ref_path, encoding="utf-8") as f:
+                return f.read().strip()
+
+    raise ValueError(f"No se pudo resolver la revisión '{branch}' de {model_name} (sin red ni copia local); "
+                     f"indica embedding_model_revision con el hash del commit")
+
+
+def default_device() -> str:
+    import torch
+    return "cuda" if torch.cuda.is_available() else "cpu"
+
+
+def preload(languages: Iterable[str], embedding_model: Optional[str] = None):
+    """Carga por adelantado los modelos que usará el pipeline (modo servidor)."""
+    from processing.preprocess import TextPreprocessor
+
+    for language in languages:
+        load_stopwords(language)
+        load_spacy(TextPreprocessor.SPACY_MODELS[language], TextPreprocessor.LEMMA_PIPES)
+    if embedding_model:
+        # Misma revisión resuelta que usará TopicModeler, para compartir la entrada de la caché
+        load_sentence_transformer(embedding_model, default_device(), resolve_revision(embedding_model))
+
+
+def loaded_models() -> Dict[str, int]:
+    """Cantidad de modelos residentes por tipo (para /health del servidor)."""
+    return {
+        "spacy": load_spacy.cache_info().currsize,
+        "stopwords": load_stopwords.cache_info().currsize,
+        "sentence_transformers": _load_sentence_transformer.cache_info().currsize,
+    }
@@ -0,0 +1,126 @@
+import time
+from typing import Optional, Tuple
+
+import numpy as np
+
+# Vecinos que usa cada consumidor del grafo. Los parámetros adaptativos de
+# la visualización viven aquí para que el pipeline sepa, antes de ajustar
+# BERTopic, el k más grande que se va a pedir.
+
+# UMAP interno de BERTopic (mismos parámetros que su UMAP por defecto)
+BERTOPIC_UMAP_NEIGHBORS = 15
+
+
+def umap_neighbors(n: int) -> int:
+    """n_neighbors del UMAP 3D: sqrt(N), limitado entre 5 y 50 y no mayor a N-1."""
+    return max(5, min(int(np.sqrt(n)), 50, n - 1))
+
+
+def tsne_perplexity(n: int) -> int:
+    """perplexity del t-SNE 3D: sqrt(N), limitada entre 5 y 50 y menor que N."""
+    return max(5, min(int(np.sqrt(n)), 50, max(2, n - 1)))
+
+
+def tsne_neighbors(n: int) -> int:
+    """Vecinos (sin contar el propio punto) que usa t-SNE Barnes-Hut: 3 * perplexity + 1."""
+    return min(n - 1, 3 * tsne_perplexity(n) + 1)
+
+
+def required_neighbors(n: int, landmarks: Optional[int] = None) -> int:
+    """
+    k del grafo (contando el propio punto) que cubre a BERTopic, UMAP 3D y
+    t-SNE 3D para N puntos. Si no es menor que N el corpus es tan chico que
+    no vale la pena compartir vecinos.
+
+    Si la visualización se ajusta sobre landmarks (landmarks < N) no usa el
+    grafo y basta con los vecinos de BERTopic.
+    """
+    if landmarks is not None and landmarks < n:
+        return BERTOPIC_UMAP_NEIGHBORS
+    return max(BERTOPIC_UMAP_NEIGHBORS, umap_neighbors(n), tsne_neighbors(n) + 1)
+
+
+class NeighborGraph:
+    """
+    Grafo kNN aproximado (pynndescent, distancia coseno) sobre una matriz de
+    embeddings, calculado una sola vez y reutilizado por:
+
+        - el UMAP interno de BERTopic y el UMAP 3D (precomputed_knn)
+        - t-SNE 3D (metric="precomputed" con la matriz dispersa de distancias)
+
+    indices / distances son (N, k): los k vecinos más cercanos de cada punto,
+    ordenados por distancia (el primero suele ser el propio punto).
+    """
+
+    def __init__(self, indices: np.ndarray, distances: np.ndarray, search_index=None):
+        assert indices.shape == distances.shape, "indices y distances deben tener la misma forma"
+        self.indices = indices
+        self.distances = distances
+        # NNDescent: UMAP lo usa en transform() para puntos nuevos
+        self.search_index = search_index
+        self.build_seconds = 0.0
+
+    @property
+    def k(self) -> int:
+        return self.indices.shape[1]
+
+    def __len__(self) -> int:
+        return self.indices.shape[0]
+
+    @classmethod
+    def build(cls, embeddings: np.ndarray, k: int, random_state: int = 42) -> "NeighborGraph":
+        """Grafo de k vecinos (incluido el propio punto) con los parámetros de NNDescent que usa UMAP."""
+        from pynndescent import NNDescent
+
+        n = len(embeddings)
+        assert 2 <= k < n, "k debe estar entre 2 y N-1"
+
+        start = time.perf_counter()
+        index = NNDescent(
+            embeddings,
+            n_neighbors=k,
+            metric="cosine",
+            n_trees=min(64, 5 + int(round(n ** 0.5 / 20.0))),
+            n_iters=max(5, int(round(np.log2(n)))),
+            max_candidates=60,
+            low_memory=True,
+            random_state=random_state,
+            verbose=False
+        )
+        indices, distances = index.neighbor_graph
+        graph = cls(indices, distances.astype(np.float32, copy=False), search_index=index)
+        graph.build_seconds = time.perf_counter() - start
+        print(f"[NeighborGraph] → Grafo de {k} vecinos para {n} puntos en {graph.build_seconds:.1f} s")
+        return graph
+
+    def umap_knn(self, n_neighbors: int) -> Tuple[np.ndarray, np.ndarray, Optional[object]]:
+        """Tupla para UMAP(precomputed_knn=...); UMAP recorta a sus n_neighbors."""
+        assert n_neighbors <= self.k, f"El grafo tiene {self.k} vecinos; se pidieron {n_neighbors}"
+        return self.indices, self.distances, self.search_index
+
+    def tsne_distances(self, n_neighbors: int):
+        """
+        Matriz dispersa (N x N) con la distancia a los n_neighbors vecinos más
+        cercanos de cada punto para TSNE(metric="precomputed"). Como en
+        KNeighborsTransformer, cada fila empieza con el propio punto
+        (distancia 0 explícita), que sklearn descarta al buscar vecinos.
+        """
+        from scipy import sparse
+
+        n = len(self)
+        assert n_neighbors < self.k, f"El grafo tiene {self.k - 1} vecinos además del punto; se pidieron {n_neighbors}"
+
+        # Quitar el propio punto de cada fila (o el vecino más lejano si no aparece)
+        not_self = self.indices != np.arange(n)[:, None]
+        missing_self = not_self.all(axis=1)
+        not_self[missing_self, -1] = False
+        indices = self.indices[not_self].reshape(n, self.k - 1)[:, :n_neighbors]
+        distances = self.distances[not_self].reshape(n, self.k - 1)[:, :n_neighbors]
+
+        # Coseno en float32 puede dar -1e-7 para puntos idénticos
+        distances = np.maximum(distances, 0)
+        indices = np.hstack([np.arange(n)[:, None], indices])
+        distances = np.hstack([np.zeros((n, 1), dtype=distances.dtype), distances])
+        width = n_neighbors + 1
+        indptr = np.arange(0, n * width + 1, width)
+        return sparse.csr_matrix((distances.ravel(), indices.ravel(), indptr), shape=(n, n))
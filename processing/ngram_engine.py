@@ -0,0 +1,220 @@
+import os
+from typing import Dict, Iterable, List, Sequence, Tuple
+
+import numpy as np
+
+
+def key_bits(vocab_size: int) -> int:
+    """Bits necesarios para representar cualquier id del vocabulario."""
+    return max(int(vocab_size) - 1, 1).bit_length()
+
+
+class NgramTable:
+    """
+    Conteo exacto de los n-gramas de un orden n.
+
+        keys:   clave de cada n-grama distinto. Si n * bits <= 63 los ids se
+                empaquetan en un solo int64; si no, cada clave es la fila de
+                ids int32 vista como np.void.
+        counts: frecuencia de cada clave (int64)
+        first:  posición (en tokens) de la primera aparición; sirve para
+                desempatar igual que Counter.most_common
+
+    Las tablas del mismo (n, bits) se pueden combinar con merge() de forma
+    exacta, así que sirven como resultados parciales (bloques, procesos).
+    """
+
+    def __init__(self, n: int, bits: int, keys: np.ndarray, counts: np.ndarray, first: np.ndarray):
+        self.n = n
+        self.bits = bits
+        self.keys = keys
+        self.counts = counts
+        self.first = first
+
+    @classmethod
+    def empty(cls, n: int, bits: int) -> "NgramTable":
+        dtype = np.int64 if n * bits <= 63 else np.dtype((np.void, 4 * n))
+        return cls(n, bits, np.zeros(0, dtype=dtype), np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64))
+
+    @classmethod
+    def from_occurrences(cls, n: int, bits: int, keys: np.ndarray, positions: np.ndarray) -> "NgramTable":
+        """Cuenta una clave por aparición (con su posición) usando np.unique."""
+        if len(keys) == 0:
+            return cls.empty(n, bits)
+        uniq, idx, counts = np.unique(keys, return_index=True, return_counts=True)
+        return cls(n, bits, uniq, counts.astype(np.int64), positions[idx])
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    @property
+    def packed(self) -> bool:
+        return self.keys.dtype == np.int64
+
+    @property
+    def nbytes(self) -> int:
+        return self.keys.nbytes + self.counts.nbytes + self.first.nbytes
+
+    def top_k(self, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Las k claves más frecuentes (empates: primera aparición).
+        Selección parcial con np.partition; solo se ordenan los candidatos.
+        """
+        selected = self.top_indices(k)
+        return self.keys[selected], self.counts[selected]
+
+    def top_indices(self, k: int) -> np.ndarray:
+        """Índices de las k claves más frecuentes, ordenados como top_k()."""
+        assert k >= 1, "k must be >= 1"
+        counts = self.counts
+        candidates = np.arange(len(counts))
+        if len(counts) > k:
+            kth = np.partition(counts, len(counts) - k)[len(counts) - k]
+            candidates = np.flatnonzero(counts >= kth)
+
+        order = np.lexsort((self.first[candidates], -counts[candidates]))[:k]
+        return candidates[order]
+
+    def decode(self, keys: np.ndarray) -> np.ndarray:
+        """Claves -> matriz (m, n) de ids."""
+        if self.packed:
+            mask = (1 << self.bits) - 1
+            cols = [(keys >> (self.bits * (self.n - 1 - j))) & mask for j in range(self.n)]
+            return np.stack(cols, axis=1) if len(keys) else np.zeros((0, self.n), dtype=np.int64)
+        return np.frombuffer(keys.tobytes(), dtype=np.int32).reshape(-1, self.n)
+
+    @staticmethod
+    def merge(tables: Sequence["NgramTable"]) -> "NgramTable":
+        """Combina tablas parciales del mismo orden sumando conteos (exacto)."""
+        assert tables, "No tables to merge"
+        n, bits = tables[0].n, tables[0].bits
+        assert all(t.n == n and t.bits == bits for t in tables), "Tables must share n and bits"
+
+        tables = [t for t in tables if len(t)]
+        if not tables:
+            return NgramTable.empty(n, bits)
+        if len(tables) == 1:
+            return tables[0]
+
+        keys = np.concatenate([t.keys for t in tables])
+        counts = np.concatenate([t.counts for t in tables])
+        first = np.concatenate([t.first for t in tables])
+
+        uniq, inverse = np.unique(keys, return_inverse=True)
+        inverse = inverse.ravel()
+        merged_counts = np.zeros(len(uniq), dtype=np.int64)
+        np.add.at(merged_counts, inverse, counts)
+        merged_first = np.full(len(uniq), np.iinfo(np.int64).max, dtype=np.int64)
+        np.minimum.at(merged_first, inverse, first)
+        return NgramTable(n, bits, uniq, merged_counts, merged_first)
+
+
+def count_ngrams(ids: np.ndarray, offsets: np.ndarray, orders: Iterable[int], bits: int,
+                 position_offset: int = 0) -> Dict[int, NgramTable]:
+    """
+    Cuenta varios órdenes de n-gramas en una sola pasada sobre los ids.
+
+    - ids/offsets: formato de TokenStore (tokens de cada documento contiguos).
+    - Solo se cuentan n-gramas dentro de un mismo documento.
+    - La clave de orden n se construye a partir de la de orden n-1
+      (desplazamiento de bits + id siguiente), sin copiar listas de tokens.
+    - position_offset se suma a las posiciones (p. ej. tokens de bloques previos).
+    """
+    orders = sorted(set(orders))
+    assert orders and orders[0] >= 1, "n must be >= 1"
+
+    ids = np.asarray(ids, dtype=np.int64)
+    offsets = np.asarray(offsets, dtype=np.int64)
+    total = len(ids)
+
+    # Fin (exclusivo) del documento al que pertenece cada token
+    doc_end = np.repeat(offsets[1:], np.diff(offsets))
+    positions = np.arange(total, dtype=np.int64)
+
+    tables = {}
+    keys = None
+    for n in range(1, orders[-1] + 1):
+        m = total - n + 1
+        if m <= 0:
+            for order in orders:
+                if order >= n:
+                    tables[order] = NgramTable.empty(order, bits)
+            break
+
+        if n * bits <= 63:
+            keys = ids[:m].copy() if keys is None else (keys[:m] << bits) | ids[n - 1:]
+        else:
+            rows = np.stack([ids[j:j + m] for j in range(n)], axis=1).astype(np.int32)
+            keys = np.ascontiguousarray(rows).view(np.dtype((np.void, 4 * n))).ravel()
+
+        if n in orders:
+            valid = positions[:m] + n <= doc_end[:m]
+            tables[n] = NgramTable.from_occurrences(n, bits, keys[valid], positions[:m][valid] + position_offset)
+
+        if keys.dtype != np.int64:
+            # Las claves void no se pueden extender: se reconstruyen en el siguiente orden
+            keys = None
+
+    return tables
+
+
+def resolve_jobs(n_jobs: int) -> int:
+    """n_jobs <= 0 significa todos los núcleos (como n_process de spaCy)."""
+    return (os.cpu_count() or 1) if n_jobs <= 0 else n_jobs
+
+
+def shard_bounds(offsets: np.ndarray, n_shards: int) -> List[Tuple[int, int]]:
+    """
+    Parte los documentos en hasta n_shards rangos [inicio, fin) contiguos
+    con una cantidad similar de tokens. Los cortes siempre caen entre
+    documentos.
+    """
+    n_docs = len(offsets) - 1
+    if n_docs == 0:
+        return []
+    targets = np.linspace(offsets[0], offsets[-1], n_shards + 1)[1:-1]
+    cuts = np.searchsorted(offsets, targets, side="left")
+    cuts = np.unique(np.concatenate([[0], np.clip(cuts, 0, n_docs), [n_docs]]))
+    return [(int(a), int(b)) for a, b in zip(cuts[:-1], cuts[1:]) if b > a]
+
+
+def shard_tasks(ids: np.ndarray, offsets: np.ndarray, bounds: Sequence[Tuple[int, int]],
+                orders: Iterable[int], bits: int, position_offset: int = 0) -> List[tuple]:
+    """Argumentos de count_ngrams() para cada rango de documentos."""
+    orders = tuple(orders)
+    tasks = []
+    for start, end in bounds:
+        lo, hi = int(offsets[start]), int(offsets[end])
+        tasks.append((ids[lo:hi], offsets[start:end + 1] - lo, orders, bits, position_offset + lo))
+    return tasks
+
+
+def count_ngrams_parallel(ids: np.ndarray, offsets: np.ndarray, orders: Iterable[int], bits: int,
+                          n_jobs: int = 1, position_offset: int = 0) -> Dict[int, NgramTable]:
+    """
+    count_ngrams() repartido en un pool de procesos.
+
+    Los documentos se dividen en un shard por proceso; cada proceso cuenta
+    todos los órdenes de su shard y devuelve sus NgramTable, que se combinan
+    con NgramTable.merge. Como las posiciones son globales, el resultado
+    (incluidos los desempates) es idéntico al de count_ngrams().
+    """
+    orders = sorted(set(orders))
+    ids = np.asarray(ids, dtype=np.int64)
+    offsets = np.asarray(offsets, dtype=np.int64)
+    n_jobs = resolve_jobs(n_jobs)
+
+    bounds = shard_bounds(offsets, n_jobs)
+    if n_jobs == 1 or len(bounds) < 2:
+        return count_ngrams(ids, offsets, orders, bits, position_offset)
+
+    import multiprocessing
+    from concurrent.futures import ProcessPoolExecutor
+
+    # spawn: el conteo puede lanzarse desde un hilo del pipeline mientras
+    # otras etapas (torch, BERTopic) tienen hilos activos; un fork así puede bloquearse
+    tasks = shard_tasks(ids, offsets, bounds, orders, bits, position_offset)
+    with ProcessPoolExecutor(max_workers=len(tasks), mp_context=multiprocessing.get_context("spawn")) as pool:
+        parts = list(pool.map(count_ngrams, *zip(*tasks)))
+
+    return {n: NgramTable.merge([part[n] for part in parts]) for n in orders}
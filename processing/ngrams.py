@@ -1,70 +1,280 @@
-from collections import Counter
-from typing import List, Tuple
-import matplotlib.pyplot as plt
-import io
-import base64
+from typing import Any, Dict, Iterable, List, Tuple
+
+import numpy as np
+
+from processing.ngram_engine import (
+    NgramTable, count_ngrams, count_ngrams_parallel, key_bits, resolve_jobs, shard_tasks,
+)
+from processing.rendering import error_bars, render_chart
+from processing.sketch import SpaceSavingSketch
+from processing.tokenstore import TokenStore
 
 class NgramCreator:
-    def __init__(self, tokens: List[str], palette: str, top_k: int = 10):
-        assert isinstance(tokens, list) and len(tokens) > 0, "Tokens list cannot be empty"
+    """
+    Conteo de n-gramas sobre ids enteros (TokenStore).
+
+    Los n-gramas no cruzan el límite entre documentos. Cada n-grama se
+    empaqueta en una clave entera y se cuenta con np.unique; varios órdenes
+    se calculan en una sola pasada (compute_many) y el top-k se obtiene con
+    selección parcial.
+
+    Con approx=True los conteos van a un SpaceSavingSketch por orden: la
+    memoria queda fija (sketch_capacity claves + un bloque de SKETCH_BLOCK
+    tokens) sin importar el tamaño del corpus, y cada conteo viene con su
+    cota de error (self.errors), que se dibuja en las gráficas.
+
+    Con n_jobs > 1 los documentos se reparten en un pool de procesos; cada
+    uno devuelve tablas parciales que se combinan de forma exacta (mismo
+    resultado que n_jobs=1). En modo approx se cuentan n_jobs bloques a la vez.
+    """
+
+    # Bits por id en modo streaming: fijos para que las claves de bloques
+    # distintos sean compatibles aunque el vocabulario crezca (hasta 2M palabras)
+    STREAM_BITS = 21
+
+    # Tablas parciales que se acumulan antes de combinarlas (modo streaming)
+    MERGE_EVERY = 8
+
+    # Tokens por bloque que se cuentan de forma exacta antes de pasar al sketch (modo approx)
+    SKETCH_BLOCK = 1 << 20
+
+    def __init__(self, tokens: TokenStore | List[str] | None = None, palette: str = "okabe_ito",
+                 top_k: int = 10, approx: bool = False, sketch_capacity: int = 100_000,
+                 n_jobs: int = 1):
+        # tokens=None -> modo streaming: los conteos se acumulan con update()
+        if tokens is not None and not isinstance(tokens, TokenStore):
+            assert isinstance(tokens, list) and len(tokens) > 0, "Tokens list cannot be empty"
+            tokens = TokenStore.from_tokens(tokens)
+        if tokens is not None:
+            assert len(tokens) > 0, "Tokens list cannot be empty"
         self.tokens = tokens
         self.palette = palette
         self.top_k = top_k
         self.results = {}
 
+        assert sketch_capacity >= top_k, "sketch_capacity must be >= top_k"
+        self.approx = approx
+        self.sketch_capacity = sketch_capacity
+        self.sketches: Dict[int, SpaceSavingSketch] = {}
+        self.errors: Dict[int, List[int]] = {}
+        self.n_jobs = resolve_jobs(n_jobs)
+
+        # Tablas de conteo exacto por orden n
+        self.tables: Dict[int, NgramTable] = {}
+
+        # Estado del modo streaming: vocabulario global y tablas parciales
+        self._vocab = TokenStore()
+        self._pending: Dict[int, List[NgramTable]] = {}
+        self._n_tokens = 0
+
+    @property
+    def vocab(self) -> List[str]:
+        return self.tokens.vocab if self.tokens is not None else self._vocab.vocab
+
+    def update(self, tokens: TokenStore | List[str], orders: Iterable[int] = (1, 2, 3)):
+        """
+        Acumula los conteos de un bloque de documentos (modo streaming).
+        Los ids del bloque se traducen al vocabulario global y sus tablas
+        parciales se combinan de forma exacta con las anteriores.
+        """
+        assert self.tokens is None, "update() is only available in streaming mode (tokens=None)"
+        if not isinstance(tokens, TokenStore):
+            tokens = TokenStore.from_tokens(tokens)
+
+        mapping = np.fromiter((self._vocab.token_id(w) for w in tokens.vocab),
+                              dtype=np.int64, count=len(tokens.vocab))
+        assert len(self._vocab.vocab) <= 1 << self.STREAM_BITS, "Vocabulary too large for streaming mode"
+
+        ids = mapping[tokens.ids]
+        position_offset = self._n_tokens
+        self._n_tokens += len(tokens)
+
+        if self.approx:
+            self._count_sketch(ids, tokens.offsets, orders, self.STREAM_BITS, position_offset)
+            return self
+
+        tables = count_ngrams_parallel(ids, tokens.offsets, orders, bits=self.STREAM_BITS,
+                                       n_jobs=self.n_jobs, position_offset=position_offset)
+        for n, table in tables.items():
+            pending = self._pending.setdefault(n, [])
+            pending.append(table)
+            if len(pending) >= self.MERGE_EVERY:
+                self._pending[n] = [NgramTable.merge(pending)]
+        return self
+
+    def _count_sketch(self, ids: np.ndarray, offsets: np.ndarray, orders: Iterable[int], bits: int,
+                      position_offset: int = 0):
+        """
+        Cuenta por bloques de ~SKETCH_BLOCK tokens (cortando entre documentos)
+        y agrega cada bloque al sketch de su orden. Con n_jobs > 1 se cuentan
+        n_jobs bloques a la vez, así la memoria sigue acotada.
+        """
+        n_docs = len(offsets) - 1
+        bounds = []
+        start = 0
+        while start < n_docs:
+            # Último documento cuyo final cabe en el bloque (al menos uno)
+            end = int(np.searchsorted(offsets, offsets[start] + self.SKETCH_BLOCK, side="right")) - 1
+            end = min(max(end, start + 1), n_docs)
+            bounds.append((start, end))
+            start = end
+
+        pool = None
+        if self.n_jobs > 1 and len(bounds) > 1:
+            import multiprocessing
+            from concurrent.futures import ProcessPoolExecutor
+            # spawn: ver count_ngrams_parallel
+            pool = ProcessPoolExecutor(max_workers=self.n_jobs, mp_context=multiprocessing.get_context("spawn"))
+
+        try:
+            for i in range(0, len(bounds), self.n_jobs):
+                tasks = shard_tasks(ids, offsets, bounds[i:i + self.n_jobs], orders, bits, position_offset)
+                if pool is None:
+                    parts = [count_ngrams(*task) for task in tasks]
+                else:
+                    parts = list(pool.map(count_ngrams, *zip(*tasks)))
+
+                for tables in parts:
+                    for n, table in tables.items():
+                        if n not in self.sketches:
+                            self.sketches[n] = SpaceSavingSketch(n, bits, self.sketch_capacity)
+                        self.sketches[n].update(table)
+        finally:
+            if pool is not None:
+                pool.shutdown()
+
+    def _table(self, n: int) -> NgramTable:
+        if n in self._pending:
+            self.tables[n] = NgramTable.merge(self._pending.pop(n))
+        return self.tables[n]
+
+    def word_frequencies(self) -> Dict[str, int]:
+        """Frecuencia de cada palabra (del TokenStore o de los unigramas acumulados con update())."""
+        if self.tokens is not None:
+            return self.tokens.frequencies()
+        if self.approx:
+            assert 1 in self.sketches, "No unigrams accumulated. Call update() with 1 in orders."
+            table = self.sketches[1].table
+        else:
+            assert 1 in self._pending or 1 in self.tables, "No unigrams accumulated. Call update() with 1 in orders."
+            table = self._table(1)
+        vocab = self.vocab
+        return {vocab[i]: c for i, c in zip(table.decode(table.keys)[:, 0].tolist(), table.counts.tolist())}
+
+    def compute_many(self, orders: Iterable[int]) -> Dict[int, List[Tuple[tuple, int]]]:
+        """Calcula varios órdenes n en una sola pasada sobre los tokens."""
+        orders = sorted(set(orders))
+        assert orders and orders[0] >= 1, "n must be >= 1"
+
+        if self.tokens is None:
+            for n in orders:
+                assert n in self._pending or n in self.tables or n in self.sketches, \
+                    f"No {n}-grams accumulated. Call update() first."
+        elif self.approx:
+            missing = [n for n in orders if n not in self.sketches]
+            if missing:
+                bits = key_bits(len(self.tokens.vocab))
+                self._count_sketch(self.tokens.ids, self.tokens.offsets, missing, bits)
+        else:
+            missing = [n for n in orders if n not in self.tables]
+            if missing:
+                bits = key_bits(len(self.tokens.vocab))
+                self.tables.update(count_ngrams_parallel(self.tokens.ids, self.tokens.offsets, missing, bits,
+                                                         n_jobs=self.n_jobs))
+
+        return {n: self._top(n) for n in orders}
+
     def compute(self, n: int) -> List[Tuple[tuple, int]]:
         assert n >= 1, "n must be >= 1"
+        return self.compute_many([n])[n]
+
+    def _top(self, n: int) -> List[Tuple[tuple, int]]:
+        if self.approx:
+            return self._top_approx(n)
+
+        table = self._table(n)
+        if len(table) == 0:
+            counts = []
+        else:
+            keys, values = table.top_k(self.top_k)
+            vocab = self.vocab
+            counts = [
+                (tuple(vocab[i] for i in row), int(c))
+                for row, c in zip(table.decode(keys).tolist(), values.tolist())
+            ]
+
+        self.results[n] = counts
+        return counts
 
-        # Generar los n-gramas usando zip
-        ngrams = zip(*[self.tokens[i:] for i in range(n)])
-        counts = Counter(ngrams).most_common(self.top_k)
+    def _top_approx(self, n: int) -> List[Tuple[tuple, int]]:
+        sketch = self.sketches[n]
+        keys, values, errors = sketch.top_k(self.top_k)
+        vocab = self.vocab
+        counts = [
+            (tuple(vocab[i] for i in row), int(c))
+            for row, c in zip(sketch.decode(keys).tolist(), values.tolist())
+        ]
 
         self.results[n] = counts
+        self.errors[n] = errors.tolist()
         return counts
 
+    def error_bound(self, n: int) -> Tuple[int, int]:
+        """
+        (floor, total) del sketch de orden n: ningún n-grama fuera del sketch
+        aparece más de floor veces, y floor <= total / sketch_capacity.
+        """
+        assert n in self.sketches, f"No approximate {n}-grams computed yet."
+        sketch = self.sketches[n]
+        return sketch.floor, sketch.total
+
     def plot(self, n: int, angle: int = 60):
+        import matplotlib.pyplot as plt
         assert n in self.results, f"No {n}-grams computed yet. Call compute({n}) first."
 
         labels = [" ".join(g) for g, _ in self.results[n]]
         values = [c for _, c in self.results[n]]
 
-        plt.figure(figsize=(10, 5))
-        plt.bar(labels, values, color=self._get_palette(self.palette))
+        fig = plt.figure(figsize=(10, 5))
+        plt.bar(labels, values, color=self._get_palette(self.palette), **error_bars(self.errors.get(n)))
         plt.xticks(rotation=angle)
-        plt.title(f"Top {len(values)} {n}-grams")
+        plt.title(self._title(n, len(values)))
         plt.xlabel("N-gramas")
         plt.ylabel("Frecuencia")
         plt.tight_layout()
         plt.show()
+        # Con un backend no interactivo show() no cierra la figura
+        plt.close(fig)
+
+    def _title(self, n: int, k: int) -> str:
+        if n not in self.errors:
+            return f"Top {k} {n}-grams"
+        return f"Top {k} {n}-grams (aprox., error máx. {self.sketches[n].floor})"
 
     def _get_palette(self, name):
         from utils.color_palettes import COLOR_SCHEMES
         return COLOR_SCHEMES[name]
     
-    def plot_to_base64(self, n: int, angle: int = 60):
+    def chart_spec(self, n: int, angle: int = 60) -> Dict[str, Any]:
+        """Spec de la gráfica de barras del top de n-gramas (ver processing/rendering.py)."""
         assert n in self.results, f"No {n}-grams computed yet. Call compute({n}) first."
 
-        labels = [" ".join(g) for g, _ in self.results[n]]
-        values = [c for _, c in self.results[n]]
-
         palette = self._get_palette(self.palette)
-        color = palette[len(palette) // 2]
-
-        fig = plt.figure(figsize=(10, 5))
-        plt.bar(labels, values, color=color, hatch="//")
-        plt.xticks(rotation=angle)
-        plt.title(f"Top {len(values)} {n}-grams")
-        plt.xlabel("N-gramas")
-        plt.ylabel("Frecuencia")
-        plt.tight_layout()
-
-        buffer = io.BytesIO()
-        fig.savefig(buffer, format="png")
-        buffer.seek(0)
-        b64 = base64.b64encode(buffer.read()).decode("utf-8")
-        plt.close(fig)
+        return {
+            "kind": "bar",
+            "labels": [" ".join(g) for g, _ in self.results[n]],
+            "values": [c for _, c in self.results[n]],
+            "errors": self.errors.get(n),
+            "title": self._title(n, len(self.results[n])),
+            "xlabel": "N-gramas",
+            "ylabel": "Frecuencia",
+            "color": palette[len(palette) // 2],
+            "hatch": "//",
+            "angle": angle,
+        }
 
-        return b64
+    def plot_to_base64(self, n: int, angle: int = 60):
+        return render_chart(self.chart_spec(n, angle))
     
     def run_all(self, angle: int = 60):
         """
@@ -76,10 +286,9 @@ class NgramCreator:
         - devuelve un dict con los 3 resultados
         """
 
-        # 1) calcular n-gramas
-        unigrams = self.compute(1)
-        bigrams = self.compute(2)
-        trigrams = self.compute(3)
+        # 1) calcular n-gramas (una sola pasada)
+        results = self.compute_many((1, 2, 3))
+        unigrams, bigrams, trigrams = results[1], results[2], results[3]
 
         # 2) graficar
         self.plot(1, angle)
@@ -0,0 +1,190 @@
+import importlib.util
+import re
+import string
+import unicodedata
+from typing import Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+
+
+class TextNormalizer:
+    """
+    Motor de normalización por columnas, equivalente a
+    TextPreprocessor.clean() + remove_stopwords() pero trabajando sobre la
+    columna completa en lugar de encadenar varias llamadas a re.sub por
+    documento.
+
+    Dos backends con la misma salida:
+      - pyarrow (si está instalado, para listas, object o string[pyarrow]):
+        minúsculas y NFD con pyarrow.compute; el filtro ASCII y el paso
+        símbolos -> espacio se hacen con numpy directamente sobre el buffer
+        de bytes; los espacios y las stopwords se resuelven partiendo en
+        palabras (split), filtrando con is_in y volviendo a unir (join).
+      - Python puro: NFD + encode("ascii") y una tabla str.translate ASCII
+        que convierte símbolos y dígitos en espacios; split/join para los
+        espacios.
+    """
+
+    # Contracciones en inglés, en el mismo orden que _normalize_contractions
+    CONTRACTIONS = [
+        (re.compile(r"n't\b"), " not"),
+        (re.compile(r"'re\b"), " are"),
+        (re.compile(r"'m\b"), " am"),
+        (re.compile(r"'ll\b"), " will"),
+    ]
+
+    # Tras quitar acentos el texto es ASCII: todo lo que no sea [a-z] es un espacio
+    SYMBOLS_TABLE = str.maketrans({
+        chr(c): " " for c in range(128) if chr(c) not in string.ascii_lowercase
+    })
+
+    # La misma tabla, byte a byte, para el backend pyarrow
+    SYMBOLS_LUT = np.full(256, ord(" "), dtype=np.uint8)
+    SYMBOLS_LUT[ord("a"):ord("z") + 1] = np.arange(ord("a"), ord("z") + 1, dtype=np.uint8)
+
+    def __init__(self, language: str = "spanish", stopwords: Optional[Iterable[str]] = None,
+                 use_arrow: Optional[bool] = None):
+        self.language = language
+        self.stopwords = set(stopwords) if stopwords is not None else None
+
+        # Por defecto se usa pyarrow si está instalado (sin importarlo aquí)
+        if use_arrow is None:
+            use_arrow = importlib.util.find_spec("pyarrow") is not None
+        self.use_arrow = use_arrow
+        self._stopwords_array = None
+
+    # ------ API ------
+    def normalize(self, texts) -> pd.Series:
+        """Equivalente vectorizado de TextPreprocessor.clean()."""
+        s = self._as_series(texts)
+        if self.use_arrow:
+            return self._from_arrow(self._join_words(self._fold_arrow(self._to_arrow(s))), s)
+        return pd.Series([self._normalize_one(t) for t in s], index=s.index, dtype=object)
+
+    def remove_stopwords(self, texts) -> pd.Series:
+        """
+        Equivalente vectorizado de TextPreprocessor.remove_stopwords().
+        Espera textos ya normalizados (tokens [a-z]+ separados por un espacio).
+        """
+        s = self._as_series(texts)
+        if not self.stopwords:
+            return s
+        if self.use_arrow:
+            return self._from_arrow(self._join_words(self._to_arrow(s), self._stopwords_arrow()), s)
+
+        sw = self.stopwords
+        filtered = [" ".join(w for w in t.split() if w not in sw) for t in s]
+        return pd.Series(filtered, index=s.index, dtype=object)
+
+    def transform(self, texts) -> List[str]:
+        """normalize() + remove_stopwords() en una sola pasada; devuelve una lista."""
+        if self.use_arrow:
+            s = self._as_series(texts)
+            stopwords = self._stopwords_arrow() if self.stopwords else None
+            return self._join_words(self._fold_arrow(self._to_arrow(s)), stopwords).to_pylist()
+        return self.remove_stopwords(self.normalize(texts)).tolist()
+
+    # ------ BACKEND PYTHON ------
+    def _normalize_one(self, text: str) -> str:
+        t = unicodedata.normalize("NFD", text.lower()).encode("ascii", "ignore").decode("ascii")
+
+        # Las contracciones necesitan el apóstrofo, así que van antes de quitar símbolos
+        if self.language == "english" and "'" in t:
+            for pattern, repl in self.CONTRACTIONS:
+                t = pattern.sub(repl, t)
+
+        return " ".join(t.translate(self.SYMBOLS_TABLE).split())
+
+    # ------ BACKEND ARROW ------
+    def _fold_arrow(self, arr):
+        """
+        Minúsculas, sin acentos ni caracteres no ASCII y con todo lo que no
+        sea [a-z] convertido en espacio (los espacios aún no se colapsan).
+        """
+        import pyarrow as pa
+        import pyarrow.compute as pc
+
+        arr = pc.utf8_normalize(pc.utf8_lower(arr), form="NFD")
+
+        # Quitar los bytes >= 0x80 (marcas de acento y cualquier otro carácter no ASCII)
+        offsets, data = self._buffers(arr)
+        non_ascii = np.flatnonzero(data >= 0x80)
+        if len(non_ascii):
+            rows = np.searchsorted(offsets, non_ascii, side="right") - 1
+            removed = np.zeros(len(offsets), dtype=np.int64)
+            np.cumsum(np.bincount(rows, minlength=len(offsets) - 1), out=removed[1:])
+            data = np.delete(data, non_ascii)
+            offsets = offsets - removed
+
+        if self.language == "english":
+            arr = pa.LargeStringArray.from_buffers(len(offsets) - 1, pa.py_buffer(offsets), pa.py_buffer(data))
+            for pattern, repl in self.CONTRACTIONS:
+                arr = pc.replace_substring_regex(arr, pattern.pattern, repl)
+            offsets, data = self._buffers(arr)
+
+        data = self.SYMBOLS_LUT[data]
+        return pa.LargeStringArray.from_buffers(len(offsets) - 1, pa.py_buffer(offsets), pa.py_buffer(data))
+
+    def _join_words(self, arr, stopwords=None):
+        """
+        Parte en palabras, descarta vacíos (espacios repetidos o en los
+        extremos) y stopwords, y vuelve a unir con un solo espacio.
+        """
+        import pyarrow as pa
+        import pyarrow.compute as pc
+
+        words = pc.ascii_split_whitespace(arr)
+        flat = words.flatten()
+        keep = pc.greater(pc.binary_length(flat), 0)
+        if stopwords is not None:
+            keep = pc.and_(keep, pc.invert(pc.is_in(flat, value_set=stopwords)))
+
+        word_offsets = words.offsets.to_numpy()
+        kept = np.zeros(len(flat) + 1, dtype=np.int64)
+        np.cumsum(keep.to_numpy(zero_copy_only=False), out=kept[1:])
+        lists = pa.LargeListArray.from_arrays(pa.array(kept[word_offsets - word_offsets[0]]), flat.filter(keep))
+        return pc.binary_join(lists, pa.scalar(" ", pa.large_string()))
+
+    def _stopwords_arrow(self):
+        if self._stopwords_array is None:
+            import pyarrow as pa
+            self._stopwords_array = pa.array(sorted(self.stopwords), type=pa.large_string())
+        return self._stopwords_array
+
+    @staticmethod
+    def _buffers(arr):
+        """Offsets (int64, desde 0) y bytes de un LargeStringArray, sin copiar."""
+        offsets = np.frombuffer(arr.buffers()[1], dtype=np.int64)[arr.offset:arr.offset + len(arr) + 1]
+        data = np.frombuffer(arr.buffers()[2], dtype=np.uint8)[offsets[0]:offsets[-1]]
+        return offsets - offsets[0], data
+
+    # ------ UTILS ------
+    def _as_series(self, texts) -> pd.Series:
+        if isinstance(texts, pd.Series):
+            return texts
+        return pd.Series(texts, dtype=object)
+
+    def _is_arrow(self, s: pd.Series) -> bool:
+        if isinstance(s.dtype, pd.ArrowDtype):
+            return True
+        return isinstance(s.dtype, pd.StringDtype) and s.dtype.storage == "pyarrow"
+
+    def _to_arrow(self, s: pd.Series):
+        import pyarrow as pa
+        import pyarrow.compute as pc
+
+        arr = pa.array(s, from_pandas=True)
+        if isinstance(arr, pa.ChunkedArray):
+            arr = arr.combine_chunks()
+        if arr.null_count:
+            arr = pc.fill_null(arr, "")
+        return arr.cast(pa.large_string())
+
+    def _from_arrow(self, arr, like: pd.Series) -> pd.Series:
+        if not self._is_arrow(like):
+            return pd.Series(arr.to_pylist(), index=like.index, dtype=object)
+        # Columnas Arrow: se construye directamente desde el buffer, sin objetos de Python
+        if isinstance(like.dtype, pd.ArrowDtype):
+            return pd.Series(pd.arrays.ArrowExtensionArray(arr.cast(like.dtype.pyarrow_dtype)), index=like.index)
+        return pd.Series(arr, index=like.index, dtype=like.dtype)
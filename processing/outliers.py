@@ -1,6 +1,7 @@
 from typing import Dict, List
 import pandas as pd
-from bertopic import BERTopic
+
+from processing.topic_index import TopicIndex
 
 
 class OutlierAnalyzer:
@@ -9,19 +10,19 @@ class OutlierAnalyzer:
     generados por un modelo BERTopic.
     """
 
-    def __init__(self, df_docs: pd.DataFrame, bertopic_model: BERTopic):
+    def __init__(self, df_docs: pd.DataFrame, topic_index: TopicIndex):
         """
         Inicializa con el DataFrame de documentos (que incluye la columna 'topic')
-        y el modelo BERTopic entrenado.
+        y el índice de tópicos del modelo entrenado (TopicModeler.get_index()).
         """
         assert "topic" in df_docs.columns, "df_docs debe contener la columna 'topic'"
-        assert isinstance(bertopic_model, BERTopic), "bertopic_model debe ser una instancia de BERTopic"
+        assert isinstance(topic_index, TopicIndex), "topic_index debe ser una instancia de TopicIndex"
         
         self.df_docs = df_docs
-        self.topic_model = bertopic_model
+        self.index = topic_index
         
-        # Filtra solo los documentos outliers (Tópico -1)
-        self.outliers = self.df_docs[self.df_docs["topic"] == -1].copy()
+        # Filtra solo los documentos outliers (Tópico -1), ya agrupados en el índice
+        self.outliers = self.df_docs.iloc[self.index.members(-1)].copy()
         print(f"[OutlierAnalyzer] → Encontrados {len(self.outliers)} documentos outliers (Tópico -1).")
 
     # 1. Caracterización General
@@ -46,14 +47,10 @@ class OutlierAnalyzer:
     def summarize_outliers(self, top_n: int = 10) -> List[tuple]:
         """
         Calcula las palabras clave que son representativas del tópico -1 (outliers).
-        Utiliza el método get_topic de BERTopic.
+        Usa las keywords del tópico -1 guardadas en el índice.
         """
-        outlier_keywords = self.topic_model.get_topic(-1)
-        if outlier_keywords is None:
-            return []
-        
         # Devuelve las N principales palabras clave y sus puntuaciones
-        return outlier_keywords[:top_n]
+        return self.index.get_keywords(-1, top_n)
 
     ## 3. Ejemplos de Documentos Outliers
     
@@ -62,10 +59,8 @@ class OutlierAnalyzer:
         Obtiene los documentos más representativos del Tópico -1.
         Esto puede ayudar a entender por qué son outliers (e.g., ruido, longitud).
         """
-        rep_docs = self.topic_model.get_representative_docs()
         # BERTopic guarda automáticamente los documentos representativos para -1
-        docs_for_outliers = rep_docs.get(-1, [])
-        return docs_for_outliers[:top_n]
+        return self.index.get_representative_docs(-1, top_n)
 
     ## 4. Análisis de Longitud (Característica Común de Outliers)
     
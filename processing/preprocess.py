@@ -1,25 +1,67 @@
+import hashlib
 import re
 import unicodedata
-from typing import List
+from typing import Iterable, Iterator, List, Tuple
+
+import numpy as np
+
+from processing.cache import DiskCache, pack_strings, unpack_strings
+from processing.dedup import DocumentDeduplicator
+from processing.models import load_spacy, load_stopwords
+from processing.normalizer import TextNormalizer
+from processing.tokenstore import TokenStore
 
 class TextPreprocessor:
     SUPPORTED_LANGS = {"spanish", "english"}
 
-    def __init__(self, texts: List[str], language: str = "spanish", lemma: bool = False):
+    # Componentes de spaCy que intervienen en el lema (POS/morfología + lematizador).
+    # El resto (parser, ner, senter...) se desactiva porque nadie usa su salida.
+    LEMMA_PIPES = ("tok2vec", "tagger", "morphologizer", "attribute_ruler", "lemmatizer")
+
+    SPACY_MODELS = {"spanish": "es_core_news_lg", "english": "en_core_web_lg"}
+
+    # Subir este número si cambia la lógica de limpieza, para invalidar la caché
+    CACHE_VERSION = 2
+
+    def __init__(
+        self,
+        texts: List[str],
+        language: str = "spanish",
+        lemma: bool = False,
+        batch_size: int = 256,
+        n_process: int = 1,
+        vectorized: bool = True,
+        dedup: bool = False,
+        cache: DiskCache | None = None
+    ):
         assert isinstance(texts, list) and len(texts) > 0, "La lista de textos no puede estar vacía"
         assert language in self.SUPPORTED_LANGS, f"Idioma no soportado. Disponible: {self.SUPPORTED_LANGS}"
+        assert batch_size >= 1, "batch_size debe ser >= 1"
+        assert n_process >= 1 or n_process == -1, "n_process debe ser >= 1 (o -1 para usar todos los núcleos)"
 
         self.raw_texts = texts
         self.cleaned = []
         self.language = language
         self.lemma = lemma
+        self.batch_size = batch_size
+        self.n_process = n_process
+        self.vectorized = vectorized
+        self.dedup = dedup
+        self.deduplicator = None
+        # Solo en stream(): lema de cada texto único de self.deduplicator (todos los bloques)
+        self.stream_lemmas: List[str] | None = None
+        self.cache = cache
+        # El modelo de spaCy se carga al lematizar (no hace falta si hay caché)
         self.nlp = None
 
-        if self.lemma:
-            self._load_spacy_model()
-
     # ------ MAIN CLEANING ------
     def clean(self):
+        if self.vectorized:
+            # Misma salida que el loop de abajo, pero sobre toda la columna
+            normalizer = TextNormalizer(self.language)
+            self.cleaned = normalizer.normalize(self.raw_texts).tolist()
+            return self
+
         cleaned_list = []
         for text in self.raw_texts:
             t = text.lower()
@@ -43,8 +85,12 @@ class TextPreprocessor:
 
     # ------ STOPWORDS ------
     def remove_stopwords(self):
-        from nltk.corpus import stopwords
-        sw = set(stopwords.words(self.language))
+        sw = self._stopwords()
+
+        if self.vectorized:
+            normalizer = TextNormalizer(self.language, stopwords=sw)
+            self.cleaned = normalizer.remove_stopwords(self.cleaned).tolist()
+            return self
 
         filtered = []
         for sentence in self.cleaned:
@@ -56,22 +102,52 @@ class TextPreprocessor:
 
     # ------ LEMMATIZATION ------
     def lemmatize(self):
+        """
+        Lematiza en lotes con nlp.pipe (batch_size / n_process).
+        El resultado es el mismo que procesar documento por documento.
+        """
         if not self.lemma:
             return self
 
-        lemmatized = []
-        for sentence in self.cleaned:
-            doc = self.nlp(sentence)
-            lemmas = [
-                token.lemma_
-                for token in doc
-                if token.lemma_ != "" and len(token.lemma_) > 2
-            ]
-            lemmatized.append(" ".join(lemmas))
-
-        self.cleaned = lemmatized
+        if self.nlp is None:
+            self._load_spacy_model()
+
+        docs = self.nlp.pipe(
+            self.cleaned,
+            batch_size=self.batch_size,
+            n_process=self.n_process
+        )
+        self.cleaned = [self._lemmas_to_text(doc) for doc in docs]
         return self
 
+    def _lemmatize_running(self) -> TokenStore:
+        """
+        Dedup entre bloques (stream): self.deduplicator acumula los textos de
+        todos los bloques, así solo se lematizan los que no aparecieron en un
+        bloque anterior. Devuelve los tokens del bloque.
+        """
+        n_seen = self.deduplicator.n_unique
+        inverse = self.deduplicator.update(self.cleaned)
+        self.cleaned = self.deduplicator.unique_docs[n_seen:]
+        if self.cleaned:
+            self.lemmatize()
+        self.stream_lemmas.extend(self.cleaned)
+
+        # Tokens por texto único del bloque, repartidos a sus documentos
+        rows, local = np.unique(inverse, return_inverse=True)
+        self.cleaned = [self.stream_lemmas[j] for j in rows.tolist()]
+        tokens = self.tokenize_store().take(local)
+        self.cleaned = [self.cleaned[j] for j in local.tolist()]
+        return tokens
+
+    def _lemmas_to_text(self, doc):
+        lemmas = [
+            token.lemma_
+            for token in doc
+            if token.lemma_ != "" and len(token.lemma_) > 2
+        ]
+        return " ".join(lemmas)
+
     # ------ TOKENIZE ------
     def tokenize(self):
         tokens = []
@@ -81,13 +157,68 @@ class TextPreprocessor:
                     tokens.extend([t])
         return tokens
 
+    def tokenize_store(self) -> TokenStore:
+        """Igual que tokenize(), pero codificado como TokenStore (ids enteros por documento)."""
+        return TokenStore.from_documents(self.cleaned)
+
+    # ------ CACHE ------
+    def cache_key(self) -> str:
+        """
+        Hash de todo lo que determina la salida de process_all(): textos de
+        entrada, idioma, lemma, lista de stopwords y versión del modelo de spaCy.
+        """
+        h = hashlib.sha256()
+        params = [self.CACHE_VERSION, self.language, self.lemma]
+        if self.lemma:
+            params.append(self._spacy_model_version())
+        h.update(repr(params).encode("utf-8"))
+        h.update("\x1f".join(sorted(self._stopwords())).encode("utf-8"))
+
+        for text in self.raw_texts:
+            data = text.encode("utf-8")
+            h.update(len(data).to_bytes(8, "little"))
+            h.update(data)
+        return h.hexdigest()
+
+    def _load_from_cache(self, key: str):
+        arrays = self.cache.load(key)
+        if arrays is None:
+            return None
+        cleaned = unpack_strings(arrays["cleaned"], arrays["cleaned_lengths"])
+        vocab = unpack_strings(arrays["vocab"], arrays["vocab_lengths"])
+        tokens = TokenStore(vocab, arrays["token_ids"], arrays["token_offsets"])
+        return cleaned, tokens
+
+    def _save_to_cache(self, key: str, tokens: TokenStore):
+        cleaned, cleaned_lengths = pack_strings(self.cleaned)
+        vocab, vocab_lengths = pack_strings(tokens.vocab)
+        self.cache.save(
+            key,
+            cleaned=cleaned,
+            cleaned_lengths=cleaned_lengths,
+            vocab=vocab,
+            vocab_lengths=vocab_lengths,
+            token_ids=tokens.ids,
+            token_offsets=tokens.offsets
+        )
+
     # ------ UTILS ------
+    def _stopwords(self):
+        return load_stopwords(self.language)
+
+    def _spacy_model_version(self) -> str:
+        # Se lee de los metadatos del paquete, sin cargar el modelo
+        from importlib.metadata import PackageNotFoundError, version
+        name = self.SPACY_MODELS[self.language]
+        try:
+            return f"{name}=={version(name)};spacy=={version('spacy')}"
+        except PackageNotFoundError:
+            return f"{name}==unknown"
+
     def _load_spacy_model(self):
-        import spacy
-        if self.language == "spanish":
-            self.nlp = spacy.load("es_core_news_lg")
-        else:
-            self.nlp = spacy.load("en_core_web_lg")
+        # Solo quedan activos los componentes necesarios para el lema.
+        # El modelo queda en memoria para las siguientes corridas del proceso (modo servidor)
+        self.nlp = load_spacy(self.SPACY_MODELS[self.language], self.LEMMA_PIPES)
 
     def _remove_accents(self, text):
         text = unicodedata.normalize("NFD", text)
@@ -107,24 +238,78 @@ class TextPreprocessor:
     def _normalize_spaces(self, text):
         return re.sub(r"\s+", " ", text).strip()
 
+    @classmethod
+    def stream(cls, chunks: Iterable[List[str]], deduplicator: DocumentDeduplicator | None = None,
+               **kwargs) -> Iterator[Tuple[List[str], TokenStore]]:
+        """
+        Versión generadora de process_all() para corpus que no caben en memoria.
+        Procesa cada bloque de textos por separado reutilizando la misma
+        instancia (y el mismo modelo de spaCy) y va devolviendo
+        (cleaned_texts, tokens) de cada bloque.
+
+        Con lemma=True y dedup=True cada texto único se lematiza una sola vez
+        en todo el stream, aunque se repita en otros bloques: deduplicator
+        (uno nuevo si no se pasa) acumula los textos de todos los bloques y
+        al final tiene el ratio de duplicados. Los bloques que salen de la
+        caché no pasan por él.
+        """
+        pre = None
+        for chunk in chunks:
+            if not chunk:
+                continue
+
+            if pre is None:
+                pre = cls(chunk, **kwargs)
+                if pre.lemma and pre.dedup:
+                    pre.deduplicator = deduplicator if deduplicator is not None else DocumentDeduplicator()
+                    pre.stream_lemmas = []
+            else:
+                pre.raw_texts = chunk
+                pre.cleaned = []
+
+            yield pre.process_all()
+
     def process_all(self):
         """
         Ejecuta TODA la limpieza:
             1. clean()
             2. remove_stopwords()
-            3. lemmatize() (si aplica)
-            4. tokenize()
+            3. lemmatize() (si aplica; con dedup=True solo sobre textos únicos)
+            4. tokenize_store()
 
         Devuelve:
             cleaned_texts: lista de textos procesados
-            tokens: lista de tokens finales
+            tokens: TokenStore con los tokens finales de cada documento
+
+        Si hay caché y la llave ya existe, devuelve el resultado guardado
+        sin limpiar ni lematizar.
         """
+        key = None
+        if self.cache is not None:
+            key = self.cache_key()
+            cached = self._load_from_cache(key)
+            if cached is not None:
+                self.cleaned, tokens = cached
+                return self.cleaned, tokens
+
         self.clean()
         self.remove_stopwords()
 
-        if self.lemma:
+        if self.lemma and self.dedup and self.stream_lemmas is not None:
+            tokens = self._lemmatize_running()
+        elif self.lemma and self.dedup:
+            # Lematizar cada texto único una sola vez y repartir el resultado
+            self.deduplicator = DocumentDeduplicator().fit(self.cleaned)
+            self.cleaned = self.deduplicator.unique_docs
             self.lemmatize()
+            tokens = self.tokenize_store().take(self.deduplicator.inverse)
+            self.cleaned = self.deduplicator.expand(self.cleaned)
+        else:
+            if self.lemma:
+                self.lemmatize()
+            tokens = self.tokenize_store()
 
-        tokens = self.tokenize()
+        if key is not None:
+            self._save_to_cache(key, tokens)
 
         return self.cleaned, tokens
\ No newline at end of file
@@ -0,0 +1,111 @@
+from typing import Optional
+
+import numpy as np
+
+PRECISIONS = ("float32", "float16", "int8")
+
+
+class QuantizedEmbeddings:
+    """
+    Matriz de embeddings guardada en menor precisión.
+
+        float16: 2 bytes por valor (la mitad que float32)
+        int8:    1 byte por valor + una escala float32 por fila
+                 (x ≈ q * scale, con scale = max|x| / 127 de esa fila)
+
+    Se convierte a float32 solo cuando un consumidor lo necesita
+    (to_float32 / np.asarray) y, si se piden filas, solo esas filas.
+    """
+
+    # Filas por bloque al cuantizar (evita una copia float32 completa temporal)
+    CHUNK_ROWS = 65536
+
+    def __init__(self, data: np.ndarray, scales: Optional[np.ndarray] = None):
+        assert data.ndim == 2, "data must be a 2D matrix"
+        assert data.dtype in (np.float16, np.int8), "data must be float16 or int8"
+        assert (data.dtype == np.int8) == (scales is not None), "int8 data requires per-row scales"
+        self.data = data
+        self.scales = scales
+
+    @classmethod
+    def from_float(cls, embeddings: np.ndarray, precision: str) -> "QuantizedEmbeddings":
+        assert precision in ("float16", "int8"), "precision must be 'float16' or 'int8'"
+        n_rows, dim = embeddings.shape
+        data = np.empty((n_rows, dim), dtype=np.float16 if precision == "float16" else np.int8)
+        scales = np.empty(n_rows, dtype=np.float32) if precision == "int8" else None
+
+        for start in range(0, n_rows, cls.CHUNK_ROWS):
+            block = np.asarray(embeddings[start:start + cls.CHUNK_ROWS], dtype=np.float32)
+            end = start + len(block)
+            if precision == "float16":
+                data[start:end] = block
+                continue
+
+            scale = np.abs(block).max(axis=1) / 127
+            scale[scale == 0] = 1
+            data[start:end] = np.clip(np.rint(block / scale[:, None]), -127, 127)
+            scales[start:end] = scale
+
+        return cls(data, scales)
+
+    @property
+    def precision(self) -> str:
+        return "int8" if self.data.dtype == np.int8 else "float16"
+
+    @property
+    def shape(self):
+        return self.data.shape
+
+    @property
+    def ndim(self) -> int:
+        return 2
+
+    @property
+    def nbytes(self) -> int:
+        return self.data.nbytes + (self.scales.nbytes if self.scales is not None else 0)
+
+    def __len__(self) -> int:
+        return len(self.data)
+
+    def to_float32(self, rows=None) -> np.ndarray:
+        """Matriz float32 (o solo las filas indicadas)."""
+        data = self.data if rows is None else self.data[rows]
+        out = data.astype(np.float32)
+        if self.scales is not None:
+            scales = self.scales if rows is None else self.scales[rows]
+            out *= scales[..., None]
+        return out
+
+    def __getitem__(self, rows) -> np.ndarray:
+        return self.to_float32(rows)
+
+    def __array__(self, dtype=None, copy=None):
+        out = self.to_float32()
+        return out if dtype is None else out.astype(dtype, copy=False)
+
+
+def quantize(embeddings: np.ndarray, precision: str = "float32"):
+    """Devuelve embeddings en la precisión pedida (float32 se deja tal cual, sin copiar)."""
+    assert precision in PRECISIONS, f"precision must be one of {PRECISIONS}"
+    if precision == "float32":
+        return embeddings
+    return QuantizedEmbeddings.from_float(embeddings, precision)
+
+
+def concatenate(parts):
+    """Une por filas matrices de la misma precisión (float32 o QuantizedEmbeddings)."""
+    if isinstance(parts[0], QuantizedEmbeddings):
+        data = np.concatenate([p.data for p in parts])
+        scales = None if parts[0].scales is None else np.concatenate([p.scales for p in parts])
+        return QuantizedEmbeddings(data, scales)
+    return np.concatenate([np.asarray(p, dtype=np.float32) for p in parts])
+
+
+def as_float32(embeddings) -> np.ndarray:
+    """
+    Vista float32 para los consumidores que la necesitan (BERTopic, UMAP,
+    t-SNE). Un array float32 (incluido un memmap) se devuelve sin copiar.
+    """
+    if isinstance(embeddings, QuantizedEmbeddings):
+        return embeddings.to_float32()
+    return np.asarray(embeddings, dtype=np.float32)
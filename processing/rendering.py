@@ -0,0 +1,70 @@
+import base64
+import io
+from typing import Any, Dict
+
+# Una gráfica se describe con un dict (spec) con la llave "kind":
+#
+#   {"kind": "bar", "labels": [...], "values": [...], "title": ..., "xlabel": ...,
+#    "ylabel": ..., "color": ..., "hatch": ..., "errors": [...] | None, "angle": 60}
+#
+#   {"kind": "wordcloud", "title": ..., "frequencies": {...}, "palette": ...,
+#    "cache": DiskCache.config() | None}
+#
+# Las specs son datos puros (se pueden enviar a otro proceso) y render_chart()
+# las convierte en un PNG en base64 listo para WebReport.add_image().
+
+
+def render_chart(spec: Dict[str, Any]) -> str:
+    """Dibuja una spec y devuelve el PNG en base64."""
+    renderers = {"bar": _render_bar, "wordcloud": _render_wordcloud}
+    assert spec.get("kind") in renderers, f"Unknown chart kind: {spec.get('kind')}"
+
+    # Se usa matplotlib.figure.Figure sin pyplot: la figura no queda registrada
+    # en ningún estado global, así que se libera al terminar (sin plt.close)
+    fig = renderers[spec["kind"]](spec)
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format="png", bbox_inches=spec.get("bbox_inches"))
+    fig.clear()
+    return base64.b64encode(buffer.getvalue()).decode("utf-8")
+
+
+def error_bars(errors) -> Dict[str, Any]:
+    """Barras de error hacia abajo: la frecuencia real está en [conteo - error, conteo]."""
+    if not errors:
+        return {}
+    return {"yerr": [errors, [0] * len(errors)], "capsize": 4, "ecolor": "black"}
+
+
+def _render_bar(spec: Dict[str, Any]):
+    from matplotlib.figure import Figure
+
+    fig = Figure(figsize=spec.get("figsize", (10, 5)))
+    ax = fig.subplots()
+
+    ax.bar(spec["labels"], spec["values"], color=spec.get("color"), hatch=spec.get("hatch"),
+           **error_bars(spec.get("errors")))
+    ax.tick_params(axis="x", labelrotation=spec.get("angle", 60))
+    ax.set_title(spec.get("title", ""))
+    ax.set_xlabel(spec.get("xlabel", ""))
+    ax.set_ylabel(spec.get("ylabel", ""))
+    fig.tight_layout()
+    return fig
+
+
+def _render_wordcloud(spec: Dict[str, Any]):
+    from matplotlib.figure import Figure
+    from processing.cache import DiskCache
+    from processing.wordcloud import WordCloudWrapper
+
+    # La caché viaja como su configuración y se abre en el proceso que dibuja
+    cache = DiskCache(**spec["cache"]) if spec.get("cache") else None
+    wcw = WordCloudWrapper(spec["title"], palette=spec["palette"],
+                           frequencies=spec["frequencies"], cache=cache)
+    wc = wcw.create_cloud()
+
+    fig = Figure(figsize=spec.get("figsize", (12, 6)))
+    ax = fig.subplots()
+    ax.imshow(wc, interpolation="bilinear")
+    ax.set_title(spec["title"])
+    ax.axis("off")
+    return fig
@@ -0,0 +1,193 @@
+import multiprocessing
+import time
+from typing import Any, Callable, Dict, List, Sequence, Tuple
+
+
+def _timed(func: Callable, args: tuple) -> Tuple[Any, float]:
+    # Se ejecuta en el hilo o proceso de la etapa: mide solo su trabajo, sin la espera en cola
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start
+
+
+class Stage:
+    """Etapa del pipeline: func(*inputs) produce outputs (una tupla si son varios)."""
+
+    def __init__(self, name: str, func: Callable, inputs: Sequence[str], outputs: Sequence[str], process: bool):
+        self.name = name
+        self.func = func
+        self.inputs = tuple(inputs)
+        self.outputs = tuple(outputs)
+        self.process = process
+
+
+class StageScheduler:
+    """
+    Ejecuta etapas con nombre como un grafo de dependencias: cada etapa
+    declara los valores que necesita (inputs) y los que produce (outputs), y
+    corre en cuanto sus inputs están listos. Las etapas independientes
+    corren a la vez en un pool de hilos o, con process=True, en un pool de
+    procesos (func y sus inputs deben poder enviarse a otro proceso).
+
+        scheduler = StageScheduler(max_workers=4)
+        scheduler.add("leer", read, outputs=("texts",))
+        scheduler.add("limpiar", clean, inputs=("texts",), outputs=("cleaned",))
+        values = scheduler.run()            # {"cleaned": ...}
+        for line in scheduler.summary():
+            print(line)
+
+    Un valor intermedio se libera en cuanto terminan todas las etapas que
+    lo usan; run() devuelve los que ninguna etapa consume.
+
+    Después de run():
+        timings        segundos de cada etapa (en su hilo/proceso)
+        critical_path  cadena de dependencias más larga (suma de timings)
+        wall_seconds   tiempo total de run()
+    """
+
+    def __init__(self, max_workers: int = 4, process_workers: int = 0):
+        assert max_workers >= 1, "max_workers debe ser >= 1"
+        assert process_workers >= 0, "process_workers debe ser >= 0"
+        self.max_workers = max_workers
+        self.process_workers = process_workers
+        self.stages: Dict[str, Stage] = {}
+        self.producers: Dict[str, str] = {}   # valor -> etapa que lo produce
+
+        self.timings: Dict[str, float] = {}
+        self.critical_path: List[str] = []
+        self.wall_seconds = 0.0
+
+    def add(self, name: str, func: Callable, inputs: Sequence[str] = (), outputs: Sequence[str] = (),
+            process: bool = False) -> "StageScheduler":
+        assert name not in self.stages, f"La etapa '{name}' ya existe"
+        assert not process or self.process_workers > 0, "Las etapas en proceso requieren process_workers >= 1"
+        for output in outputs:
+            assert output not in self.producers, \
+                f"'{output}' ya lo produce la etapa '{self.producers[output]}'"
+            self.producers[output] = name
+        self.stages[name] = Stage(name, func, inputs, outputs, process)
+        return self
+
+    def dependencies(self, name: str) -> List[str]:
+        """Etapas que producen los inputs de la etapa name."""
+        return sorted({self.producers[value] for value in self.stages[name].inputs})
+
+    def _order(self) -> List[str]:
+        """Orden topológico (Kahn); falla si falta un input o hay un ciclo."""
+        for stage in self.stages.values():
+            for value in stage.inputs:
+                assert value in self.producers, f"Ninguna etapa produce '{value}' (input de '{stage.name}')"
+
+        pending = {name: len(self.dependencies(name)) for name in self.stages}
+        dependents: Dict[str, List[str]] = {name: [] for name in self.stages}
+        for name in self.stages:
+            for dep in self.dependencies(name):
+                dependents[dep].append(name)
+
+        order = [name for name, count in pending.items() if count == 0]
+        for name in order:
+            for child in dependents[name]:
+                pending[child] -= 1
+                if pending[child] == 0:
+                    order.append(child)
+        assert len(order) == len(self.stages), \
+            f"Dependencias circulares entre: {', '.join(n for n in self.stages if n not in order)}"
+        return order
+
+    def run(self) -> Dict[str, Any]:
+        from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+
+        order = self._order()
+        consumers = {value: 0 for value in self.producers}
+        for stage in self.stages.values():
+            for value in stage.inputs:
+                consumers[value] += 1
+        sinks = {value for value, count in consumers.items() if count == 0}
+
+        values: Dict[str, Any] = {}
+        done: set = set()
+        running = {}
+        self.timings = {}
+        start = time.perf_counter()
+
+        threads = ThreadPoolExecutor(max_workers=self.max_workers)
+        # spawn: los procesos arrancan mientras otras etapas tienen hilos
+        # activos (torch, BERTopic) y un fork en ese estado puede bloquearse
+        processes = None
+        if self.process_workers:
+            processes = ProcessPoolExecutor(max_workers=self.process_workers,
+                                            mp_context=multiprocessing.get_context("spawn"))
+        try:
+            while len(done) < len(self.stages):
+                # Lanzar todas las etapas con sus inputs listos (en orden topológico)
+                for name in order:
+                    stage = self.stages[name]
+                    if name in done or name in running.values() or not all(v in values for v in stage.inputs):
+                        continue
+                    pool = processes if stage.process else threads
+                    args = tuple(values[v] for v in stage.inputs)
+                    running[pool.submit(_timed, stage.func, args)] = name
+
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    name = running.pop(future)
+                    stage = self.stages[name]
+                    try:
+                        result, seconds = future.result()
+                    except BaseException:
+                        print(f"[StageScheduler] → Falló la etapa '{name}'")
+                        raise
+                    self.timings[name] = seconds
+                    done.add(name)
+                    print(f"[StageScheduler] → {name}: {seconds:.2f} s")
+
+                    if len(stage.outputs) == 1:
+                        result = (result,)
+                    if stage.outputs:
+                        assert len(result) == len(stage.outputs), \
+                            f"La etapa '{name}' devolvió {len(result)} valores; declara {len(stage.outputs)}"
+                        values.update(zip(stage.outputs, result))
+
+                    # Liberar los inputs que ya no usa ninguna etapa pendiente
+                    for value in stage.inputs:
+                        consumers[value] -= 1
+                        if consumers[value] == 0 and value not in sinks:
+                            values.pop(value, None)
+        finally:
+            for future in running:
+                future.cancel()
+            threads.shutdown(wait=True, cancel_futures=True)
+            if processes is not None:
+                processes.shutdown(wait=True, cancel_futures=True)
+
+        self.wall_seconds = time.perf_counter() - start
+        self.critical_path = self._critical_path(order)
+        return {value: values[value] for value in sinks if value in values}
+
+    def _critical_path(self, order: List[str]) -> List[str]:
+        """Cadena de etapas dependientes con la mayor suma de tiempos."""
+        finish: Dict[str, float] = {}
+        previous: Dict[str, str | None] = {}
+        for name in order:
+            deps = self.dependencies(name)
+            slowest = max(deps, key=lambda d: finish[d]) if deps else None
+            previous[name] = slowest
+            finish[name] = self.timings.get(name, 0.0) + (finish[slowest] if slowest else 0.0)
+
+        if not finish:
+            return []
+        path = [max(finish, key=finish.get)]
+        while previous[path[-1]] is not None:
+            path.append(previous[path[-1]])
+        return path[::-1]
+
+    def summary(self) -> List[str]:
+        """Líneas con el tiempo de cada etapa, la ruta crítica y el paralelismo logrado."""
+        lines = [f"{name:<20s} {seconds:8.2f} s" + ("  *" if name in self.critical_path else "")
+                 for name, seconds in sorted(self.timings.items(), key=lambda item: -item[1])]
+        path_seconds = sum(self.timings.get(name, 0.0) for name in self.critical_path)
+        total = sum(self.timings.values())
+        lines.append(f"Ruta crítica (*): {' → '.join(self.critical_path)} ({path_seconds:.2f} s)")
+        lines.append(f"Tiempo total {self.wall_seconds:.2f} s; suma de etapas {total:.2f} s "
+                     f"(paralelismo {total / max(self.wall_seconds, 1e-9):.2f}x)")
+        return lines
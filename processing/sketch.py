@@ -0,0 +1,91 @@
+from typing import Tuple
+
+import numpy as np
+
+from processing.ngram_engine import NgramTable
+
+
+class SpaceSavingSketch:
+    """
+    Heavy hitters de n-gramas con memoria fija (Space-Saving en su versión
+    combinable, que acepta bloques de conteos en lugar de un token a la vez).
+
+    Guarda como máximo `capacity` claves con:
+        counts: estimación de la frecuencia (nunca menor que la real)
+        errors: sobreestimación máxima de cada conteo, es decir
+                real ∈ [counts - errors, counts]
+
+    Una clave que no está en el sketch aparece como mucho `floor` veces, y
+    floor <= total / capacity, así que todo n-grama con frecuencia mayor
+    que total / capacity está garantizado en el sketch.
+    """
+
+    def __init__(self, n: int, bits: int, capacity: int):
+        assert capacity >= 1, "capacity must be >= 1"
+        self.capacity = capacity
+        self.table = NgramTable.empty(n, bits)
+        self.errors = np.zeros(0, dtype=np.int64)
+        self.total = 0
+
+    @property
+    def n(self) -> int:
+        return self.table.n
+
+    @property
+    def floor(self) -> int:
+        """Conteo máximo que puede tener una clave ausente del sketch."""
+        if len(self.table) < self.capacity:
+            return 0
+        return int(self.table.counts.min())
+
+    @property
+    def nbytes(self) -> int:
+        return self.table.nbytes + self.errors.nbytes
+
+    def update(self, block: NgramTable) -> "SpaceSavingSketch":
+        """
+        Agrega los conteos exactos de un bloque.
+
+        Las claves nuevas entran con el conteo del bloque más `floor` (lo que
+        pudieron haber acumulado antes de ser descartadas) y ese mismo valor
+        como error; luego solo se conservan las `capacity` claves mayores.
+        """
+        assert block.n == self.table.n and block.bits == self.table.bits, "Block must share n and bits"
+        if len(block) == 0:
+            return self
+
+        floor = self.floor
+        table = self.table
+        n_old = len(table)
+
+        uniq, inverse = np.unique(np.concatenate([table.keys, block.keys]), return_inverse=True)
+        inverse = inverse.ravel()
+        old, new = inverse[:n_old], inverse[n_old:]
+
+        counts = np.full(len(uniq), floor, dtype=np.int64)
+        counts[old] = table.counts
+        counts[new] += block.counts
+
+        errors = np.full(len(uniq), floor, dtype=np.int64)
+        errors[old] = self.errors
+
+        first = np.full(len(uniq), np.iinfo(np.int64).max, dtype=np.int64)
+        first[old] = table.first
+        first[new] = np.minimum(first[new], block.first)
+
+        if len(uniq) > self.capacity:
+            keep = np.argpartition(-counts, self.capacity - 1)[:self.capacity]
+            uniq, counts, errors, first = uniq[keep], counts[keep], errors[keep], first[keep]
+
+        self.table = NgramTable(table.n, table.bits, uniq, counts, first)
+        self.errors = errors
+        self.total += int(block.counts.sum())
+        return self
+
+    def top_k(self, k: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Claves, conteos estimados y errores de las k más frecuentes."""
+        selected = self.table.top_indices(k)
+        return self.table.keys[selected], self.table.counts[selected], self.errors[selected]
+
+    def decode(self, keys: np.ndarray) -> np.ndarray:
+        return self.table.decode(keys)
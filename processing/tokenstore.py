@@ -0,0 +1,129 @@
+import sys
+from array import array
+from typing import Dict, Iterable, List, Sequence
+
+import numpy as np
+
+
+class TokenStore:
+    """
+    Tokens del corpus codificados como enteros.
+
+        vocab:   lista id -> palabra
+        ids:     np.int32 con el id de cada token, en orden de aparición
+        offsets: np.int64 de tamaño n_docs + 1; los tokens del documento i
+                 son ids[offsets[i]:offsets[i + 1]]
+
+    Ocupa ~4 bytes por token (más el vocabulario) frente a los ~60 bytes
+    por token de una lista de str.
+    """
+
+    # Misma regla que TextPreprocessor.tokenize(): descartar tokens muy cortos
+    MIN_LEN = 3
+
+    def __init__(self, vocab: List[str] | None = None, ids: np.ndarray | None = None,
+                 offsets: np.ndarray | None = None):
+        self.vocab: List[str] = list(vocab or [])
+        self.index: Dict[str, int] = {w: i for i, w in enumerate(self.vocab)}
+        self.ids = np.zeros(0, dtype=np.int32) if ids is None else np.asarray(ids, dtype=np.int32)
+        self.offsets = np.zeros(1, dtype=np.int64) if offsets is None else np.asarray(offsets, dtype=np.int64)
+
+    # ------ CONSTRUCCIÓN ------
+    @classmethod
+    def from_documents(cls, docs: Iterable[str]) -> "TokenStore":
+        """Tokeniza cada documento (split + len > 2) y lo codifica."""
+        return cls().add_documents(docs)
+
+    @classmethod
+    def from_tokens(cls, tokens: Sequence[str]) -> "TokenStore":
+        """Codifica una lista plana de tokens como un único documento."""
+        store = cls()
+        ids = array("i", (store.token_id(t) for t in tokens))
+        store.ids = np.frombuffer(ids, dtype=np.int32).copy()
+        store.offsets = np.array([0, len(ids)], dtype=np.int64)
+        return store
+
+    def add_documents(self, docs: Iterable[str]) -> "TokenStore":
+        ids = array("i")
+        lengths = array("q")
+        for doc in docs:
+            start = len(ids)
+            ids.extend(self.token_id(t) for t in doc.split() if len(t) >= self.MIN_LEN)
+            lengths.append(len(ids) - start)
+
+        new_offsets = self.offsets[-1] + np.cumsum(np.frombuffer(lengths, dtype=np.int64))
+        self.ids = np.concatenate([self.ids, np.frombuffer(ids, dtype=np.int32)])
+        self.offsets = np.concatenate([self.offsets, new_offsets])
+        return self
+
+    def token_id(self, token: str) -> int:
+        """Id de la palabra; si no existe se agrega al vocabulario."""
+        tid = self.index.get(token)
+        if tid is None:
+            tid = len(self.vocab)
+            self.index[token] = tid
+            self.vocab.append(token)
+        return tid
+
+    def take(self, doc_indices: np.ndarray) -> "TokenStore":
+        """
+        Nuevo store con los documentos indicados (en ese orden, se permiten
+        repetidos). Se usa para repartir los tokens de textos únicos (dedup).
+        """
+        doc_indices = np.asarray(doc_indices, dtype=np.int64)
+        starts = self.offsets[doc_indices]
+        lengths = self.offsets[doc_indices + 1] - starts
+
+        offsets = np.zeros(len(doc_indices) + 1, dtype=np.int64)
+        np.cumsum(lengths, out=offsets[1:])
+
+        # Posición de cada token de salida en self.ids
+        positions = np.arange(offsets[-1], dtype=np.int64) - np.repeat(offsets[:-1] - starts, lengths)
+        return TokenStore(self.vocab, self.ids[positions], offsets)
+
+    # ------ CONSULTA ------
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @property
+    def n_docs(self) -> int:
+        return len(self.offsets) - 1
+
+    def doc(self, i: int) -> np.ndarray:
+        """Ids de los tokens del documento i."""
+        return self.ids[self.offsets[i]:self.offsets[i + 1]]
+
+    def tokens(self) -> List[str]:
+        """Lista plana de tokens (str), igual a TextPreprocessor.tokenize()."""
+        vocab = self.vocab
+        return [vocab[i] for i in self.ids.tolist()]
+
+    def to_text(self) -> str:
+        return " ".join(self.tokens())
+
+    def counts(self) -> np.ndarray:
+        """Frecuencia de cada id del vocabulario."""
+        return np.bincount(self.ids, minlength=len(self.vocab))
+
+    def frequencies(self) -> Dict[str, int]:
+        """Frecuencia de cada palabra (solo las que aparecen)."""
+        counts = self.counts()
+        return {self.vocab[i]: int(counts[i]) for i in np.flatnonzero(counts)}
+
+    # ------ MEMORIA ------
+    @property
+    def nbytes(self) -> int:
+        """Bytes del store: arrays + vocabulario (strings, lista y dict)."""
+        vocab_bytes = sum(sys.getsizeof(w) for w in self.vocab)
+        vocab_bytes += sys.getsizeof(self.vocab) + sys.getsizeof(self.index)
+        return self.ids.nbytes + self.offsets.nbytes + vocab_bytes
+
+    def list_nbytes(self) -> int:
+        """
+        Bytes estimados de la representación anterior (lista plana de str):
+        un puntero por token + un objeto str por cada token (split() crea
+        un objeto nuevo por aparición).
+        """
+        counts = self.counts()
+        str_bytes = sum(int(c) * sys.getsizeof(w) for w, c in zip(self.vocab, counts.tolist()))
+        return sys.getsizeof([]) + 8 * len(self.ids) + str_bytes
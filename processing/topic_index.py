@@ -0,0 +1,121 @@
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+
+class TopicIndex:
+    """
+    Datos por tópico calculados una sola vez después de fit(), para que la
+    ablación, el análisis de outliers y el reporte no vuelvan a pedírselos
+    a BERTopic (get_representative_docs() y get_topic_info() reconstruyen
+    sus tablas en cada llamada).
+
+        info                 tabla de tópicos (get_topic_info)
+        topic_ids            ids de tópico, en el orden de info
+        keywords[t]          lista completa de (palabra, peso) del tópico
+        representative_docs  documentos representativos por tópico
+        members(t)           doc_ids (índices de docs) asignados al tópico
+        sizes[t]             número de documentos del tópico
+        centroids            centroide de los embeddings de cada tópico
+                             (fila position[t]; None sin embeddings)
+    """
+
+    # Filas de embeddings por bloque al calcular centroides
+    CHUNK_ROWS = 65536
+
+    def __init__(
+        self,
+        info: pd.DataFrame,
+        keywords: Dict[int, List[Tuple[str, float]]],
+        representative_docs: Dict[int, List[str]],
+        topics,
+        embeddings=None,
+        inverse: Optional[np.ndarray] = None
+    ):
+        """
+        topics: tópico de cada documento original.
+        embeddings: una fila por documento, o por texto único si se pasa
+                    inverse (documento -> fila), como en TopicModeler con dedup.
+        """
+        self.info = info
+        self.topic_ids: List[int] = [int(t) for t in info["Topic"]]
+        self.position = {topic_id: i for i, topic_id in enumerate(self.topic_ids)}
+        self.keywords = {int(t): list(words or []) for t, words in keywords.items()}
+        self.representative_docs = {int(t): list(docs) for t, docs in representative_docs.items()}
+
+        # Documentos ordenados por tópico: los de cada tópico quedan contiguos
+        topics = np.asarray(topics, dtype=np.int64)
+        self._order = np.argsort(topics, kind="stable")
+        sorted_topics = topics[self._order]
+        ids = np.asarray(self.topic_ids, dtype=np.int64)
+        self._starts = np.searchsorted(sorted_topics, ids, side="left")
+        self._ends = np.searchsorted(sorted_topics, ids, side="right")
+        self.sizes = {t: int(end - start) for t, start, end in zip(self.topic_ids, self._starts, self._ends)}
+
+        self.centroids: Optional[np.ndarray] = None
+        if embeddings is not None:
+            self.centroids = self._centroids(topics, embeddings, inverse)
+
+    @classmethod
+    def from_modeler(cls, tm) -> "TopicIndex":
+        """Construye el índice de un TopicModeler ajustado (una llamada a BERTopic por tabla)."""
+        assert tm.topic_model is not None, "El modelo de tópicos no está entrenado"
+        return cls(
+            info=tm._topic_info(),
+            keywords=tm.topic_model.get_topics(),
+            representative_docs=tm.topic_model.get_representative_docs() or {},
+            topics=tm.topics,
+            embeddings=tm.embeddings,
+            inverse=tm.get_inverse_index()
+        )
+
+    def _centroids(self, topics: np.ndarray, embeddings, inverse: Optional[np.ndarray]) -> np.ndarray:
+        """Media de los embeddings de los documentos de cada tópico (duplicados incluidos)."""
+        from scipy import sparse
+
+        if inverse is None:
+            row_topics = topics
+            weights = np.ones(len(topics), dtype=np.float64)
+        else:
+            # Una fila por texto único, con peso = número de documentos que la usan
+            weights = np.bincount(inverse, minlength=len(embeddings)).astype(np.float64)
+            row_topics = np.empty(len(embeddings), dtype=np.int64)
+            row_topics[inverse] = topics
+
+        # Matriz tópicos x filas con el peso de cada fila en su tópico
+        ids = np.asarray(self.topic_ids, dtype=np.int64)
+        sorter = np.argsort(ids)
+        rows = sorter[np.searchsorted(ids, row_topics, sorter=sorter)]
+        assignment = sparse.csr_matrix((weights, (rows, np.arange(len(row_topics)))),
+                                       shape=(len(self.topic_ids), len(row_topics)))
+
+        sums = np.zeros((len(self.topic_ids), embeddings.shape[1]), dtype=np.float64)
+        for start in range(0, len(row_topics), self.CHUNK_ROWS):
+            end = min(start + self.CHUNK_ROWS, len(row_topics))
+            block = np.asarray(embeddings[start:end], dtype=np.float32)
+            sums += assignment[:, start:end] @ block
+
+        counts = np.asarray(assignment.sum(axis=1)).ravel()
+        return (sums / np.maximum(counts, 1)[:, None]).astype(np.float32)
+
+    # ------ CONSULTAS ------
+    def members(self, topic_id: int) -> np.ndarray:
+        """doc_ids del tópico (array vacío si no existe)."""
+        i = self.position.get(topic_id)
+        if i is None:
+            return np.empty(0, dtype=np.int64)
+        return self._order[self._starts[i]:self._ends[i]]
+
+    def get_keywords(self, topic_id: int, top_n: Optional[int] = None) -> List[Tuple[str, float]]:
+        words = self.keywords.get(topic_id, [])
+        return words if top_n is None else words[:top_n]
+
+    def get_representative_docs(self, topic_id: int, top_n: Optional[int] = None) -> List[str]:
+        docs = self.representative_docs.get(topic_id, [])
+        return docs if top_n is None else docs[:top_n]
+
+    def get_centroid(self, topic_id: int) -> Optional[np.ndarray]:
+        if self.centroids is None or topic_id not in self.position:
+            return None
+        return self.centroids[self.position[topic_id]]
@@ -1,9 +1,35 @@
-from typing import List, Optional
+import json
+import os
+import shutil
+import time
+from typing import List, Optional, TYPE_CHECKING
 import numpy as np
 import pandas as pd
-from bertopic import BERTopic
-from sentence_transformers import SentenceTransformer
-import torch
+
+from processing.dedup import DocumentDeduplicator
+from processing.embedding_store import EmbeddingStore
+from processing.encoding import EmbeddingEncoder
+from processing.models import load_sentence_transformer, resolve_revision
+from processing.neighbors import BERTOPIC_UMAP_NEIGHBORS, NeighborGraph, required_neighbors
+from processing.quantization import QuantizedEmbeddings, as_float32, concatenate, quantize
+from processing.topic_index import TopicIndex
+
+if TYPE_CHECKING:
+    from bertopic import BERTopic
+    from sentence_transformers import SentenceTransformer
+
+
+def _library_versions() -> dict:
+    """Versiones instaladas de las librerías que determinan el modelo guardado."""
+    from importlib.metadata import PackageNotFoundError, version
+
+    versions = {}
+    for package in ("bertopic", "sentence-transformers", "scikit-learn", "numpy"):
+        try:
+            versions[package] = version(package)
+        except PackageNotFoundError:
+            versions[package] = None
+    return versions
 
 class TopicModeler:
     """
@@ -11,12 +37,36 @@ class TopicModeler:
     Usa automáticamente el modelo all-mpnet-base-v2 para español e inglés.
     """
 
+    DEFAULT_EMBEDDING_MODEL = "sentence-transformers/all-mpnet-base-v2"
+
+    # Modo online: tópicos (clusters de MiniBatchKMeans) si n_topics="auto",
+    # dimensiones de IncrementalPCA y documentos por llamada a partial_fit
+    ONLINE_N_CLUSTERS = 50
+    ONLINE_COMPONENTS = 5
+    ONLINE_BATCH_SIZE = 5000
+
+    # Formato del directorio de save()/load(); subirlo si cambia su contenido
+    ARTIFACT_FORMAT = "nlp-analyzer-topic-model"
+    ARTIFACT_VERSION = 1
+
     def __init__(
         self,
         docs: List[str],
         language: str = "spanish",
         embedding_model_name: Optional[str] = None,
-        n_topics: str | int = "auto"
+        n_topics: str | int = "auto",
+        dedup: bool = False,
+        embedding_cache_dir: Optional[str] = None,
+        embedding_model_revision: Optional[str] = None,
+        token_budget: int = 16384,
+        encode_workers: int = 1,
+        encode_threads: Optional[int] = None,
+        embedding_precision: str = "float32",
+        calculate_probabilities: bool = False,
+        online: bool = False,
+        shared_knn: bool = False,
+        visualization_landmarks: Optional[int] = None,
+        embedding_cache_max_bytes: int = 2 * 1024 ** 3
     ):
         assert isinstance(docs, list) and len(docs) > 0, "La lista de documentos no puede estar vacía"
         assert language in {"spanish", "english"}, "Idioma no soportado (usa 'spanish' o 'english')"
@@ -25,81 +75,573 @@ class TopicModeler:
         self.language = language
         self.n_topics = n_topics
 
+        # Con dedup=True se embebe y ajusta BERTopic solo sobre textos únicos
+        # (fit_docs) y los tópicos se reparten a todos los documentos
+        self.dedup = dedup
+        self.deduplicator: DocumentDeduplicator | None = None
+        self.fit_docs: List[str] = docs
+
         # Si el usuario no especifica nada, usar all-mpnet-base-v2 
-        self.embedding_model_name = embedding_model_name or "sentence-transformers/all-mpnet-base-v2"
+        self.embedding_model_name = embedding_model_name or self.DEFAULT_EMBEDDING_MODEL
+        # Commit exacto del modelo (no una rama): es el que se carga y la llave de la caché
+        self.embedding_model_revision = resolve_revision(self.embedding_model_name, embedding_model_revision)
+
+        # Con embedding_cache_dir los embeddings se guardan por (modelo, revisión,
+        # texto) y solo se codifican los textos nuevos; el almacén ocupa a lo
+        # más embedding_cache_max_bytes (LRU)
+        self.embedding_store: EmbeddingStore | None = None
+        if embedding_cache_dir:
+            self.embedding_store = EmbeddingStore(embedding_cache_dir, self.embedding_model_name,
+                                                  self.embedding_model_revision,
+                                                  max_bytes=embedding_cache_max_bytes)
+
+        # float16 / int8 (escala por fila): la matriz se guarda en menor precisión
+        # y se convierte a float32 solo para BERTopic, UMAP y t-SNE
+        self.embedding_precision = embedding_precision
+
+        # Con calculate_probabilities=True BERTopic calcula la matriz densa
+        # documentos x tópicos de HDBSCAN durante el ajuste (self.probs). Por
+        # defecto no se calcula: get_probabilities() la obtiene solo para los
+        # documentos que se pidan.
+        self.calculate_probabilities = calculate_probabilities
+
+        # Con online=True BERTopic usa componentes incrementales (IncrementalPCA,
+        # MiniBatchKMeans, OnlineCountVectorizer) y partial_fit() actualiza el
+        # modelo solo con los documentos nuevos, con ids de tópico estables
+        self.online = online
+        if online:
+            assert n_topics == "auto" or (isinstance(n_topics, int) and n_topics >= 2), \
+                "En modo online n_topics debe ser 'auto' o un entero >= 2"
+
+        # Con shared_knn se calcula un solo grafo kNN (self.neighbor_graph) con
+        # el k más grande que necesitan BERTopic, UMAP 3D y t-SNE 3D; el UMAP
+        # de BERTopic lo usa y Visualization puede reutilizarlo (salvo que se
+        # ajuste sobre visualization_landmarks filas: entonces k es el de BERTopic)
+        self.shared_knn = shared_knn
+        self.visualization_landmarks = visualization_landmarks
+        self.neighbor_graph: NeighborGraph | None = None
 
         # Se llenan durante fit()
         self.embedder: SentenceTransformer | None = None
-        self.embeddings: np.ndarray | None = None
+        self.embeddings: np.ndarray | QuantizedEmbeddings | None = None
         self.topic_model: BERTopic | None = None
         self.topics: List[int] | None = None
         self.probs: np.ndarray | None = None
+        # Tópico de cada fila de fit_docs (antes de repartir duplicados)
+        self.fit_topics: List[int] | None = None
+        # Índice por tópico (get_index), se construye al primer uso tras cada ajuste
+        self._index: TopicIndex | None = None
 
+        # torch/bertopic/sentence-transformers se importan al usarlos (arranque rápido del CLI)
+        import torch
         self.device = "cuda" if torch.cuda.is_available() else "cpu"
         print(f"[TopicModeler] → Usando dispositivo: {self.device}")
 
+        # Lotes por presupuesto de tokens y, en CPU, varios procesos (ver processing/encoding.py)
+        self.encoder = EmbeddingEncoder(
+            self.embedding_model_name,
+            revision=self.embedding_model_revision,
+            language=self.language,
+            device=self.device,
+            token_budget=token_budget,
+            n_workers=encode_workers,
+            threads_per_worker=encode_threads
+        )
+
     def fit(self):
         """Genera embeddings y entrena BERTopic."""
-        self._load_embedding_model()
+        self._deduplicate()
         self._compute_embeddings()
-        self._fit_bertopic()
+        if self.online:
+            self._fit_online()
+        else:
+            self._fit_bertopic()
+        return self
+
+    def partial_fit(self, new_docs: List[str]):
+        """
+        Agrega new_docs a un modelo online ya ajustado: solo se codifican y
+        se pasan a BERTopic.partial_fit los textos nuevos. Los tópicos de los
+        documentos anteriores y los ids de tópico no cambian.
+
+        No necesita los embeddings del historial: un modelo cargado con
+        load() sin embeddings guardados se puede seguir actualizando (en ese
+        caso self.embeddings sigue en None).
+        """
+        assert self.online, "partial_fit requiere online=True"
+        assert self.topic_model is not None, "El modelo de tópicos no está entrenado"
+        assert isinstance(new_docs, list) and len(new_docs) > 0, "La lista de documentos no puede estar vacía"
+
+        n_fit = len(self.fit_docs)
+        self.docs = self.docs + new_docs
+        # Con dedup los textos únicos ya vistos conservan su fila (orden de aparición)
+        self._deduplicate()
+        batch_docs = self.fit_docs[n_fit:]
+
+        if batch_docs:
+            batch_embeddings = self._embed(batch_docs)
+            if self.embeddings is not None:
+                self.embeddings = concatenate([self.embeddings, batch_embeddings])
+            self.fit_topics += self._partial_fit_batches(batch_docs, batch_embeddings)
+            self._save_online_representative_docs()
+        self._expand_topics()
+        print(f"[TopicModeler] → Modelo online actualizado con {len(new_docs)} documentos "
+              f"({len(batch_docs)} textos nuevos, {len(self.docs)} en total)")
         return self
 
+    def _deduplicate(self):
+        """Agrupa documentos idénticos si dedup=True."""
+        if not self.dedup:
+            self.fit_docs = self.docs
+            return
+
+        self.deduplicator = DocumentDeduplicator().fit(self.docs)
+        self.fit_docs = self.deduplicator.unique_docs
+
+    def get_inverse_index(self) -> np.ndarray | None:
+        """
+        Índice documento -> fila de get_embeddings() cuando hay dedup
+        (None si cada documento tiene su propia fila).
+        """
+        return None if self.deduplicator is None else self.deduplicator.inverse
+
     def _load_embedding_model(self):
-        """Carga el modelo de sentence-transformers."""
-        self.embedder = SentenceTransformer(self.embedding_model_name, device=self.device)
+        """Carga el modelo de sentence-transformers (queda residente en el proceso)."""
+        self.embedder = load_sentence_transformer(self.embedding_model_name, self.device,
+                                                  self.embedding_model_revision)
+
+    def _encode(self, docs: List[str]) -> np.ndarray:
+        """Codifica docs con el modelo (se carga solo si hace falta y solo en este proceso si n_workers=1)."""
+        if self.embedder is None and self.encoder.n_workers == 1:
+            self._load_embedding_model()
+
+        start = time.perf_counter()
+        embeddings = self.encoder.encode(docs, model=self.embedder)
+        elapsed = time.perf_counter() - start
+        print(f"[TopicModeler] → {len(docs)} textos codificados en {elapsed:.1f} s "
+              f"({len(docs) / elapsed:.1f} docs/s, {self.encoder.n_workers} procesos)")
+        return embeddings
 
     def _compute_embeddings(self):
-        """Obtiene embeddings de cada documento."""
-        assert self.embedder is not None, "El modelo de embeddings no está cargado"
-        self.embeddings = self.embedder.encode(
-            self.docs,
-            show_progress_bar=True,
-            convert_to_numpy=True,
-            device=self.device
-        )
+        """
+        Obtiene embeddings de cada documento. Con embedding_store solo se
+        codifican los textos nuevos y la matriz queda en memory map.
+        """
+        self.embeddings = self._embed(self.fit_docs)
+
+    def _embed_float32(self, docs: List[str]) -> np.ndarray:
+        """Embeddings float32 de docs (vía embedding_store si existe)."""
+        if self.embedding_store is None:
+            return self._encode(docs)
 
-    def get_embeddings(self) -> np.ndarray:
-        """Devuelve la matriz de embeddings utilizada en el modelo."""
+        embeddings = self.embedding_store.get(docs, self._encode)
+        print(f"[TopicModeler] → Embeddings en caché: {self.embedding_store.hits}, "
+              f"codificados: {self.embedding_store.misses}")
+        return embeddings
+
+    def _embed(self, docs: List[str]) -> np.ndarray | QuantizedEmbeddings:
+        """Embeddings de docs en embedding_precision."""
+        embeddings = self._embed_float32(docs)
+        quantized = quantize(embeddings, self.embedding_precision)
+        if self.embedding_precision != "float32":
+            print(f"[TopicModeler] → Embeddings en {self.embedding_precision}: "
+                  f"{quantized.nbytes / 1e6:.1f} MB (float32: {embeddings.nbytes / 1e6:.1f} MB)")
+        return quantized
+
+    def get_embeddings(self) -> np.ndarray | QuantizedEmbeddings:
+        """
+        Devuelve la matriz de embeddings utilizada en el modelo
+        (una fila por texto único si dedup=True, ver get_inverse_index()).
+        Con embedding_precision != "float32" es un QuantizedEmbeddings
+        (usar as_float32() donde se necesite float32).
+        """
         assert self.embeddings is not None, "Embeddings no calculados"
         return self.embeddings
 
     def _fit_bertopic(self):
         """Ajusta BERTopic usando los embeddings precalculados."""
+        from bertopic import BERTopic
         assert self.embeddings is not None, "Embeddings no calculados"
 
+        embeddings = as_float32(self.embeddings)
         self.topic_model = BERTopic(
             language=self.language,
             nr_topics=self.n_topics,
-            calculate_probabilities=True,
+            calculate_probabilities=self.calculate_probabilities,
+            umap_model=self._shared_umap(embeddings),
             verbose=False
         )
 
-        self.topics, self.probs = self.topic_model.fit_transform(self.docs, self.embeddings)
+        start = time.perf_counter()
+        topics, probs = self.topic_model.fit_transform(self.fit_docs, embeddings)
+        print(f"[TopicModeler] → BERTopic ajustado en {time.perf_counter() - start:.1f} s")
+        # Sin calculate_probabilities BERTopic devuelve solo la confianza del
+        # tópico asignado (un valor por documento): no se guarda
+        self.probs = probs if self.calculate_probabilities else None
+        self.fit_topics = list(topics)
+        self._expand_topics()
+        self._weight_ctfidf()
+
+    def _weight_ctfidf(self):
+        """
+        Con dedup BERTopic solo vio cada texto una vez: se recalcula el
+        c-TF-IDF (y las keywords) con los conteos de términos de cada texto
+        multiplicados por sus repeticiones, igual que si hubiera visto todos
+        los documentos. Los tópicos asignados no cambian, y los documentos
+        representativos y los embeddings de cada tópico siguen calculados
+        sobre los textos únicos (sin pesar).
+
+        Usa métodos internos de BERTopic (_preprocess_text,
+        _extract_words_per_topic): requirements.txt fija el rango de
+        versiones con el que se probó.
+        """
+        if self.deduplicator is None or self.deduplicator.counts.max() <= 1:
+            return
+        import scipy.sparse as sp
+        tm = self.topic_model
+
+        # Filas en el orden de BERTopic: tópicos ordenados (incluido -1)
+        topic_ids = np.unique(self.fit_topics)
+        rows = np.searchsorted(topic_ids, self.fit_topics)
+        weights = sp.csr_matrix((self.deduplicator.counts.astype(np.float64), (rows, np.arange(len(rows)))),
+                                shape=(len(topic_ids), len(rows)))
+        term_counts = tm.vectorizer_model.transform(tm._preprocess_text(np.asarray(self.fit_docs, dtype=object)))
+        topic_counts = sp.csr_matrix(weights @ term_counts)
+
+        tm.ctfidf_model.fit(topic_counts)
+        tm.c_tf_idf_ = tm.ctfidf_model.transform(topic_counts)
+        documents = pd.DataFrame({"Document": self.fit_docs, "Topic": self.fit_topics,
+                                  "ID": range(len(self.fit_docs)), "Image": None})
+        words = tm.vectorizer_model.get_feature_names_out()
+        tm.topic_representations_ = tm._extract_words_per_topic(words, documents, tm.c_tf_idf_)
+        tm.topic_labels_ = {topic: f"{topic}_" + "_".join(word for word, _ in keywords[:4])
+                            for topic, keywords in tm.topic_representations_.items()}
+
+    def _shared_umap(self, embeddings: np.ndarray):
+        """
+        UMAP de BERTopic (sus parámetros por defecto) sobre el grafo kNN
+        compartido; None (UMAP propio de BERTopic) sin shared_knn o si el
+        corpus es demasiado chico para el k necesario.
+        """
+        k = required_neighbors(len(embeddings), self.visualization_landmarks)
+        if not self.shared_knn or k >= len(embeddings):
+            self.neighbor_graph = None
+            return None
+
+        from umap import UMAP
+        self.neighbor_graph = NeighborGraph.build(embeddings, k)
+        return UMAP(
+            n_neighbors=BERTOPIC_UMAP_NEIGHBORS,
+            n_components=5,
+            min_dist=0.0,
+            metric="cosine",
+            low_memory=False,
+            precomputed_knn=self.neighbor_graph.umap_knn(BERTOPIC_UMAP_NEIGHBORS)
+        )
+
+    def _expand_topics(self):
+        """
+        self.topics siempre tiene un tópico por documento original;
+        self.fit_topics y self.probs quedan por texto único (fila de fit_docs).
+        """
+        self._index = None
+        if self.deduplicator is not None:
+            self.topics = self.deduplicator.expand(self.fit_topics)
+        else:
+            self.topics = list(self.fit_topics)
+
+    # ------ MODO ONLINE ------
+    def _fit_online(self):
+        """Ajuste inicial del modelo online, en lotes de ONLINE_BATCH_SIZE documentos."""
+        from bertopic import BERTopic
+        from bertopic.vectorizers import OnlineCountVectorizer
+        from sklearn.cluster import MiniBatchKMeans
+        from sklearn.decomposition import IncrementalPCA
+        assert self.embeddings is not None, "Embeddings no calculados"
+
+        n_clusters = self.ONLINE_N_CLUSTERS if self.n_topics == "auto" else self.n_topics
+        assert len(self.fit_docs) >= n_clusters, \
+            f"El primer ajuste online necesita al menos {n_clusters} textos únicos"
+
+        # Sin nr_topics: en modo online BERTopic no reduce tópicos y los ids
+        # (clusters de MiniBatchKMeans) se mantienen entre actualizaciones.
+        # decay=None: el vocabulario acumula todos los lotes vistos.
+        self.topic_model = BERTopic(
+            language=self.language,
+            umap_model=IncrementalPCA(n_components=self.ONLINE_COMPONENTS),
+            hdbscan_model=MiniBatchKMeans(n_clusters=n_clusters, random_state=0),
+            vectorizer_model=OnlineCountVectorizer(decay=None),
+            verbose=False
+        )
+        self.probs = None
+        self.fit_topics = self._partial_fit_batches(self.fit_docs, self.embeddings)
+        self._save_online_representative_docs()
+        self._expand_topics()
+
+    def _partial_fit_batches(self, docs: List[str], embeddings: np.ndarray | QuantizedEmbeddings) -> List[int]:
+        """
+        Pasa docs (con sus embeddings, una fila por doc) a BERTopic.partial_fit en
+        lotes y devuelve el tópico de cada uno. Un último lote más chico que
+        el mínimo de IncrementalPCA / MiniBatchKMeans se une al anterior; si
+        todo el lote es así de chico, sus documentos solo se asignan
+        (transform) sin actualizar el modelo.
+        """
+        first = self.topic_model.topic_mapper_ is None
+        min_batch = self.topic_model.hdbscan_model.n_clusters if first else self.ONLINE_COMPONENTS
+
+        bounds = list(range(0, len(docs), self.ONLINE_BATCH_SIZE)) + [len(docs)]
+        if len(bounds) > 2 and bounds[-1] - bounds[-2] < min_batch:
+            del bounds[-2]
+
+        topics: List[int] = []
+        for start, end in zip(bounds[:-1], bounds[1:]):
+            batch = docs[start:end]
+            batch_embeddings = as_float32(embeddings[start:end])
+            if len(batch) < min_batch:
+                batch_topics, _ = self.topic_model.transform(batch, batch_embeddings)
+                topics += [int(t) for t in batch_topics]
+                continue
+            self.topic_model.partial_fit(batch, batch_embeddings)
+            topics += self.topic_model.topics_
+        return topics
+
+    def _save_online_representative_docs(self):
+        # partial_fit no calcula documentos representativos: se eligen sobre
+        # todos los textos vistos, igual que en un ajuste completo
+        documents = pd.DataFrame({
+            "Document": self.fit_docs,
+            "ID": range(len(self.fit_docs)),
+            "Topic": self.fit_topics
+        })
+        self.topic_model._save_representative_docs(documents)
+
+    # ------ INFERENCIA ------
+    def transform(self, new_docs: List[str]) -> List[int]:
+        """
+        Asigna tópicos a documentos nuevos con el modelo ya ajustado, sin
+        reajustar nada: solo se codifican los textos nuevos. No modifica el
+        modelo ni self.docs (para agregarlos a un modelo online: partial_fit).
+        """
+        assert self.topic_model is not None, "El modelo de tópicos no está entrenado"
+        assert isinstance(new_docs, list) and len(new_docs) > 0, "La lista de documentos no puede estar vacía"
+
+        deduplicator = DocumentDeduplicator().fit(new_docs) if self.dedup else None
+        docs = new_docs if deduplicator is None else deduplicator.unique_docs
+
+        topics, _ = self.topic_model.transform(docs, self._embed_float32(docs))
+        topics = [int(t) for t in topics]
+        return topics if deduplicator is None else deduplicator.expand(topics)
+
+    # ------ PERSISTENCIA ------
+    def save(self, path: str, include_embeddings: bool = False) -> str:
+        """
+        Guarda el modelo ajustado en el directorio path:
+
+            manifest.json         formato y versión, parámetros, modelo de
+                                  embeddings (nombre + revisión) y versiones
+                                  de las librerías
+            bertopic              modelo BERTopic sin el modelo de embeddings
+                                  (pickle: incluye UMAP y HDBSCAN, así que
+                                  transform(), get_probabilities() y
+                                  partial_fit() se comportan igual que antes
+                                  de guardar)
+            topic_info.json       tabla de tópicos (get_topic_info)
+            docs.json             documentos del ajuste
+            fit_topics.npy        tópico de cada fila de fit_docs
+            embeddings.npy        (include_embeddings) matriz en embedding_precision
+            embedding_scales.npy  escalas por fila si la precisión es int8
+
+        Se escribe en un directorio temporal que reemplaza a path al final.
+        """
+        assert self.topic_model is not None, "El modelo de tópicos no está entrenado"
+        path = path.rstrip("/\\")
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        shutil.rmtree(tmp_path, ignore_errors=True)
+        os.makedirs(tmp_path)
+
+        # safetensors no guarda UMAP ni HDBSCAN: el modelo cargado asignaría
+        # tópicos por similitud con los embeddings de tópico (nunca -1)
+        serialization = "pickle"
+        self.topic_model.save(os.path.join(tmp_path, "bertopic"), serialization=serialization,
+                              save_ctfidf=True, save_embedding_model=False)
+        self.get_topic_info().to_json(os.path.join(tmp_path, "topic_info.json"),
+                                      orient="records", force_ascii=False, indent=2)
+        with open(os.path.join(tmp_path, "docs.json"), "w", encoding="utf-8") as f:
+            json.dump(self.docs, f, ensure_ascii=False)
+        np.save(os.path.join(tmp_path, "fit_topics.npy"), np.asarray(self.fit_topics, dtype=np.int32))
+
+        if include_embeddings:
+            assert self.embeddings is not None, "Embeddings no calculados"
+            if isinstance(self.embeddings, QuantizedEmbeddings):
+                np.save(os.path.join(tmp_path, "embeddings.npy"), self.embeddings.data)
+                if self.embeddings.scales is not None:
+                    np.save(os.path.join(tmp_path, "embedding_scales.npy"), self.embeddings.scales)
+            else:
+                np.save(os.path.join(tmp_path, "embeddings.npy"), np.asarray(self.embeddings, dtype=np.float32))
+
+        manifest = {
+            "format": self.ARTIFACT_FORMAT,
+            "version": self.ARTIFACT_VERSION,
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "serialization": serialization,
+            "language": self.language,
+            "n_topics": self.n_topics,
+            "dedup": self.dedup,
+            "online": self.online,
+            "embedding_model": {"name": self.embedding_model_name, "revision": self.embedding_model_revision},
+            "embedding_precision": self.embedding_precision,
+            "embeddings_included": include_embeddings,
+            "n_docs": len(self.docs),
+            "n_topics_found": len(set(self.fit_topics)),
+            "libraries": _library_versions(),
+        }
+        with open(os.path.join(tmp_path, "manifest.json"), "w", encoding="utf-8") as f:
+            json.dump(manifest, f, ensure_ascii=False, indent=2)
+
+        if os.path.isdir(path):
+            shutil.rmtree(path)
+        os.replace(tmp_path, path)
+        print(f"[TopicModeler] → Modelo guardado en {path}")
+        return path
+
+    @classmethod
+    def load(
+        cls,
+        path: str,
+        embedding_cache_dir: Optional[str] = None,
+        token_budget: int = 16384,
+        encode_workers: int = 1,
+        encode_threads: Optional[int] = None,
+        embedding_cache_max_bytes: int = 2 * 1024 ** 3
+    ) -> "TopicModeler":
+        """
+        Carga un modelo guardado con save(). El modelo de embeddings no se
+        carga hasta que transform() o partial_fit() necesiten codificar.
+        """
+        from bertopic import BERTopic
+
+        manifest_path = os.path.join(path, "manifest.json")
+        assert os.path.isfile(manifest_path), f"No se encontró {manifest_path}"
+        with open(manifest_path, encoding="utf-8") as f:
+            manifest = json.load(f)
+        assert manifest.get("format") == cls.ARTIFACT_FORMAT, f"{path} no es un modelo guardado por TopicModeler"
+        assert manifest["version"] <= cls.ARTIFACT_VERSION, \
+            f"El modelo usa el formato {manifest['version']}; esta versión lee hasta el {cls.ARTIFACT_VERSION}"
+
+        with open(os.path.join(path, "docs.json"), encoding="utf-8") as f:
+            docs = json.load(f)
+
+        tm = cls(
+            docs,
+            language=manifest["language"],
+            embedding_model_name=manifest["embedding_model"]["name"],
+            n_topics=manifest["n_topics"],
+            dedup=manifest["dedup"],
+            embedding_cache_dir=embedding_cache_dir,
+            embedding_model_revision=manifest["embedding_model"]["revision"],
+            token_budget=token_budget,
+            encode_workers=encode_workers,
+            encode_threads=encode_threads,
+            embedding_precision=manifest["embedding_precision"],
+            online=manifest["online"],
+            embedding_cache_max_bytes=embedding_cache_max_bytes
+        )
+        tm._deduplicate()
+        tm.topic_model = BERTopic.load(os.path.join(path, "bertopic"))
+        tm.fit_topics = np.load(os.path.join(path, "fit_topics.npy")).tolist()
+        tm._expand_topics()
+
+        if manifest["embeddings_included"]:
+            data = np.load(os.path.join(path, "embeddings.npy"), mmap_mode="r")
+            scales_path = os.path.join(path, "embedding_scales.npy")
+            if manifest["embedding_precision"] == "float32":
+                tm.embeddings = data
+            else:
+                scales = np.load(scales_path) if os.path.isfile(scales_path) else None
+                tm.embeddings = QuantizedEmbeddings(data, scales)
+
+        print(f"[TopicModeler] → Modelo cargado de {path}: {len(tm.docs)} documentos, "
+              f"{manifest['n_topics_found']} tópicos (guardado {manifest['created']})")
+        return tm
+
+    def get_probabilities(self, doc_ids=None) -> np.ndarray:
+        """
+        Probabilidad de cada tópico para los documentos doc_ids (índices de
+        self.docs; None = todos), matriz len(doc_ids) x tópicos.
+
+        Si el modelo se ajustó con calculate_probabilities=True se toman
+        filas de self.probs. Si no, se calculan solo para esas filas con
+        hdbscan.membership_vector sobre los embeddings reducidos que vio
+        HDBSCAN, igual que BERTopic.transform con calculate_probabilities.
+
+        Los valores no son idénticos en ambos casos: el ajuste usa
+        hdbscan.all_points_membership_vectors, que trata a cada documento como
+        parte del árbol de clusters, mientras que membership_vector lo trata
+        como un punto nuevo (fuera de muestra); benchmarks/bench_probabilities.py
+        reporta la diferencia.
+        """
+        assert self.topic_model is not None, "El modelo de tópicos no está entrenado"
+        assert not self.online, "En modo online (MiniBatchKMeans) no hay probabilidades por tópico"
+        doc_ids = np.arange(len(self.docs)) if doc_ids is None else np.asarray(doc_ids, dtype=np.int64)
+
+        # Con dedup las probabilidades son por texto único
+        inverse = self.get_inverse_index()
+        rows = doc_ids if inverse is None else inverse[doc_ids]
+
+        if self.probs is not None:
+            return self.probs[rows]
+
+        import hdbscan
+        clusterer = self.topic_model.hdbscan_model
+        assert getattr(clusterer, "prediction_data_", None) is not None, \
+            "El modelo HDBSCAN no guarda prediction_data: no se pueden calcular probabilidades"
+
+        unique_rows, positions = np.unique(rows, return_inverse=True)
+        reduced = clusterer.prediction_data_.raw_data[unique_rows]
+        probs = hdbscan.membership_vector(clusterer, reduced)
+        # Columnas de HDBSCAN -> tópicos finales (orden por tamaño y reducción de nr_topics)
+        probs = self.topic_model._map_probabilities(probs, original_topics=True)
+        return probs[positions]
+
+    def get_index(self) -> TopicIndex:
+        """
+        Keywords, documentos representativos, miembros, tamaños y centroides
+        por tópico, calculados una vez por ajuste (ver processing/topic_index.py).
+        """
+        assert self.topic_model is not None, "El modelo de tópicos no está entrenado"
+        if self._index is None:
+            start = time.perf_counter()
+            self._index = TopicIndex.from_modeler(self)
+            print(f"[TopicModeler] → Índice de {len(self._index.topic_ids)} tópicos "
+                  f"en {time.perf_counter() - start:.2f} s")
+        return self._index
 
     def get_topic_info(self) -> pd.DataFrame:
         """Devuelve información global de todos los tópicos."""
+        return self.get_index().info.copy()
+
+    def _topic_info(self) -> pd.DataFrame:
         assert self.topic_model is not None, "El modelo de tópicos no está entrenado"
-        return self.topic_model.get_topic_info()
+        info = self.topic_model.get_topic_info()
+
+        # BERTopic solo vio textos únicos (o, en modo online, no cuenta los
+        # documentos asignados sin partial_fit): recalcular Count
+        if self.deduplicator is not None or self.online:
+            sizes = pd.Series(self.topics).value_counts()
+            info["Count"] = info["Topic"].map(sizes).fillna(0).astype(int)
+        return info
 
     def get_topic_keywords(self, topic_id: int, top_n: int = 10) -> List[tuple]:
         """Devuelve lista de (keyword, peso) para un tópico."""
-        assert self.topic_model is not None, "El modelo de tópicos no está entrenado"
-        words = self.topic_model.get_topic(topic_id)
-        if words is None:
-            return []
-        return words[:top_n]
+        return self.get_index().get_keywords(topic_id, top_n)
 
     def get_representative_docs(self, topic_id: int, top_n: int = 1) -> List[str]:
         """Devuelve los documentos más representativos de un tópico."""
-        assert self.topic_model is not None, "El modelo de tópicos no está entrenado"
-        rep_docs = self.topic_model.get_representative_docs()
-        docs_for_topic = rep_docs.get(topic_id, [])
-        return docs_for_topic[:top_n]
+        return self.get_index().get_representative_docs(topic_id, top_n)
 
     def get_documents_dataframe(self) -> pd.DataFrame:
         """Devuelve un DataFrame con doc_id, texto y tópico asignado."""
-        assert self.topics is not None and self.embeddings is not None, "Modelo no entrenado"
+        assert self.topics is not None, "Modelo no entrenado"
 
         df = pd.DataFrame({
             "doc_id": range(len(self.docs)),
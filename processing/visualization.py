@@ -1,95 +1,222 @@
+import time
+
 import numpy as np
 import pandas as pd
-import plotly.express as px
 
-from sklearn.manifold import TSNE
-import umap.umap_ as umap
+from processing.landmarks import interpolate, stratified_sample
+from processing.neighbors import NeighborGraph, tsne_neighbors, tsne_perplexity, umap_neighbors
+from processing.quantization import QuantizedEmbeddings, as_float32
 
 
 class Visualization:
     """
     Visualización automática de embeddings en 3D usando UMAP y t-SNE
     con parámetros adaptativos.
+
+    Con neighbor_graph (grafo kNN de las mismas filas de embeddings) UMAP y
+    t-SNE usan esos vecinos en lugar de buscarlos de nuevo.
+
+    Con landmarks=L y más de L filas de embeddings, los reductores se ajustan
+    sobre una muestra de L filas estratificada por tópico (el tópico -1 y los
+    tópicos pequeños siempre quedan en ella) y el resto de los puntos se
+    ubica después: UMAP con transform() y t-SNE, que no tiene transform,
+    interpolando entre sus landmarks más cercanos. Todas las filas de df
+    reciben coordenadas, pero las gráficas muestran solo los landmarks.
     """
 
-    def __init__(self, embeddings: np.ndarray, df_docs: pd.DataFrame, palette: str):
-        assert isinstance(embeddings, np.ndarray), "Embeddings must be a numpy array"
+    # Filas por llamada a UMAP.transform al ubicar los puntos que no son landmarks
+    TRANSFORM_CHUNK_ROWS = 65536
+
+    # Tope de iteraciones de t-SNE sobre landmarks (el default de sklearn):
+    # 250 * sqrt(N) daría ~35k iteraciones con 20000 landmarks. Sin landmarks
+    # se mantiene el calendario sin tope
+    TSNE_MAX_ITER = 1000
+
+    def __init__(self, embeddings: np.ndarray | QuantizedEmbeddings, df_docs: pd.DataFrame, palette: str,
+                 inverse: np.ndarray | None = None, hover_columns: list[str] | None = None,
+                 neighbor_graph: NeighborGraph | None = None, landmarks: int | None = None):
+        assert isinstance(embeddings, (np.ndarray, QuantizedEmbeddings)), "Embeddings must be a numpy array"
         assert "topic" in df_docs.columns, "df_docs must contain a 'topic' column"
+        if inverse is not None:
+            assert len(inverse) == len(df_docs), "inverse must have one entry per document"
+        if neighbor_graph is not None:
+            assert len(neighbor_graph) == len(embeddings), "neighbor_graph must have one row per embedding"
+        assert landmarks is None or landmarks >= 3, "landmarks must be >= 3"
 
-        self.embeddings = embeddings          # matriz de embeddings
+        self.embeddings = embeddings          # matriz de embeddings (float32 o cuantizada)
         self.df = df_docs.copy()              # copia del dataframe con columna 'topic'
         self.palette = palette                # nombre de la paleta a usar
+        self.inverse = inverse                # documento -> fila de embeddings (dedup)
+        self.hover_columns = ["topic"] + [c for c in (hover_columns or []) if c in self.df.columns]
+        self.neighbor_graph = neighbor_graph  # vecinos compartidos con BERTopic (opcional)
+        self.timings: dict[str, float] = {}   # segundos de cada reducción
+
+        # Filas de embeddings sobre las que se ajustan los reductores (None = todas)
+        self.landmark_rows: np.ndarray | None = None
+        if landmarks is not None and len(embeddings) > landmarks:
+            topics = self.df["topic"].to_numpy()
+            row_topics = topics
+            if inverse is not None:
+                row_topics = np.empty(len(embeddings), dtype=topics.dtype)
+                row_topics[inverse] = topics
+            self.landmark_rows = stratified_sample(row_topics, landmarks)
+            # El grafo es de todas las filas: sus vecinos no sirven dentro de la muestra
+            self.neighbor_graph = None
+
+    def _expand(self, reduced: np.ndarray) -> np.ndarray:
+        # Con dedup cada texto único se reduce una vez y se copia a sus duplicados
+        if self.inverse is None:
+            return reduced
+        return reduced[self.inverse]
+
+    def _fit_embeddings(self) -> np.ndarray:
+        # Matriz float32 sobre la que se ajustan los reductores
+        if self.landmark_rows is None:
+            return as_float32(self.embeddings)
+        return np.asarray(self.embeddings[self.landmark_rows], dtype=np.float32)
+
+    def _place(self, fitted: np.ndarray, transform=None) -> np.ndarray:
+        """
+        Coordenadas de todas las filas de embeddings a partir de las de los
+        landmarks: con transform (UMAP) o interpolando entre landmarks (t-SNE).
+        """
+        if self.landmark_rows is None:
+            return fitted
+
+        rest = np.setdiff1d(np.arange(len(self.embeddings)), self.landmark_rows, assume_unique=True)
+        placed = np.empty((len(self.embeddings), fitted.shape[1]), dtype=np.float32)
+        placed[self.landmark_rows] = fitted
+        if transform is None:
+            placed[rest] = interpolate(self.embeddings, self.landmark_rows, fitted, rest)
+        else:
+            for start in range(0, len(rest), self.TRANSFORM_CHUNK_ROWS):
+                rows = rest[start:start + self.TRANSFORM_CHUNK_ROWS]
+                placed[rows] = transform(np.asarray(self.embeddings[rows], dtype=np.float32))
+        return placed
+
+    def _plot_frame(self) -> pd.DataFrame:
+        # Documentos a graficar: todos, o un documento por fila landmark
+        if self.landmark_rows is None:
+            return self.df
+        docs = self.landmark_rows
+        if self.inverse is not None:
+            _, first_doc = np.unique(self.inverse, return_index=True)
+            docs = first_doc[self.landmark_rows]
+        return self.df.iloc[docs]
+
+    def _title(self, name: str) -> str:
+        if self.landmark_rows is None:
+            return name
+        return f"{name} ({len(self.landmark_rows):,} landmarks de {len(self.embeddings):,} puntos)"
 
     def _get_palette(self):
         # Cargar paleta desde tu diccionario global
         from utils.color_palettes import COLOR_SCHEMES
         return COLOR_SCHEMES[self.palette]
 
+    def set_coordinates(self, prefix: str, reduced: np.ndarray):
+        # Columnas <prefix>_x, <prefix>_y, <prefix>_z de df (una fila por documento)
+        self.df[f"{prefix}_x"] = reduced[:, 0]
+        self.df[f"{prefix}_y"] = reduced[:, 1]
+        self.df[f"{prefix}_z"] = reduced[:, 2]
+
     def reduce_umap_3d(self):
-        # Número de muestras
-        N = len(self.embeddings)
+        self.set_coordinates("umap", self.compute_umap_3d())
+
+    def reduce_tsne_3d(self):
+        self.set_coordinates("tsne", self.compute_tsne_3d())
+
+    def compute_umap_3d(self) -> np.ndarray:
+        """
+        Coordenadas UMAP 3D de cada documento, sin modificar df: compute_umap_3d
+        y compute_tsne_3d pueden correr a la vez en hilos distintos.
+        """
+        X = self._fit_embeddings()
+        # Número de muestras (landmarks en modo landmarks)
+        N = len(X)
         if N < 3:
             raise ValueError("Se requieren al menos 3 muestras para UMAP 3D.")
 
         # n_neighbors adaptativo: sqrt(N), limitado entre 5 y 50 y no mayor a N-1
-        n_neighbors = int(np.sqrt(N))
-        n_neighbors = max(5, min(n_neighbors, 50, N - 1))
+        n_neighbors = umap_neighbors(N)
 
+        import umap.umap_ as umap
+        start = time.perf_counter()
         reducer = umap.UMAP(
             n_components=3,
             n_neighbors=n_neighbors,
             min_dist=0.1,
             metric="cosine",
-            random_state=42
+            random_state=42,
+            precomputed_knn=(None, None, None) if self.neighbor_graph is None
+            else self.neighbor_graph.umap_knn(n_neighbors)
         )
 
-        reduced = reducer.fit_transform(self.embeddings)
-
-        self.df["umap_x"] = reduced[:, 0]
-        self.df["umap_y"] = reduced[:, 1]
-        self.df["umap_z"] = reduced[:, 2]
+        reduced = self._expand(self._place(reducer.fit_transform(X), reducer.transform))
+        self.timings["umap_3d"] = time.perf_counter() - start
+        return reduced
 
-    def reduce_tsne_3d(self):
-        # Número de muestras
-        N = len(self.embeddings)
+    def compute_tsne_3d(self) -> np.ndarray:
+        """Coordenadas t-SNE 3D de cada documento, sin modificar df."""
+        X = self._fit_embeddings()
+        # Número de muestras (landmarks en modo landmarks)
+        N = len(X)
         if N < 3:
             raise ValueError("Se requieren al menos 3 muestras para t-SNE 3D.")
 
         # perplexity adaptativa: sqrt(N), limitada entre 5 y 50 y menor que N
-        perplexity = int(np.sqrt(N))
-        max_perplexity = max(2, N - 1)   # garantizar < N
-        perplexity = max(5, min(perplexity, 50, max_perplexity))
+        perplexity = tsne_perplexity(N)
 
-        # n_iter adaptativo
+        # n_iter adaptativo; con landmarks, acotado por TSNE_MAX_ITER
         n_iter = max(750, int(250 * np.sqrt(N)))
+        if self.landmark_rows is not None:
+            n_iter = min(n_iter, self.TSNE_MAX_ITER)
+        print(f"[Visualization] → t-SNE 3D sobre {N} puntos: perplexity {perplexity}, max_iter {n_iter}")
 
-        reducer = TSNE(
-            n_components=3,
-            perplexity=perplexity,
-            max_iter=n_iter,
-            learning_rate="auto",
-            random_state=42
-        )
-
-        reduced = reducer.fit_transform(self.embeddings)
+        from sklearn.manifold import TSNE
+        start = time.perf_counter()
+        if self.neighbor_graph is None:
+            reducer = TSNE(
+                n_components=3,
+                perplexity=perplexity,
+                max_iter=n_iter,
+                learning_rate="auto",
+                random_state=42
+            )
+        else:
+            # Distancias coseno a los 3*perplexity+1 vecinos del grafo (con
+            # embeddings normalizados es proporcional a la euclidiana al
+            # cuadrado que usa t-SNE). Con distancias precalculadas no hay
+            # init="pca".
+            reducer = TSNE(
+                n_components=3,
+                perplexity=perplexity,
+                max_iter=n_iter,
+                learning_rate="auto",
+                metric="precomputed",
+                init="random",
+                random_state=42
+            )
+            X = self.neighbor_graph.tsne_distances(tsne_neighbors(N))
 
-        self.df["tsne_x"] = reduced[:, 0]
-        self.df["tsne_y"] = reduced[:, 1]
-        self.df["tsne_z"] = reduced[:, 2]
+        reduced = self._expand(self._place(reducer.fit_transform(X)))
+        self.timings["tsne_3d"] = time.perf_counter() - start
+        return reduced
 
     def plot_umap_3d(self):
+        import plotly.express as px
         # Obtener paleta de colores
         palette = self._get_palette()
         self.df["topic"] = self.df["topic"].astype(str)
 
         # Gráfico UMAP 3D
         fig = px.scatter_3d(
-            self.df,
+            self._plot_frame(),
             x="umap_x", y="umap_y", z="umap_z",
             color="topic",
             color_discrete_sequence=palette,
-            title="UMAP 3D",
-            hover_data=["topic"]
+            title=self._title("UMAP 3D"),
+            hover_data=self.hover_columns
         )
 
         fig.update_traces(
@@ -101,18 +228,19 @@ class Visualization:
         return fig
 
     def plot_tsne_3d(self):
+        import plotly.express as px
         # Obtener paleta de colores
         palette = self._get_palette()
         self.df["topic"] = self.df["topic"].astype(str)
 
         # Gráfico t-SNE 3D
         fig = px.scatter_3d(
-            self.df,
+            self._plot_frame(),
             x="tsne_x", y="tsne_y", z="tsne_z",
             color="topic",
             color_discrete_sequence=palette,
-            title="t-SNE 3D",
-            hover_data=["topic"]
+            title=self._title("t-SNE 3D"),
+            hover_data=self.hover_columns
         )
 
         fig.update_traces(
@@ -1,41 +1,152 @@
-import matplotlib.pyplot as plt
-from wordcloud import WordCloud
-from matplotlib.colors import LinearSegmentedColormap
+import hashlib
+from collections import Counter
+
+import numpy as np
+
+from processing.cache import DiskCache, pack_strings, unpack_strings
+from processing.tokenstore import TokenStore
+
 
 class WordCloudWrapper:
-    def __init__(self, title: str, tokens: list[str], palette: str):
+    """
+    Nube de palabras a partir de una tabla de frecuencias.
+
+    Las frecuencias vienen ya contadas (TokenStore, NgramCreator o el
+    parámetro frequencies), así que no se vuelve a unir y partir el corpus.
+    Con cache, el layout calculado (posición, tamaño, orientación y color de
+    cada palabra) se guarda por hash de (frecuencias, paleta, tamaño): una
+    corrida que solo cambia el título no recalcula el layout.
+    """
+
+    WIDTH = 1000
+    HEIGHT = 500
+
+    # Cambiar si cambia la forma de calcular o guardar el layout
+    CACHE_VERSION = 1
+
+    def __init__(self, title: str, tokens: TokenStore | list[str] | None = None, palette: str = "okabe_ito",
+                 frequencies: dict[str, int] | None = None, cache: DiskCache | None = None):
         self.title =  title
         self.tokens = tokens
         self.palette = palette
+        # Frecuencias ya contadas; si se dan, se usan en lugar de tokens
+        self.frequencies = frequencies
+        self.cache = cache
 
     def _get_palette(self, name):
         from utils.color_palettes import COLOR_SCHEMES
         return COLOR_SCHEMES[name]
 
+    def _frequencies(self) -> dict[str, int]:
+        """
+        Tabla palabra -> frecuencia, sin las stopwords de WordCloud (las
+        mismas que descartaba WordCloud.generate al procesar el texto).
+        """
+        from wordcloud import STOPWORDS
+
+        if self.frequencies:
+            frequencies = self.frequencies
+        elif isinstance(self.tokens, TokenStore):
+            frequencies = self.tokens.frequencies()
+        else:
+            frequencies = Counter(self.tokens or [])
+
+        return {w: c for w, c in frequencies.items() if w.lower() not in STOPWORDS}
+
+    def layout_key(self, frequencies: dict[str, int]) -> str:
+        """Hash de las frecuencias, la paleta y el tamaño de la imagen."""
+        h = hashlib.sha256()
+        h.update(repr([self.CACHE_VERSION, self.palette, self._get_palette(self.palette),
+                       self.WIDTH, self.HEIGHT]).encode("utf-8"))
+        for word, count in sorted(frequencies.items()):
+            h.update(f"{word}\x1f{count}\x1e".encode("utf-8"))
+        return h.hexdigest()
+
     def create_cloud(self):
-        assert self.tokens, "No tokens found. Try again."
+        from wordcloud import WordCloud
+        from matplotlib.colors import LinearSegmentedColormap
+
+        frequencies = self._frequencies()
+        assert frequencies, "No tokens found. Try again."
         colors = self._get_palette(self.palette)  # lista de HEX
         cmap = LinearSegmentedColormap.from_list("custom_cmap", colors)
 
+        # random_state fijo: el mismo input produce el mismo layout (y se puede cachear)
         wc = WordCloud(
             background_color="white",
             colormap=cmap,
-            width=1000,
-            height=500
-        ).generate(" ".join(self.tokens))
+            width=self.WIDTH,
+            height=self.HEIGHT,
+            random_state=0
+        )
 
+        key = self.layout_key(frequencies) if self.cache is not None else None
+        if key is not None:
+            cached = self.cache.load(key)
+            if cached is not None:
+                print("[WordCloudWrapper] → Layout cargado de la caché")
+                wc.layout_ = self._unpack_layout(cached)
+                wc.words_ = {word: freq for (word, freq), *_ in wc.layout_}
+                return wc
+
+        wc.generate_from_frequencies(frequencies)
+        if key is not None:
+            self.cache.save(key, **self._pack_layout(wc.layout_))
         return wc
 
+    @staticmethod
+    def _pack_layout(layout) -> dict[str, np.ndarray]:
+        words, colors = pack_strings([w for (w, _), *_ in layout]), pack_strings([c for *_, c in layout])
+        return {
+            "words": words[0],
+            "words_lengths": words[1],
+            "freqs": np.array([f for (_, f), *_ in layout], dtype=np.float64),
+            "font_sizes": np.array([s for _, s, _, _, _ in layout], dtype=np.int64),
+            "positions": np.array([p for _, _, p, _, _ in layout], dtype=np.int64).reshape(-1, 2),
+            # None (horizontal) se guarda como -1
+            "orientations": np.array([-1 if o is None else int(o) for _, _, _, o, _ in layout], dtype=np.int64),
+            "colors": colors[0],
+            "colors_lengths": colors[1],
+        }
+
+    @staticmethod
+    def _unpack_layout(arrays: dict[str, np.ndarray]) -> list:
+        from PIL import Image
+
+        words = unpack_strings(arrays["words"], arrays["words_lengths"])
+        colors = unpack_strings(arrays["colors"], arrays["colors_lengths"])
+        return [
+            ((word, freq), size, tuple(position), None if o < 0 else Image.Transpose(o), color)
+            for word, freq, size, position, o, color in zip(
+                words, arrays["freqs"].tolist(), arrays["font_sizes"].tolist(),
+                arrays["positions"].tolist(), arrays["orientations"].tolist(), colors)
+        ]
+
+    def chart_spec(self) -> dict:
+        """
+        Spec de la wordcloud (ver processing/rendering.py). El layout se
+        calcula al dibujarla, así que también corre en el proceso que la dibuja.
+        """
+        return {
+            "kind": "wordcloud",
+            "title": self.title,
+            "frequencies": self._frequencies(),
+            "palette": self.palette,
+            "cache": self.cache.config() if self.cache is not None else None,
+            "bbox_inches": "tight",
+        }
+
     def plot(self, wc):
+        """Figura con la wordcloud; quien la recibe debe cerrarla (plt.close)."""
+        import matplotlib.pyplot as plt
         fig = plt.figure(figsize=(12,6))
         plt.imshow(wc, interpolation="bilinear")
         plt.title(self.title)
         plt.axis("off")
-        plt.show()
 
         return fig
 
-    
+
     def generate(self, show: bool = False):
         """
         Pipeline completo:
@@ -46,6 +157,7 @@ class WordCloudWrapper:
 
         Útil para integrarlo al HTML (codificar a base64).
         """
+        import matplotlib.pyplot as plt
         wc = self.create_cloud()
 
         fig, ax = plt.subplots(figsize=(12, 6))
@@ -56,4 +168,4 @@ class WordCloudWrapper:
         if show:
             plt.show()
 
-        return fig, wc
\ No newline at end of file
+        return fig, wc
@@ -0,0 +1,197 @@
+import inspect
+import json
+import os
+import threading
+import time
+import traceback
+import urllib.error
+import urllib.request
+import uuid
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from queue import Queue
+from typing import Iterable, Optional
+
+from processing.models import loaded_models
+
+# Modo servidor: un proceso residente que ejecuta run_pipeline por cada
+# trabajo recibido. Los cargadores de processing/models.py memoizan spaCy,
+# SentenceTransformer y las stopwords, así que solo el primer trabajo (o
+# --preload) paga la carga de los modelos; los siguientes van directo al
+# procesamiento.
+
+DEFAULT_PORT = 8765
+
+
+class JobQueue:
+    """
+    Cola FIFO de corridas del pipeline con un único worker: los trabajos
+    se ejecutan de a uno (comparten modelos y núcleos) y su estado se
+    consulta por id.
+    """
+
+    # Trabajos terminados que se conservan para consultar su estado
+    MAX_FINISHED = 100
+
+    def __init__(self, output_dir: str = "reports"):
+        self.output_dir = output_dir
+        self.jobs: "OrderedDict[str, dict]" = OrderedDict()
+        self._queue: Queue = Queue()
+        self._lock = threading.Lock()
+        self._worker = threading.Thread(target=self._run, name="pipeline-worker", daemon=True)
+        self._worker.start()
+
+    def submit(self, kwargs: dict) -> dict:
+        """Encola una corrida con los argumentos de run_pipeline y devuelve el trabajo."""
+        from nlp_analyzer import run_pipeline
+
+        assert isinstance(kwargs, dict), "El cuerpo debe ser un objeto JSON con los argumentos de run_pipeline"
+        params = inspect.signature(run_pipeline).parameters
+        unknown = sorted(set(kwargs) - set(params))
+        assert not unknown, f"Argumentos desconocidos: {unknown}"
+        missing = [name for name, p in params.items() if p.default is p.empty and name not in kwargs]
+        assert not missing, f"Faltan argumentos: {missing}"
+
+        job_id = uuid.uuid4().hex[:12]
+        kwargs = dict(kwargs)
+        # Sin output_path cada trabajo escribe su propio reporte
+        kwargs.setdefault("output_path", os.path.join(self.output_dir, f"reporte_nlp_{job_id}.html"))
+        job = {
+            "id": job_id,
+            "status": "queued",
+            "output_path": kwargs["output_path"],
+            "error": None,
+            "submitted": time.time(),
+            "started": None,
+            "finished": None,
+        }
+        with self._lock:
+            self.jobs[job_id] = job
+            self._prune()
+        self._queue.put((job_id, kwargs))
+        return dict(job)
+
+    def get(self, job_id: str) -> Optional[dict]:
+        with self._lock:
+            job = self.jobs.get(job_id)
+            return dict(job) if job is not None else None
+
+    @property
+    def pending(self) -> int:
+        return self._queue.qsize()
+
+    def _update(self, job_id: str, **fields):
+        with self._lock:
+            self.jobs[job_id].update(fields)
+
+    def _prune(self):
+        finished = [job_id for job_id, job in self.jobs.items() if job["status"] in ("done", "failed")]
+        for job_id in finished[:max(len(finished) - self.MAX_FINISHED, 0)]:
+            del self.jobs[job_id]
+
+    def _run(self):
+        from nlp_analyzer import run_pipeline
+
+        while True:
+            job_id, kwargs = self._queue.get()
+            self._update(job_id, status="running", started=time.time())
+            print(f"[JobQueue] → Trabajo {job_id}: {kwargs['dataset_path']}")
+            try:
+                output_path = run_pipeline(**kwargs)
+            except Exception as e:
+                traceback.print_exc()
+                self._update(job_id, status="failed", error=f"{type(e).__name__}: {e}", finished=time.time())
+            else:
+                self._update(job_id, status="done", output_path=output_path, finished=time.time())
+            job = self.get(job_id)
+            print(f"[JobQueue] → Trabajo {job_id} {job['status']} en {job['finished'] - job['started']:.1f} s")
+
+
+class _Handler(BaseHTTPRequestHandler):
+    """
+    POST /jobs        encola una corrida (JSON con argumentos de run_pipeline)
+    GET  /jobs/<id>   estado del trabajo
+    GET  /health      modelos cargados y trabajos en cola
+    """
+
+    def do_GET(self):
+        jobs: JobQueue = self.server.jobs
+        if self.path == "/health":
+            self._send(200, {"status": "ok", "models": loaded_models(), "pending": jobs.pending})
+        elif self.path.startswith("/jobs/"):
+            job = jobs.get(self.path[len("/jobs/"):])
+            if job is None:
+                self._send(404, {"error": "Trabajo no encontrado"})
+            else:
+                self._send(200, job)
+        else:
+            self._send(404, {"error": "Ruta no encontrada"})
+
+    def do_POST(self):
+        if self.path != "/jobs":
+            self._send(404, {"error": "Ruta no encontrada"})
+            return
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+            job = self.server.jobs.submit(json.loads(self.rfile.read(length) or b"{}"))
+        except (AssertionError, ValueError) as e:
+            self._send(400, {"error": str(e)})
+            return
+        self._send(202, job)
+
+    def _send(self, status: int, body: dict):
+        data = json.dumps(body, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        print(f"[Server] → {self.address_string()} {format % args}")
+
+
+def serve(host: str = "127.0.0.1", port: int = DEFAULT_PORT, preload: Iterable[str] = (), output_dir: str = "reports"):
+    """Atiende trabajos hasta Ctrl+C, con los modelos residentes entre corridas."""
+    # Los gráficos se generan fuera del hilo principal: backend sin ventana
+    os.environ.setdefault("MPLBACKEND", "Agg")
+
+    preload = list(preload)
+    if preload:
+        from processing.models import preload as preload_models
+        from processing.topics import TopicModeler
+
+        start = time.perf_counter()
+        preload_models(preload, TopicModeler.DEFAULT_EMBEDDING_MODEL)
+        print(f"[Server] → Modelos cargados ({', '.join(preload)}) en {time.perf_counter() - start:.1f} s")
+
+    server = ThreadingHTTPServer((host, port), _Handler)
+    server.jobs = JobQueue(output_dir)
+    print(f"[Server] → Escuchando en http://{host}:{port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+def _request(url: str, payload: Optional[dict] = None) -> dict:
+    data = None if payload is None else json.dumps(payload).encode("utf-8")
+    request = urllib.request.Request(url, data=data, headers={"Content-Type": "application/json"})
+    try:
+        with urllib.request.urlopen(request) as response:
+            return json.loads(response.read())
+    except urllib.error.HTTPError as e:
+        body = json.loads(e.read() or b"{}")
+        raise RuntimeError(body.get("error", str(e))) from None
+
+
+def submit_job(host: str, port: int, kwargs: dict, wait: bool = True, poll: float = 1.0) -> dict:
+    """Envía una corrida al servidor; con wait=True espera a que termine y devuelve el trabajo."""
+    base = f"http://{host}:{port}"
+    job = _request(f"{base}/jobs", kwargs)
+    while wait and job["status"] in ("queued", "running"):
+        time.sleep(poll)
+        job = _request(f"{base}/jobs/{job['id']}")
+    return job